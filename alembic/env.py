@@ -14,6 +14,10 @@ from app.models.lancamento import Lancamento
 from app.models.usuario import Usuario
 from app.models.cartao_credito import CartaoCredito
 from app.models.centro_custo import CentroCusto
+from app.models.conciliacao_job import ConciliacaoJob, ConciliacaoJobResultado
+from app.models.transacao_processada import TransacaoProcessada
+from app.models.daily_ledger import DailyLedger
+from app.models.fechamento import FechamentoMensal, SaldoFechamento
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,59 @@
+"""conciliacao_jobs
+
+Revision ID: 5b1f0c3a9d27
+Revises: 07632ec31958
+Create Date: 2026-10-17 09:12:03.418220
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b1f0c3a9d27'
+down_revision: Union[str, Sequence[str], None] = '07632ec31958'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('conciliacao_jobs',
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('status', sa.Enum('PENDENTE', 'PROCESSANDO', 'CONCLUIDO', 'ERRO', name='statusjob'), nullable=False),
+    sa.Column('estrategia', sa.String(length=20), nullable=False),
+    sa.Column('agrupar', sa.Boolean(), nullable=False),
+    sa.Column('transacoes', sa.JSON(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('processadas', sa.Integer(), nullable=False),
+    sa.Column('erro', sa.Text(), nullable=True),
+    sa.Column('usuario_id', sa.Uuid(), nullable=True),
+    sa.Column('criado_em', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('iniciado_em', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('atualizado_em', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('concluido_em', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_conciliacao_jobs_status_criado_em', 'conciliacao_jobs', ['status', 'criado_em'], unique=False)
+    op.create_table('conciliacao_job_resultados',
+    sa.Column('job_id', sa.Uuid(), nullable=False),
+    sa.Column('ordem', sa.Integer(), nullable=False),
+    sa.Column('ofx_id', sa.String(), nullable=False),
+    sa.Column('lancamento_id', sa.String(length=36), nullable=True),
+    sa.Column('lancamento_ids', sa.JSON(), nullable=True),
+    sa.Column('tipo_match', sa.String(length=10), nullable=False),
+    sa.Column('valor_taxa_sugerida', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('mensagem', sa.String(), nullable=False),
+    sa.ForeignKeyConstraint(['job_id'], ['conciliacao_jobs.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('job_id', 'ordem')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('conciliacao_job_resultados')
+    op.drop_index('ix_conciliacao_jobs_status_criado_em', table_name='conciliacao_jobs')
+    op.drop_table('conciliacao_jobs')
+    sa.Enum(name='statusjob').drop(op.get_bind(), checkfirst=True)
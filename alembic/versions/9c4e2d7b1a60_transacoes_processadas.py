@@ -0,0 +1,45 @@
+"""transacoes_processadas
+
+Revision ID: 9c4e2d7b1a60
+Revises: 5b1f0c3a9d27
+Create Date: 2026-10-17 10:41:27.902114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c4e2d7b1a60'
+down_revision: Union[str, Sequence[str], None] = '5b1f0c3a9d27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('transacoes_processadas',
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('chave', sa.String(length=40), nullable=False),
+    sa.Column('conta', sa.String(length=50), nullable=True),
+    sa.Column('fitid', sa.String(), nullable=False),
+    sa.Column('valor', sa.Numeric(precision=15, scale=2), nullable=False),
+    sa.Column('data', sa.Date(), nullable=False),
+    sa.Column('tipo_match', sa.String(length=10), nullable=False),
+    sa.Column('lancamento_id', sa.String(length=36), nullable=True),
+    sa.Column('lancamento_ids', sa.JSON(), nullable=True),
+    sa.Column('valor_taxa_sugerida', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('processado_em', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_transacoes_processadas_chave'), 'transacoes_processadas', ['chave'], unique=True)
+    op.add_column('conciliacao_jobs', sa.Column('deduplicar', sa.Boolean(), server_default=sa.true(), nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('conciliacao_jobs', 'deduplicar')
+    op.drop_index(op.f('ix_transacoes_processadas_chave'), table_name='transacoes_processadas')
+    op.drop_table('transacoes_processadas')
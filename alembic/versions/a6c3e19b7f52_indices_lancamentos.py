@@ -0,0 +1,45 @@
+"""indices lancamentos
+
+Revision ID: a6c3e19b7f52
+Revises: f41a7d2e8c35
+Create Date: 2026-10-17 18:20:37.912406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6c3e19b7f52'
+down_revision: Union[str, Sequence[str], None] = 'f41a7d2e8c35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (nome, colunas, condição do índice parcial)
+INDICES = [
+    ('ix_lancamentos_data_vencimento', ['data_vencimento'], None),
+    ('ix_lancamentos_status_data_vencimento', ['status', 'data_vencimento'], None),
+    ('ix_lancamentos_centro_custo_data_vencimento', ['centro_custo_id', 'data_vencimento'], None),
+    ('ix_lancamentos_processo_id', ['processo_id'], 'processo_id IS NOT NULL'),
+    ('ix_lancamentos_lancamento_pai_id', ['lancamento_pai_id'], 'lancamento_pai_id IS NOT NULL'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY não bloqueia escritas em lancamentos e não roda dentro de transação
+    with op.get_context().autocommit_block():
+        for nome, colunas, condicao in INDICES:
+            op.create_index(
+                nome, 'lancamentos', colunas, unique=False, postgresql_concurrently=True,
+                postgresql_where=sa.text(condicao) if condicao else None
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for nome, _, _ in reversed(INDICES):
+            op.drop_index(nome, table_name='lancamentos', postgresql_concurrently=True)
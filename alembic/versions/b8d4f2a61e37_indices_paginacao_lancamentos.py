@@ -0,0 +1,49 @@
+"""indices paginacao lancamentos
+
+Revision ID: b8d4f2a61e37
+Revises: a6c3e19b7f52
+Create Date: 2026-10-17 19:05:12.481903
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8d4f2a61e37'
+down_revision: Union[str, Sequence[str], None] = 'a6c3e19b7f52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (índice novo, índice substituído, colunas): o id no fim atende ORDER BY
+# data_vencimento, id e a busca (data_vencimento, id) > cursor sem ordenação extra
+INDICES = [
+    ('ix_lancamentos_data_vencimento_id', 'ix_lancamentos_data_vencimento', ['data_vencimento', 'id']),
+    (
+        'ix_lancamentos_status_data_vencimento_id', 'ix_lancamentos_status_data_vencimento',
+        ['status', 'data_vencimento', 'id']
+    ),
+    (
+        'ix_lancamentos_centro_custo_data_vencimento_id', 'ix_lancamentos_centro_custo_data_vencimento',
+        ['centro_custo_id', 'data_vencimento', 'id']
+    ),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # O novo índice é criado antes de remover o antigo: as consultas nunca ficam sem índice
+    with op.get_context().autocommit_block():
+        for novo, antigo, colunas in INDICES:
+            op.create_index(novo, 'lancamentos', colunas, unique=False, postgresql_concurrently=True)
+            op.drop_index(antigo, table_name='lancamentos', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for novo, antigo, colunas in reversed(INDICES):
+            op.create_index(antigo, 'lancamentos', colunas[:-1], unique=False, postgresql_concurrently=True)
+            op.drop_index(novo, table_name='lancamentos', postgresql_concurrently=True)
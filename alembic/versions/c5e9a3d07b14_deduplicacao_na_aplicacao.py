@@ -0,0 +1,32 @@
+"""deduplicacao_na_aplicacao
+
+Revision ID: c5e9a3d07b14
+Revises: b8d4f2a61e37
+Create Date: 2026-10-17 21:12:08.513046
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e9a3d07b14'
+down_revision: Union[str, Sequence[str], None] = 'b8d4f2a61e37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('conciliacao_job_resultados', sa.Column('conta', sa.String(length=50), nullable=True))
+    # Até aqui eram registradas as sugestões exibidas, não as baixas: sem como
+    # distinguir as aplicadas, o registro recomeça vazio. Transações já pagas não
+    # voltam a ter correspondência, pois só lançamentos pendentes são candidatos.
+    op.execute("DELETE FROM transacoes_processadas")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('conciliacao_job_resultados', 'conta')
@@ -0,0 +1,50 @@
+"""daily_ledger
+
+Revision ID: d3a8f61c2b94
+Revises: 9c4e2d7b1a60
+Create Date: 2026-10-17 14:12:05.318640
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3a8f61c2b94'
+down_revision: Union[str, Sequence[str], None] = '9c4e2d7b1a60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Tipos enum já criados na migração inicial
+    op.create_table('daily_ledger',
+    sa.Column('data', sa.Date(), nullable=False),
+    sa.Column('centro_custo_id', sa.Uuid(), nullable=False),
+    sa.Column('tipo', postgresql.ENUM('RECEITA', 'DESPESA', name='tipolancamento', create_type=False), nullable=False),
+    sa.Column('natureza', postgresql.ENUM('FIXO', 'PONTUAL', 'EXITO', name='naturezalancamento', create_type=False), nullable=False),
+    sa.Column('status', postgresql.ENUM('PENDENTE', 'PAGO', 'AGUARDANDO_TRANSITO', 'CANCELADO', name='statuslancamento', create_type=False), nullable=False),
+    sa.Column('status_processo', sa.String(length=20), nullable=False),
+    sa.Column('valor', sa.Numeric(precision=15, scale=2), nullable=False),
+    sa.Column('quantidade', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('data', 'centro_custo_id', 'tipo', 'natureza', 'status', 'status_processo')
+    )
+    # Carga inicial a partir dos lançamentos existentes (mesma agregação de scripts/rebuild_daily_ledger.py)
+    op.execute("""
+        INSERT INTO daily_ledger (data, centro_custo_id, tipo, natureza, status, status_processo, valor, quantidade)
+        SELECT l.data_vencimento, l.centro_custo_id, l.tipo, l.natureza, l.status,
+               COALESCE(CAST(p.status AS VARCHAR), ''), SUM(l.valor), COUNT(*)
+        FROM lancamentos l
+        LEFT OUTER JOIN processos p ON p.id = l.processo_id
+        WHERE l.data_vencimento IS NOT NULL
+        GROUP BY l.data_vencimento, l.centro_custo_id, l.tipo, l.natureza, l.status, COALESCE(CAST(p.status AS VARCHAR), '')
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('daily_ledger')
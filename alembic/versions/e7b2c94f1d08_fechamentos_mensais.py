@@ -0,0 +1,48 @@
+"""fechamentos_mensais
+
+Revision ID: e7b2c94f1d08
+Revises: d3a8f61c2b94
+Create Date: 2026-10-17 17:05:41.204118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b2c94f1d08'
+down_revision: Union[str, Sequence[str], None] = 'd3a8f61c2b94'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('fechamentos_mensais',
+    sa.Column('mes', sa.Date(), nullable=False),
+    sa.Column('ate', sa.Date(), nullable=False),
+    sa.Column('fechado_em', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('usuario_id', sa.Uuid(), nullable=True),
+    sa.PrimaryKeyConstraint('mes'),
+    sa.UniqueConstraint('ate')
+    )
+    # Tipo enum já criado na migração inicial
+    op.create_table('saldos_fechamento',
+    sa.Column('mes', sa.Date(), nullable=False),
+    sa.Column('centro_custo_id', sa.Uuid(), nullable=False),
+    sa.Column('tipo', postgresql.ENUM('RECEITA', 'DESPESA', name='tipolancamento', create_type=False), nullable=False),
+    sa.Column('status_processo', sa.String(length=20), nullable=False),
+    sa.Column('valor', sa.Numeric(precision=15, scale=2), nullable=False),
+    sa.Column('quantidade', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['mes'], ['fechamentos_mensais.mes'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('mes', 'centro_custo_id', 'tipo', 'status_processo')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('saldos_fechamento')
+    op.drop_table('fechamentos_mensais')
@@ -0,0 +1,35 @@
+"""indice lancamentos.criado_em
+
+Revision ID: f41a7d2e8c35
+Revises: e7b2c94f1d08
+Create Date: 2026-10-17 17:48:12.530917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f41a7d2e8c35'
+down_revision: Union[str, Sequence[str], None] = 'e7b2c94f1d08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Filtro por data de inclusão do dashboard (intervalo sobre criado_em).
+    # CONCURRENTLY não bloqueia escritas em lancamentos e não roda dentro de transação.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f('ix_lancamentos_criado_em'), 'lancamentos', ['criado_em'], unique=False,
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(op.f('ix_lancamentos_criado_em'), table_name='lancamentos', postgresql_concurrently=True)
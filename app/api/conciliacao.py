@@ -1,32 +1,51 @@
-
+import asyncio
+import json
+import time
+import uuid
 from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
 from app.services.conciliacao import ConciliacaoService
-from app.services.ofx_parser import OfxParserService
-from app.schemas.ofx import OfxTransactionSchema, ConciliacaoResult
+from app.services.conciliacao_jobs import ConciliacaoJobService, worker
+from app.services.aplicacao_conciliacao import AplicacaoConciliacaoService, AplicacaoInvalida
+from app.services.ofx_parser import OfxParserService, OfxStreamParser, TAMANHO_BLOCO, get_process_pool
+from app.schemas.ofx import (
+    OfxTransactionSchema, ConciliacaoResult, EstrategiaConciliacao, ArquivoConciliacao, ConciliacaoLoteResult,
+    ConciliacaoJobPublic, AplicarConciliacaoRequest, AplicacaoConciliacaoResult
+)
+from app.models.enums import StatusJob
 from app.api.auth import get_current_user
 from app.models.usuario import Usuario
 from app.api.deps import RoleChecker
 
 router = APIRouter(prefix="/conciliacao", tags=["conciliacao"])
 
+# Tipo do erro 422 de /aplicar por campo recusado
+TIPOS_ERRO_APLICACAO = {"valor_taxa_sugerida": "taxa_invalida", "lancamento_ids": "correspondencia_invalida"}
+
 @router.post("/processar", response_model=list[ConciliacaoResult], dependencies=[Depends(RoleChecker(["ADMIN", "ANALISTA"]))])
 async def processar_conciliacao(
     transacoes: list[OfxTransactionSchema],
     db: Annotated[AsyncSession, Depends(get_db)],
+    estrategia: EstrategiaConciliacao = EstrategiaConciliacao.GULOSA,
+    agrupar: bool = False,
+    deduplicar: bool = True,
     current_user: Usuario = Depends(get_current_user)
 ):
     service = ConciliacaoService(db)
-    resultados = await service.processar_ofx(transacoes)
+    resultados = await service.processar_ofx(transacoes, estrategia, agrupar=agrupar, deduplicar=deduplicar)
     return resultados
 
 @router.post("/upload", response_model=list[ConciliacaoResult], dependencies=[Depends(RoleChecker(["ADMIN", "ANALISTA"]))])
 async def upload_ofx(
     file: Annotated[UploadFile, File(...)],
     db: Annotated[AsyncSession, Depends(get_db)],
+    estrategia: EstrategiaConciliacao = EstrategiaConciliacao.GULOSA,
+    agrupar: bool = False,
+    deduplicar: bool = True,
     current_user: Usuario = Depends(get_current_user)
 ):
     """
@@ -43,7 +62,7 @@ async def upload_ofx(
         transacoes = OfxParserService.parse_file(content)
         
         service = ConciliacaoService(db)
-        resultados = await service.processar_ofx(transacoes)
+        resultados = await service.processar_ofx(transacoes, estrategia, agrupar=agrupar, deduplicar=deduplicar)
         return resultados
         
     except Exception as e:
@@ -51,3 +70,247 @@ async def upload_ofx(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Erro ao processar arquivo OFX: {str(e)}"
         )
+
+@router.post("/upload/stream", dependencies=[Depends(RoleChecker(["ADMIN", "ANALISTA"]))])
+async def upload_ofx_stream(
+    file: Annotated[UploadFile, File(...)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+    estrategia: EstrategiaConciliacao = EstrategiaConciliacao.GULOSA,
+    agrupar: bool = False,
+    deduplicar: bool = True,
+    tamanho_lote: Annotated[int, Query(ge=1, le=10000)] = 1000,
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Versão incremental do /upload para extratos grandes: o arquivo é lido em blocos,
+    as transações são conciliadas em lotes de `tamanho_lote` e cada ConciliacaoResult
+    é devolvido como uma linha NDJSON assim que o lote termina.
+    """
+    if not file.filename.lower().endswith('.ofx'):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Arquivo inválido. Deve ser um arquivo .ofx"
+        )
+
+    parser = OfxStreamParser()
+    try:
+        # O primeiro bloco é validado antes de iniciar a resposta
+        pendentes = parser.feed(await file.read(TAMANHO_BLOCO))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Erro ao processar arquivo OFX: {str(e)}"
+        )
+
+    service = ConciliacaoService(db)
+
+    async def gerar_linhas():
+        lote = pendentes
+        try:
+            while True:
+                bloco = await file.read(TAMANHO_BLOCO)
+                if bloco:
+                    lote.extend(parser.feed(bloco))
+                else:
+                    lote.extend(parser.close())
+
+                while len(lote) >= tamanho_lote or (not bloco and lote):
+                    atual, lote = lote[:tamanho_lote], lote[tamanho_lote:]
+                    for resultado in await service.processar_ofx(atual, estrategia, agrupar=agrupar, deduplicar=deduplicar):
+                        yield resultado.model_dump_json() + "\n"
+
+                if not bloco:
+                    break
+        except Exception as e:
+            # A resposta já começou: o erro vai como última linha
+            yield json.dumps({"erro": f"Erro ao processar arquivo OFX: {str(e)}"}) + "\n"
+
+    return StreamingResponse(gerar_linhas(), media_type="application/x-ndjson")
+
+@router.post("/upload/lote", response_model=ConciliacaoLoteResult, dependencies=[Depends(RoleChecker(["ADMIN", "ANALISTA"]))])
+async def upload_ofx_lote(
+    files: Annotated[list[UploadFile], File(...)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+    estrategia: EstrategiaConciliacao = EstrategiaConciliacao.GULOSA,
+    agrupar: bool = False,
+    deduplicar: bool = True,
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Recebe vários arquivos .ofx (ex.: um por conta ou por mês). Os arquivos são lidos
+    em paralelo no pool de processos, as transações repetidas entre arquivos (mesma
+    conta e FITID) são descartadas e a conciliação roda uma única vez sobre o total.
+    """
+    for file in files:
+        if not file.filename.lower().endswith('.ofx'):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Arquivo inválido: {file.filename}. Deve ser um arquivo .ofx"
+            )
+
+    loop = asyncio.get_running_loop()
+    pool = get_process_pool()
+    conteudos = [await file.read() for file in files]
+    leituras = await asyncio.gather(
+        *(loop.run_in_executor(pool, OfxParserService.parse_file_cronometrado, c) for c in conteudos),
+        return_exceptions=True
+    )
+
+    transacoes: list[OfxTransactionSchema] = []
+    vistos: set[tuple[str | None, str]] = set()
+    arquivos = []
+    for file, leitura in zip(files, leituras):
+        if isinstance(leitura, Exception):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Erro ao processar arquivo OFX {file.filename}: {str(leitura)}"
+            )
+        lidas, segundos = leitura
+        duplicadas = 0
+        for tx in lidas:
+            chave = (tx.conta, tx.id)
+            if chave in vistos:
+                duplicadas += 1
+                continue
+            vistos.add(chave)
+            transacoes.append(tx)
+        arquivos.append(ArquivoConciliacao(
+            nome=file.filename,
+            transacoes=len(lidas),
+            duplicadas=duplicadas,
+            tempo_leitura_ms=round(segundos * 1000, 3)
+        ))
+
+    inicio = time.perf_counter()
+    service = ConciliacaoService(db)
+    resultados = await service.processar_ofx(transacoes, estrategia, agrupar=agrupar, deduplicar=deduplicar)
+
+    return ConciliacaoLoteResult(
+        arquivos=arquivos,
+        tempo_conciliacao_ms=round((time.perf_counter() - inicio) * 1000, 3),
+        resultados=resultados
+    )
+
+# Intervalo entre consultas de progresso no stream SSE
+INTERVALO_EVENTOS = 1.0
+
+@router.post("/jobs", response_model=ConciliacaoJobPublic, status_code=status.HTTP_202_ACCEPTED, dependencies=[Depends(RoleChecker(["ADMIN", "ANALISTA"]))])
+async def criar_job_conciliacao(
+    transacoes: list[OfxTransactionSchema],
+    db: Annotated[AsyncSession, Depends(get_db)],
+    estrategia: EstrategiaConciliacao = EstrategiaConciliacao.GULOSA,
+    agrupar: bool = False,
+    deduplicar: bool = True,
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Enfileira a conciliação e retorna o job imediatamente; o progresso é consultado
+    em /jobs/{id} (ou /jobs/{id}/eventos) e os resultados em /jobs/{id}/resultados.
+    """
+    job = await ConciliacaoJobService(db).criar(transacoes, estrategia, agrupar, current_user.id, deduplicar)
+    worker.notificar()
+    return job
+
+@router.post("/jobs/upload", response_model=ConciliacaoJobPublic, status_code=status.HTTP_202_ACCEPTED, dependencies=[Depends(RoleChecker(["ADMIN", "ANALISTA"]))])
+async def criar_job_conciliacao_upload(
+    file: Annotated[UploadFile, File(...)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+    estrategia: EstrategiaConciliacao = EstrategiaConciliacao.GULOSA,
+    agrupar: bool = False,
+    deduplicar: bool = True,
+    current_user: Usuario = Depends(get_current_user)
+):
+    if not file.filename.lower().endswith('.ofx'):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Arquivo inválido. Deve ser um arquivo .ofx"
+        )
+
+    content = await file.read()
+    try:
+        loop = asyncio.get_running_loop()
+        transacoes = await loop.run_in_executor(get_process_pool(), OfxParserService.parse_file, content)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Erro ao processar arquivo OFX: {str(e)}"
+        )
+
+    job = await ConciliacaoJobService(db).criar(transacoes, estrategia, agrupar, current_user.id, deduplicar)
+    worker.notificar()
+    return job
+
+async def _obter_job(db: AsyncSession, job_id: uuid.UUID):
+    job = await ConciliacaoJobService(db).obter(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job de conciliação não encontrado")
+    return job
+
+@router.get("/jobs/{job_id}", response_model=ConciliacaoJobPublic, dependencies=[Depends(RoleChecker(["ADMIN", "ANALISTA"]))])
+async def obter_job_conciliacao(
+    job_id: uuid.UUID,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    current_user: Usuario = Depends(get_current_user)
+):
+    return await _obter_job(db, job_id)
+
+@router.get("/jobs/{job_id}/eventos", dependencies=[Depends(RoleChecker(["ADMIN", "ANALISTA"]))])
+async def eventos_job_conciliacao(
+    job_id: uuid.UUID,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Server-Sent Events com o progresso do job; o stream termina quando o job
+    chega a CONCLUIDO ou ERRO.
+    """
+    await _obter_job(db, job_id)
+
+    async def gerar_eventos():
+        ultimo = None
+        while True:
+            job = await ConciliacaoJobService(db).obter(job_id)
+            # Encerra a transação (somente leitura) para a próxima consulta enxergar o progresso do worker
+            await db.commit()
+            dados = ConciliacaoJobPublic.model_validate(job).model_dump_json()
+            if dados != ultimo:
+                yield f"event: progresso\ndata: {dados}\n\n"
+                ultimo = dados
+            if job.status in (StatusJob.CONCLUIDO, StatusJob.ERRO):
+                break
+            await asyncio.sleep(INTERVALO_EVENTOS)
+
+    return StreamingResponse(gerar_eventos(), media_type="text/event-stream")
+
+@router.get("/jobs/{job_id}/resultados", response_model=list[ConciliacaoResult], dependencies=[Depends(RoleChecker(["ADMIN", "ANALISTA"]))])
+async def resultados_job_conciliacao(
+    job_id: uuid.UUID,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    offset: Annotated[int, Query(ge=0)] = 0,
+    limit: Annotated[int | None, Query(ge=1)] = None,
+    current_user: Usuario = Depends(get_current_user)
+):
+    await _obter_job(db, job_id)
+    return await ConciliacaoJobService(db).resultados(job_id, offset, limit)
+
+@router.post("/aplicar", response_model=AplicacaoConciliacaoResult, dependencies=[Depends(RoleChecker(["ADMIN", "ANALISTA"]))])
+async def aplicar_conciliacao(
+    dados: AplicarConciliacaoRequest,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Baixa as sugestões aceitas em uma única transação: os lançamentos conciliados
+    passam a PAGO (data_pagamento = data da transação, valor_realizado = valor) e a
+    diferença entre o valor do banco e o do lançamento vira uma taxa paga. Itens
+    cujo lançamento não está mais pendente são devolvidos em `ignorados`; taxa
+    sugerida divergente ou diferença fora da tolerância recusam a requisição (422).
+    """
+    service = AplicacaoConciliacaoService(db)
+    try:
+        return await service.aplicar(dados.itens, dados.centro_custo_taxa_id)
+    except AplicacaoInvalida as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_CONTENT, detail=[
+            {"loc": ["body", "itens", indice, campo], "msg": mensagem, "type": TIPOS_ERRO_APLICACAO[campo]}
+            for indice, campo, mensagem in e.erros
+        ])
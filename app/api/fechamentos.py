@@ -0,0 +1,47 @@
+from datetime import date
+from typing import Annotated
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
+from app.services.fechamento import FechamentoService
+from app.schemas.fechamento import FechamentoCreate, FechamentoPublic
+from app.api.auth import get_current_user
+from app.models.usuario import Usuario
+from app.api.deps import RoleChecker
+
+router = APIRouter(prefix="/fechamentos", tags=["fechamentos"])
+
+@router.get("/", response_model=list[FechamentoPublic], dependencies=[Depends(RoleChecker(["ADMIN", "ANALISTA"]))])
+async def listar_fechamentos(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    current_user: Usuario = Depends(get_current_user)
+):
+    return await FechamentoService(db).listar()
+
+@router.post("/", response_model=FechamentoPublic, status_code=status.HTTP_201_CREATED, dependencies=[Depends(RoleChecker(["ADMIN"]))])
+async def fechar_mes(
+    dados: FechamentoCreate,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Fecha o mês: os saldos acumulados até o último dia dele ficam congelados e
+    passam a ser o ponto de partida dos saldos desde o início no dashboard.
+    """
+    try:
+        return await FechamentoService(db).fechar(dados.mes, current_user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@router.delete("/{mes}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(RoleChecker(["ADMIN"]))])
+async def reabrir_mes(
+    mes: date,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Reabre o mês e os seguintes (para corrigir lançamentos de um período fechado).
+    """
+    if not await FechamentoService(db).reabrir(mes):
+        raise HTTPException(status_code=404, detail="Mês não está fechado")
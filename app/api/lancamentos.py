@@ -2,58 +2,141 @@
 import uuid
 from typing import Annotated
 from datetime import date
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 
-from app.core.database import get_db
+from app.core.database import get_db, get_session_factory
+from app.core.projecao import Projecao
 from app.models.lancamento import Lancamento
 from app.models.processo import Processo
 from app.models.enums import StatusLancamento, TipoLancamento, NaturezaLancamento
-from app.schemas.lancamento import LancamentoCreate, LancamentoUpdate, LancamentoPublic
+from app.schemas.lancamento import (
+    LancamentoCreate, LancamentoUpdate, LancamentoPublic, LancamentosCompactos, LancamentosCriados, FormatoExportacao
+)
 from app.models.usuario import Usuario
 from app.services.lancamento import LancamentoService
+from app.services.exportacao import ExportacaoService, MEDIA_TYPES
+from app.services.lancamento_lote import LancamentoLoteService, LoteInvalido
 from app.api.deps import RoleChecker, get_current_user
 
 router = APIRouter(prefix="/lancamentos", tags=["lancamentos"])
 
-@router.get("/", response_model=list[LancamentoPublic], dependencies=[Depends(RoleChecker(["ADMIN", "ANALISTA", "ADVOGADO"]))])
+def _incluidos(lancamentos: list[Lancamento]) -> dict:
+    """
+    Entidades referenciadas pelos lançamentos, cada uma uma única vez por id.
+    """
+    incluidos = {"participantes": {}, "processos": {}, "cartoes": {}, "centros_custo": {}}
+    for lancamento in lancamentos:
+        incluidos["participantes"][lancamento.participante_id] = lancamento.participante
+        incluidos["centros_custo"][lancamento.centro_custo_id] = lancamento.centro_custo
+        if lancamento.cartao_id:
+            incluidos["cartoes"][lancamento.cartao_id] = lancamento.cartao
+        if lancamento.processo_id:
+            incluidos["processos"][lancamento.processo_id] = lancamento.processo
+            incluidos["participantes"][lancamento.processo.cliente_id] = lancamento.processo.cliente
+    return incluidos
+
+@router.get("/", response_model=list[LancamentoPublic] | LancamentosCompactos, dependencies=[Depends(RoleChecker(["ADMIN", "ANALISTA", "ADVOGADO"]))])
 async def read_lancamentos(
     db: Annotated[AsyncSession, Depends(get_db)],
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1),
+    cursor: str | None = None,
     data_inicio: date | None = None,
     data_fim: date | None = None,
     status: StatusLancamento | None = None,
     tipo: TipoLancamento | None = None,
     natureza: NaturezaLancamento | None = None,
     centro_custo_id: uuid.UUID | None = None,
+    compacto: bool = False,
+    fields: str | None = None,
     current_user: Usuario = Depends(get_current_user)
 ):
-    query = select(Lancamento).options(
-        selectinload(Lancamento.participante),
-        selectinload(Lancamento.processo).selectinload(Processo.cliente),
-        selectinload(Lancamento.cartao),
-        selectinload(Lancamento.centro_custo)
+    """
+    Lançamentos ordenados por (data_vencimento, id). Quando há mais páginas, o
+    cabeçalho X-Next-Cursor traz o `cursor` da próxima chamada.
+
+    Com `compacto` as linhas trazem só os ids dos relacionados, serializados uma
+    única vez no mapa `included` (LancamentosCompactos).
+
+    `fields` (ex.: "id,descricao,valor,centro_custo.nome") seleciona apenas
+    esses campos de LancamentoPublic, direto no SELECT.
+    """
+    filtros = dict(
+        data_inicio=data_inicio, data_fim=data_fim, status=status,
+        tipo=tipo, natureza=natureza, centro_custo_id=centro_custo_id
+    )
+    if fields is not None:
+        if compacto:
+            raise HTTPException(status_code=400, detail="fields não pode ser combinado com compacto")
+        try:
+            projecao = Projecao(Lancamento, LancamentoPublic, fields, obrigatorios=("id", "data_vencimento"))
+            linhas, next_cursor = await LancamentoService(db).listar(
+                filtros, limit, cursor, skip, consulta=projecao.select()
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return Response(
+            content=projecao.serializar(linhas), media_type="application/json",
+            headers={"X-Next-Cursor": next_cursor} if next_cursor else None
+        )
+
+    try:
+        lancamentos, next_cursor = await LancamentoService(db).listar(
+            filtros, limit, cursor, skip, options=(
+                selectinload(Lancamento.participante),
+                selectinload(Lancamento.processo).selectinload(Processo.cliente),
+                selectinload(Lancamento.cartao),
+                selectinload(Lancamento.centro_custo)
+            )
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if compacto:
+        return {"data": lancamentos, "included": _incluidos(lancamentos), "next_cursor": next_cursor}
+    return lancamentos
+
+@router.get("/exportar", dependencies=[Depends(RoleChecker(["ADMIN", "ANALISTA", "ADVOGADO"]))])
+async def exportar_lancamentos(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    session_factory=Depends(get_session_factory),
+    formato: FormatoExportacao = FormatoExportacao.CSV,
+    data_inicio: date | None = None,
+    data_fim: date | None = None,
+    status: StatusLancamento | None = None,
+    tipo: TipoLancamento | None = None,
+    natureza: NaturezaLancamento | None = None,
+    centro_custo_id: uuid.UUID | None = None,
+    fields: str | None = None,
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Todos os lançamentos dos filtros de read_lancamentos em um arquivo CSV,
+    NDJSON ou XLSX, enviado enquanto é lido do banco. `fields` escolhe as
+    colunas (padrão: CAMPOS_EXPORTACAO).
+    """
+    service = ExportacaoService(session_factory)
+    try:
+        projecao = service.projecao(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    filtros = dict(
+        data_inicio=data_inicio, data_fim=data_fim, status=status,
+        tipo=tipo, natureza=natureza, centro_custo_id=centro_custo_id
+    )
+    # A sessão da requisição (usada na autenticação) devolve a conexão ao pool antes
+    # do envio; a exportação abre a sua só enquanto lê as linhas
+    await db.close()
+    return StreamingResponse(
+        service.lancamentos(filtros, formato, projecao), media_type=MEDIA_TYPES[formato],
+        headers={"Content-Disposition": f'attachment; filename="lancamentos.{formato.value.lower()}"'}
     )
-    
-    if data_inicio:
-        query = query.where(Lancamento.data_vencimento >= data_inicio)
-    if data_fim:
-        query = query.where(Lancamento.data_vencimento <= data_fim)
-    if status:
-        query = query.where(Lancamento.status == status)
-    if tipo:
-        query = query.where(Lancamento.tipo == tipo)
-    if natureza:
-        query = query.where(Lancamento.natureza == natureza)
-    if centro_custo_id:
-        query = query.where(Lancamento.centro_custo_id == centro_custo_id)
-        
-    query = query.offset(skip).limit(limit)
-    result = await db.execute(query)
-    return result.scalars().all()
 
 @router.post("/", response_model=LancamentoPublic, status_code=status.HTTP_201_CREATED, dependencies=[Depends(RoleChecker(["ADMIN", "ANALISTA"]))])
 async def create_lancamento(
@@ -64,6 +147,26 @@ async def create_lancamento(
     service = LancamentoService(db)
     return await service.create(lancamento)
 
+@router.post("/bulk", response_model=LancamentosCriados, status_code=status.HTTP_201_CREATED, dependencies=[Depends(RoleChecker(["ADMIN", "ANALISTA"]))])
+async def create_lancamentos_bulk(
+    lancamentos: Annotated[list[LancamentoCreate], Body(min_length=1, max_length=5000)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+    current_user: Usuario = Depends(get_current_user)
+):
+    """
+    Inclui todos os lançamentos, e os reembolsos das despesas reembolsáveis, em
+    uma única transação. Se alguma linha for inválida nada é gravado e a
+    resposta 422 lista os erros por linha (loc = ["body", índice, campo]).
+    """
+    try:
+        criados, reembolsos = await LancamentoLoteService(db).criar(lancamentos)
+    except LoteInvalido as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_CONTENT, detail=[
+            {"loc": ["body", indice, campo], "msg": mensagem, "type": "lote_invalido"}
+            for indice, campo, mensagem in e.erros
+        ])
+    return LancamentosCriados(lancamentos=criados, reembolsos=reembolsos)
+
 @router.get("/{lancamento_id}", response_model=LancamentoPublic)
 async def read_lancamento(
     lancamento_id: uuid.UUID,
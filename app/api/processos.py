@@ -1,11 +1,12 @@
 
 import uuid
 from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.core.database import get_db
+from app.core.projecao import Projecao
 from app.models.processo import Processo
 from app.schemas.processo import ProcessoCreate, ProcessoUpdate, ProcessoPublic
 from app.api.auth import get_current_user
@@ -22,8 +23,22 @@ async def read_processos(
     db: Annotated[AsyncSession, Depends(get_db)],
     skip: int = 0,
     limit: int = 1000,
+    fields: str | None = None,
     current_user: Usuario = Depends(get_current_user)
 ):
+    """
+    `fields` (ex.: "id,numero,cliente.nome") seleciona apenas esses campos de
+    ProcessoPublic, direto no SELECT.
+    """
+    if fields is not None:
+        try:
+            projecao = Projecao(Processo, ProcessoPublic, fields)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        stmt = projecao.select().order_by(Processo.numero.desc()).offset(skip).limit(limit)
+        linhas = (await db.execute(stmt)).all()
+        return Response(content=projecao.serializar(linhas), media_type="application/json")
+
     stmt = select(Processo).options(selectinload(Processo.cliente)).order_by(Processo.numero.desc()).offset(skip).limit(limit)
     result = await db.execute(stmt)
     return result.scalars().all()
@@ -1,15 +1,23 @@
-from sqlalchemy import event, inspect
+from sqlalchemy import event, inspect, insert
 from sqlalchemy.orm import Session
 from app.models.audit_log import AuditLog
 from app.core.context import current_user_id_context
+import enum
 import uuid
 from datetime import datetime, date
+from decimal import Decimal
 
+# dados_antigos/dados_novos são JSON: Decimal vira texto (sem perder casas) e
+# enums gravam o valor, em vez de quebrar o flush com TypeError
 def serialize_value(v):
     if isinstance(v, (datetime, date)):
         return v.isoformat()
     if isinstance(v, uuid.UUID):
         return str(v)
+    if isinstance(v, Decimal):
+        return str(v)
+    if isinstance(v, enum.Enum):
+        return v.value
     return v
 
 def audit_listener(session, flush_context, instances):
@@ -43,9 +51,10 @@ def create_audit_entry(session, obj, action, user_id):
     dados_antigos = {}
     dados_novos = {}
     
-    for attr in state.attrs:
-        key = attr.key
-        history = attr.history
+    # Apenas colunas: relacionamentos não são serializáveis (e já aparecem como *_id)
+    for column_attr in state.mapper.column_attrs:
+        key = column_attr.key
+        history = state.attrs[key].history
         
         if action == "INSERT":
             val = getattr(obj, key)
@@ -84,5 +93,27 @@ def create_audit_entry(session, obj, action, user_id):
     )
     session.add(audit)
 
+async def registrar_auditoria_em_lote(session, tabela: str, acao: str, registros: list[tuple]):
+    """
+    Grava várias entradas de auditoria em um único INSERT multi-linha.
+
+    Para operações feitas com UPDATE/INSERT em lote (Core), que não passam pelo
+    before_flush. registros: lista de (registro_id, dados_antigos, dados_novos).
+    """
+    if not registros:
+        return
+    user_id = current_user_id_context.get()
+    await session.execute(insert(AuditLog), [
+        {
+            "tabela": tabela,
+            "registro_id": str(registro_id),
+            "acao": acao,
+            "usuario_id": user_id,
+            "dados_antigos": {k: serialize_value(v) for k, v in antigos.items()} if antigos else None,
+            "dados_novos": {k: serialize_value(v) for k, v in novos.items()} if novos else None,
+        }
+        for registro_id, antigos, novos in registros
+    ])
+
 def setup_audit_listeners(session_class):
     event.listen(session_class, "before_flush", audit_listener)
@@ -0,0 +1,230 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import date
+from functools import partial
+from typing import Any, Awaitable, Callable, Hashable
+from sqlalchemy import event, inspect
+from app.models.lancamento import Lancamento
+from app.models.processo import Processo
+
+logger = logging.getLogger(__name__)
+
+# Cache em memória (por processo) dos resultados de relatórios, invalidado a
+# partir dos commits: o flush registra quais dias x centros de custo foram
+# alterados e, após o commit, cada cache descarta só as entradas afetadas.
+
+class CacheLRU:
+    """
+    Cache LRU com expiração (TTL) e contadores de acertos/falhas.
+    """
+    def __init__(self, max_itens: int = 256, ttl: float = 300.0, relogio: Callable[[], float] = time.monotonic):
+        self.max_itens = max_itens
+        self.ttl = ttl
+        self._relogio = relogio
+        self._itens: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.acertos = 0
+        self.falhas = 0
+        self.remocoes = 0
+        self.obsoletos = 0
+        # Incrementada a cada invalidação: resultados calculados antes dela não são guardados
+        self.versao = 0
+
+    def obter(self, chave: Hashable) -> Any | None:
+        item = self._itens.get(chave)
+        if item is None or item[0] <= self._relogio():
+            # Entradas vencidas ficam até sair pelo LRU: podem ser servidas por obter_obsoleto
+            self.falhas += 1
+            return None
+        self._itens.move_to_end(chave)
+        self.acertos += 1
+        return item[1]
+
+    def obter_obsoleto(self, chave: Hashable, janela: float) -> Any | None:
+        """
+        Valor vencido há no máximo `janela` segundos (stale-while-revalidate).
+        """
+        item = self._itens.get(chave)
+        if item is None or item[0] + janela <= self._relogio():
+            return None
+        self.obsoletos += 1
+        return item[1]
+
+    def guardar(self, chave: Hashable, valor: Any, versao: int | None = None):
+        if versao is not None and versao != self.versao:
+            return
+        self._itens[chave] = (self._relogio() + self.ttl, valor)
+        self._itens.move_to_end(chave)
+        while len(self._itens) > self.max_itens:
+            self._itens.popitem(last=False)
+            self.remocoes += 1
+
+    def invalidar(self, afetada: Callable[[Hashable], bool]) -> int:
+        """
+        Remove as entradas cuja chave satisfaz `afetada`; retorna quantas saíram.
+        """
+        self.versao += 1
+        chaves = [chave for chave in self._itens if afetada(chave)]
+        for chave in chaves:
+            del self._itens[chave]
+        self.remocoes += len(chaves)
+        return len(chaves)
+
+    def limpar(self):
+        self.versao += 1
+        self.remocoes += len(self._itens)
+        self._itens.clear()
+
+    def estatisticas(self) -> dict:
+        return {
+            "itens": len(self._itens),
+            "max_itens": self.max_itens,
+            "ttl": self.ttl,
+            "acertos": self.acertos,
+            "falhas": self.falhas,
+            "remocoes": self.remocoes,
+            "obsoletos": self.obsoletos,
+            "taxa_acerto": self.acertos / (self.acertos + self.falhas) if self.acertos + self.falhas else 0.0,
+        }
+
+class RelatorioEmCache:
+    """
+    Relatório servido por um CacheLRU com cálculo compartilhado (single-flight):
+    requisições idênticas simultâneas aguardam o mesmo cálculo em vez de repetir
+    a consulta. Com `janela_obsoleta` > 0 (stale-while-revalidate), uma entrada
+    vencida há menos desse tempo é devolvida na hora e uma única tarefa em
+    segundo plano a recalcula. O cálculo abre sessão própria (session_factory),
+    pois pode continuar depois que a requisição que o iniciou terminou.
+    """
+    def __init__(
+        self,
+        cache: CacheLRU,
+        session_factory,
+        compartilhar: bool = True,
+        janela_obsoleta: float = 0.0
+    ):
+        self.cache = cache
+        self.session_factory = session_factory
+        self.compartilhar = compartilhar
+        self.janela_obsoleta = janela_obsoleta
+        self._em_andamento: dict[Hashable, asyncio.Task] = {}
+        self.compartilhados = 0
+
+    async def obter(self, chave: Hashable, calcular: Callable[[Any], Awaitable[Any]]) -> Any:
+        """
+        `calcular(db)` produz o valor da chave a partir de uma sessão.
+        """
+        valor = self.cache.obter(chave)
+        if valor is not None:
+            return valor
+
+        if self.janela_obsoleta:
+            obsoleto = self.cache.obter_obsoleto(chave, self.janela_obsoleta)
+            if obsoleto is not None:
+                self._iniciar(chave, calcular)
+                return obsoleto
+
+        if not self.compartilhar:
+            return await self._calcular(chave, calcular)
+        # shield: o cancelamento de uma requisição não interrompe o cálculo das demais
+        return await asyncio.shield(self._iniciar(chave, calcular))
+
+    def _iniciar(self, chave: Hashable, calcular) -> asyncio.Task:
+        tarefa = self._em_andamento.get(chave)
+        if tarefa is not None:
+            self.compartilhados += 1
+            return tarefa
+        tarefa = asyncio.create_task(self._calcular(chave, calcular))
+        self._em_andamento[chave] = tarefa
+        tarefa.add_done_callback(partial(self._concluir, chave))
+        return tarefa
+
+    def _concluir(self, chave: Hashable, tarefa: asyncio.Task):
+        if self._em_andamento.get(chave) is tarefa:
+            del self._em_andamento[chave]
+        if not tarefa.cancelled() and tarefa.exception() is not None:
+            logger.error("Falha ao calcular relatório %r", chave, exc_info=tarefa.exception())
+
+    async def _calcular(self, chave: Hashable, calcular) -> Any:
+        versao = self.cache.versao
+        async with self.session_factory() as db:
+            valor = await calcular(db)
+        self.cache.guardar(chave, valor, versao)
+        return valor
+
+    def estatisticas(self) -> dict:
+        return self.cache.estatisticas() | {
+            "em_andamento": len(self._em_andamento),
+            "compartilhados": self.compartilhados,
+        }
+
+@dataclass
+class Alteracoes:
+    """
+    O que uma transação alterou: (data de vencimento, centro de custo) dos
+    lançamentos tocados, se algum lançamento mudou (inclusive sem vencimento)
+    e se algum processo mudou (pipeline de recebíveis).
+    """
+    chaves: set[tuple[date, Any]] = field(default_factory=set)
+    lancamentos: bool = False
+    processos: bool = False
+
+    def sobrepoe(self, data_inicio: date, data_fim: date, centro_custo_id=None) -> bool:
+        return any(
+            data_inicio <= data <= data_fim and (centro_custo_id is None or centro == centro_custo_id)
+            for data, centro in self.chaves
+        )
+
+_ouvintes: list[Callable[[Alteracoes], None]] = []
+
+def ao_confirmar(ouvinte: Callable[[Alteracoes], None]):
+    """
+    Registra uma função chamada após cada commit que alterou lançamentos ou processos.
+    """
+    _ouvintes.append(ouvinte)
+    return ouvinte
+
+def _alteracoes(session) -> Alteracoes:
+    return session.info.setdefault("alteracoes_cache", Alteracoes())
+
+def marcar_alteracoes(session, chaves=(), processos: bool = False):
+    """
+    Anota dias x centros de custo alterados na transação corrente (usado também
+    pelas operações em lote que não passam pelo flush do ORM).
+    """
+    alteracoes = _alteracoes(session)
+    alteracoes.chaves.update(chaves)
+    alteracoes.lancamentos = True
+    alteracoes.processos = alteracoes.processos or processos
+
+# Campos do processo usados nos relatórios (pipeline de recebíveis)
+CAMPOS_PROCESSO = ("status", "valor_causa_estimado", "percentual_exito")
+
+def cache_listener(session, flush_context, instances):
+    novos_ou_removidos = list(session.new) + list(session.deleted)
+    if any(isinstance(o, Lancamento) for o in novos_ou_removidos) or any(
+        isinstance(o, Lancamento) and session.is_modified(o, include_collections=False) for o in session.dirty
+    ):
+        _alteracoes(session).lancamentos = True
+    if any(isinstance(o, Processo) for o in novos_ou_removidos) or any(
+        isinstance(o, Processo) and any(inspect(o).attrs[c].history.has_changes() for c in CAMPOS_PROCESSO)
+        for o in session.dirty
+    ):
+        _alteracoes(session).processos = True
+
+def _apos_commit(session):
+    alteracoes = session.info.pop("alteracoes_cache", None)
+    if alteracoes is None:
+        return
+    for ouvinte in _ouvintes:
+        ouvinte(alteracoes)
+
+def _apos_rollback(session):
+    session.info.pop("alteracoes_cache", None)
+
+def setup_cache_listeners(session_class):
+    event.listen(session_class, "before_flush", cache_listener)
+    event.listen(session_class, "after_commit", _apos_commit)
+    event.listen(session_class, "after_rollback", _apos_rollback)
@@ -23,4 +23,24 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Fuso horário do escritório: define o "dia" das datas de inclusão (criado_em é gravado com fuso)
+    FUSO_HORARIO: str = "America/Sao_Paulo"
+
+    # Processos usados na leitura paralela de arquivos OFX (None = número de CPUs)
+    OFX_PARSE_WORKERS: int | None = None
+
+    # Cache dos indicadores do dashboard (entradas e validade em segundos)
+    DASHBOARD_CACHE_MAX_ITENS: int = 256
+    DASHBOARD_CACHE_TTL: float = 300.0
+    # Requisições idênticas simultâneas compartilham um único cálculo
+    DASHBOARD_SINGLE_FLIGHT: bool = True
+    # Segundos após o vencimento em que o último resultado ainda é servido enquanto é recalculado (0 = desligado)
+    DASHBOARD_STALE_WHILE_REVALIDATE: float = 60.0
+    # Pontos por série na escolha automática da granularidade
+    DASHBOARD_MAX_PONTOS: int = 120
+
+    # Consultas independentes em paralelo: conexões por requisição e conexões extras no total do processo
+    CONSULTAS_PARALELAS_POR_REQUISICAO: int = 3
+    CONSULTAS_PARALELAS_MAX_CONEXOES: int = 6
+
 settings = Settings()
@@ -0,0 +1,72 @@
+import asyncio
+import re
+from collections import deque
+from typing import Any, Awaitable, Callable, Sequence
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+
+# Execução simultânea de consultas somente leitura independentes, cada uma em
+# uma conexão do pool. No PostgreSQL a sessão principal abre uma transação
+# REPEATABLE READ e exporta o snapshot (pg_export_snapshot); as conexões extras
+# o importam (SET TRANSACTION SNAPSHOT), de modo que todas as consultas enxergam
+# exatamente os mesmos dados.
+
+Consulta = Callable[[AsyncSession], Awaitable[Any]]
+
+# Conexões extras em uso por todas as requisições do processo: o que passar do
+# limite é executado na sessão principal, sem esperar por uma conexão livre
+_conexoes_extras = asyncio.Semaphore(settings.CONSULTAS_PARALELAS_MAX_CONEXOES)
+
+_SNAPSHOT = re.compile(r"^[0-9A-Fa-f-]+$")
+
+async def executar_em_paralelo(
+    db: AsyncSession,
+    consultas: Sequence[Consulta],
+    session_factory=None,
+    conexoes_por_chamada: int | None = None
+) -> list:
+    """
+    Executa `consulta(sessao)` para cada consulta e devolve os resultados na
+    mesma ordem. `db` é a sessão principal (sem transação iniciada); as demais
+    são abertas por `session_factory`, no máximo `conexoes_por_chamada` - 1 por
+    chamada. Sem session_factory, fora do PostgreSQL ou com `db` já em
+    transação, as consultas rodam uma após a outra em `db`.
+    """
+    resultados: list = [None] * len(consultas)
+    pendentes = deque(enumerate(consultas))
+
+    async def executar(sessao: AsyncSession):
+        while pendentes:
+            indice, consulta = pendentes.popleft()
+            resultados[indice] = await consulta(sessao)
+
+    if conexoes_por_chamada is None:
+        conexoes_por_chamada = settings.CONSULTAS_PARALELAS_POR_REQUISICAO
+    extras = min(len(consultas), conexoes_por_chamada) - 1
+    if (
+        session_factory is None or extras <= 0 or db.in_transaction()
+        or db.get_bind().dialect.name != "postgresql"
+    ):
+        await executar(db)
+        return resultados
+
+    await db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+    snapshot = (await db.execute(text("SELECT pg_export_snapshot()"))).scalar_one()
+    if not _SNAPSHOT.match(snapshot):
+        raise ValueError(f"Identificador de snapshot inesperado: {snapshot!r}")
+
+    async def executar_em_conexao_extra():
+        # Sem conexão extra disponível a consulta fica para a sessão principal
+        if _conexoes_extras.locked() or not pendentes:
+            return
+        async with _conexoes_extras:
+            async with session_factory() as sessao:
+                await sessao.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+                # SET não aceita parâmetros; o identificador foi validado acima
+                await sessao.execute(text(f"SET TRANSACTION SNAPSHOT '{snapshot}'"))
+                await executar(sessao)
+
+    # A transação de `db` (exportadora do snapshot) permanece aberta até todas terminarem
+    await asyncio.gather(executar(db), *(executar_em_conexao_extra() for _ in range(extras)))
+    return resultados
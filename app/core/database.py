@@ -20,3 +20,10 @@ class Base(DeclarativeBase):
 async def get_db():
     async with async_session() as session:
         yield session
+
+def get_session_factory():
+    """
+    Fábrica de sessões para quem precisa abrir a própria sessão, fora da
+    sessão da requisição (ex.: exportações em streaming).
+    """
+    return async_session
@@ -0,0 +1,281 @@
+import uuid
+from decimal import Decimal
+from sqlalchemy import event, inspect, select, func
+from sqlalchemy.dialects import postgresql, sqlite
+from app.core.cache import marcar_alteracoes
+from app.models.lancamento import Lancamento
+from app.models.processo import Processo
+from app.models.daily_ledger import DailyLedger, SEM_PROCESSO
+from app.models.fechamento import FechamentoMensal, SaldoFechamento
+from app.models.enums import StatusLancamento, StatusProcesso
+
+# Manutenção incremental do daily_ledger: cada flush que insere, altera ou remove
+# lançamentos (ou muda o status de um processo) aplica os deltas de valor e
+# quantidade nas chaves afetadas, com upsert, na mesma transação. Por aqui passam
+# todas as escritas de lançamentos (ORM e, via registrar_movimentos, as em lote):
+# é também onde se recusam as que mudam os saldos de um mês fechado.
+
+CAMPOS = ("data_vencimento", "centro_custo_id", "tipo", "natureza", "status", "processo_id", "valor")
+
+# Chaves estrangeiras do rollup e os relacionamentos que as preenchem no flush
+RELACIONAMENTOS = {"processo_id": "processo", "centro_custo_id": "centro_custo"}
+
+class PeriodoFechado(ValueError):
+    """
+    Alteração de lançamento com vencimento em mês já fechado.
+    """
+
+def _totais_fechados(estados: list[dict], fechado_ate) -> dict:
+    """
+    Valor e quantidade que os estados somam nos saldos congelados (vencimento até
+    `fechado_ate`, cancelados fora), por centro de custo, tipo e processo.
+    """
+    totais = {}
+    for estado in estados:
+        data = estado.get("data_vencimento")
+        if data is None or data > fechado_ate or estado.get("status") == StatusLancamento.CANCELADO:
+            continue
+        chave = (estado.get("centro_custo_id"), estado.get("tipo"), estado.get("processo_id"))
+        valor, quantidade = totais.get(chave, (Decimal(0), 0))
+        totais[chave] = (valor + Decimal(estado.get("valor") or 0), quantidade + 1)
+    return totais
+
+def verificar_periodo_aberto(session, antes: list[dict], depois: list[dict]):
+    """
+    PeriodoFechado se a troca dos estados `antes` pelos `depois` muda os saldos
+    congelados até o fim do último mês fechado: valor, tipo, centro de custo ou
+    processo de lançamento vencido até lá, inclusão, remoção, cancelamento ou
+    vencimento cruzando o fechamento. Baixas (PENDENTE -> PAGO) e demais campos
+    seguem livres. Para corrigir um mês fechado, reabra-o antes.
+    """
+    datas = [estado["data_vencimento"] for estado in antes + depois if estado.get("data_vencimento")]
+    if not datas:
+        return
+    fechado_ate = session.execute(select(func.max(FechamentoMensal.ate))).scalar()
+    if fechado_ate is None or min(datas) > fechado_ate:
+        return
+    if _totais_fechados(antes, fechado_ate) != _totais_fechados(depois, fechado_ate):
+        raise PeriodoFechado(
+            f"Lançamento com vencimento em mês fechado (até {fechado_ate:%d/%m/%Y}); reabra o mês para alterá-lo"
+        )
+
+def _padrao(campo: str):
+    coluna = Lancamento.__table__.c[campo]
+    return coluna.default.arg if coluna.default is not None and not callable(coluna.default.arg) else None
+
+def _estado_atual(obj: Lancamento) -> dict:
+    state = inspect(obj)
+    estado = {}
+    for campo in CAMPOS:
+        valor = getattr(obj, campo)
+        estado[campo] = valor if valor is not None else _padrao(campo)
+
+    # Relacionamento alterado (ex.: lancamento.processo = processo) prevalece sobre
+    # a chave estrangeira, que só é sincronizada durante o flush
+    for campo, relacionamento in RELACIONAMENTOS.items():
+        history = state.attrs[relacionamento].history
+        if history.added:
+            relacionado = history.added[0]
+            if relacionado is not None and relacionado.id is None:
+                relacionado.id = uuid.uuid4()
+            estado[campo] = relacionado.id if relacionado is not None else None
+    return estado
+
+def _estado_anterior(obj: Lancamento) -> dict | None:
+    """
+    Estado gravado, pelo histórico dos atributos. None quando algum campo foi
+    atribuído sem valor anterior no histórico (atributo expirado ou não carregado
+    antes da atribuição): nesse caso o estado é lido do banco.
+    """
+    state = inspect(obj)
+    estado = {}
+    for campo in CAMPOS:
+        history = state.attrs[campo].history
+        if history.deleted:
+            estado[campo] = history.deleted[0]
+        elif history.added:
+            return None
+        else:
+            estado[campo] = getattr(obj, campo)
+    return estado
+
+def _estados_anteriores(session, objs: list[Lancamento]) -> list[dict]:
+    estados = [_estado_anterior(o) for o in objs]
+    faltantes = [o.id for o, estado in zip(objs, estados) if estado is None]
+    if faltantes:
+        # before_flush: as linhas ainda têm os valores anteriores à alteração
+        stmt = select(Lancamento.id, *(getattr(Lancamento, campo) for campo in CAMPOS)).where(
+            Lancamento.id.in_(faltantes)
+        )
+        gravados = {linha.id: {campo: getattr(linha, campo) for campo in CAMPOS} for linha in session.execute(stmt)}
+        estados = [estado if estado is not None else gravados[o.id] for o, estado in zip(objs, estados)]
+    return estados
+
+def _status_processos(session, processo_ids: set) -> dict:
+    """
+    Status atual (inclusive alterações ainda não gravadas) de cada processo.
+    """
+    status = {}
+    faltantes = []
+    for processo_id in processo_ids:
+        obj = session.identity_map.get((Processo, (processo_id,), None))
+        if obj is None:
+            obj = next((o for o in session.new if isinstance(o, Processo) and o.id == processo_id), None)
+        if obj is not None:
+            status[processo_id] = obj.status or StatusProcesso.ATIVO
+        else:
+            faltantes.append(processo_id)
+    if faltantes:
+        stmt = select(Processo.id, Processo.status).where(Processo.id.in_(faltantes))
+        status.update({linha.id: linha.status for linha in session.execute(stmt)})
+    return status
+
+def _somar(deltas: dict, chave: tuple, valor: Decimal, quantidade: int):
+    anterior, quantidade_anterior = deltas.get(chave, (Decimal(0), 0))
+    deltas[chave] = (anterior + valor, quantidade_anterior + quantidade)
+
+def _acumular(deltas: dict, estado: dict, sinal: int, status_processos: dict):
+    if estado["data_vencimento"] is None or estado["centro_custo_id"] is None:
+        return
+    processo_status = status_processos.get(estado["processo_id"]) if estado["processo_id"] else None
+    chave = (
+        estado["data_vencimento"],
+        estado["centro_custo_id"],
+        estado["tipo"],
+        estado["natureza"],
+        estado["status"],
+        processo_status.value if processo_status else SEM_PROCESSO,
+    )
+    _somar(deltas, chave, sinal * Decimal(estado["valor"] or 0), sinal)
+
+def aplicar_deltas(session, deltas: dict):
+    """
+    Soma os deltas às linhas do daily_ledger (INSERT ... ON CONFLICT DO UPDATE).
+    """
+    linhas = [
+        {
+            "data": chave[0], "centro_custo_id": chave[1], "tipo": chave[2], "natureza": chave[3],
+            "status": chave[4], "status_processo": chave[5], "valor": valor, "quantidade": quantidade,
+        }
+        for chave, (valor, quantidade) in deltas.items() if valor or quantidade
+    ]
+    if not linhas:
+        return
+    marcar_alteracoes(session, {(linha["data"], linha["centro_custo_id"]) for linha in linhas})
+
+    insert = postgresql.insert if session.get_bind().dialect.name == "postgresql" else sqlite.insert
+    stmt = insert(DailyLedger)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[c.name for c in DailyLedger.__table__.primary_key.columns],
+        set_={
+            "valor": DailyLedger.valor + stmt.excluded.valor,
+            "quantidade": DailyLedger.quantidade + stmt.excluded.quantidade,
+        }
+    )
+    session.execute(stmt, linhas)
+
+def registrar_movimentos(session, removidos: list[dict], adicionados: list[dict]):
+    """
+    Ajusta o rollup para alterações feitas fora do ORM (UPDATE/INSERT em lote).
+    removidos/adicionados: estados (dicionários com CAMPOS) antes e depois.
+    Em sessões assíncronas: await db.run_sync(registrar_movimentos, removidos, adicionados).
+    PeriodoFechado se a alteração muda os saldos de um mês fechado.
+    """
+    verificar_periodo_aberto(session, removidos, adicionados)
+    processo_ids = {e["processo_id"] for e in removidos + adicionados if e.get("processo_id")}
+    status_processos = _status_processos(session, processo_ids)
+    deltas: dict = {}
+    for estado in removidos:
+        _acumular(deltas, estado, -1, status_processos)
+    for estado in adicionados:
+        _acumular(deltas, estado, 1, status_processos)
+    aplicar_deltas(session, deltas)
+
+def _mover_lancamentos_do_processo(session, processo: Processo, deltas: dict, deltas_fechados: dict):
+    """
+    Mudança de status do processo: os lançamentos já gravados dele trocam de chave,
+    no daily_ledger e nos saldos congelados de cada mês fechado que os inclui.
+    """
+    history = inspect(processo).attrs.status.history
+    if not history.deleted or not history.added or history.deleted[0] == history.added[0]:
+        return
+    antigo, novo = history.deleted[0], history.added[0]
+
+    stmt = select(
+        Lancamento.data_vencimento, Lancamento.centro_custo_id, Lancamento.tipo, Lancamento.natureza,
+        Lancamento.status, func.sum(Lancamento.valor).label("valor"), func.count().label("quantidade")
+    ).where(
+        Lancamento.processo_id == processo.id,
+        Lancamento.data_vencimento.isnot(None)
+    ).group_by(
+        Lancamento.data_vencimento, Lancamento.centro_custo_id, Lancamento.tipo, Lancamento.natureza, Lancamento.status
+    )
+    linhas = session.execute(stmt).all()
+    fechamentos = session.execute(select(FechamentoMensal.mes, FechamentoMensal.ate)).all() if linhas else []
+    for linha in linhas:
+        base = (linha.data_vencimento, linha.centro_custo_id, linha.tipo, linha.natureza, linha.status)
+        congelada = linha.centro_custo_id is not None and linha.status != StatusLancamento.CANCELADO
+        for status, sinal in ((antigo, -1), (novo, 1)):
+            valor = sinal * (linha.valor or Decimal(0))
+            quantidade = sinal * linha.quantidade
+            _somar(deltas, base + (status.value,), valor, quantidade)
+            if congelada:
+                for mes, ate in fechamentos:
+                    if linha.data_vencimento <= ate:
+                        _somar(deltas_fechados, (mes, linha.centro_custo_id, linha.tipo, status.value), valor, quantidade)
+
+def aplicar_deltas_fechados(session, deltas: dict):
+    """
+    Soma os deltas às linhas de saldos_fechamento (mês, centro de custo, tipo,
+    status do processo), como aplicar_deltas faz no daily_ledger.
+    """
+    linhas = [
+        {
+            "mes": chave[0], "centro_custo_id": chave[1], "tipo": chave[2], "status_processo": chave[3],
+            "valor": valor, "quantidade": quantidade,
+        }
+        for chave, (valor, quantidade) in deltas.items() if valor or quantidade
+    ]
+    if not linhas:
+        return
+    insert = postgresql.insert if session.get_bind().dialect.name == "postgresql" else sqlite.insert
+    stmt = insert(SaldoFechamento)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[c.name for c in SaldoFechamento.__table__.primary_key.columns],
+        set_={
+            "valor": SaldoFechamento.valor + stmt.excluded.valor,
+            "quantidade": SaldoFechamento.quantidade + stmt.excluded.quantidade,
+        }
+    )
+    session.execute(stmt, linhas)
+
+def ledger_listener(session, flush_context, instances):
+    novos = [o for o in session.new if isinstance(o, Lancamento)]
+    alterados = [o for o in session.dirty if isinstance(o, Lancamento) and session.is_modified(o)]
+    removidos = [o for o in session.deleted if isinstance(o, Lancamento)]
+    processos = [o for o in session.dirty if isinstance(o, Processo) and session.is_modified(o)]
+    if not (novos or alterados or removidos or processos):
+        return
+
+    antes = _estados_anteriores(session, alterados) + [_estado_atual(o) for o in removidos]
+    depois = [_estado_atual(o) for o in novos + alterados]
+    verificar_periodo_aberto(session, antes, depois)
+
+    deltas: dict = {}
+    deltas_fechados: dict = {}
+    for processo in processos:
+        _mover_lancamentos_do_processo(session, processo, deltas, deltas_fechados)
+
+    # Estados anteriores usam o status atual do processo, pois os lançamentos já
+    # gravados de um processo alterado foram movidos acima para o novo status.
+    status_processos = _status_processos(session, {e["processo_id"] for e in antes + depois if e["processo_id"]})
+    for estado in antes:
+        _acumular(deltas, estado, -1, status_processos)
+    for estado in depois:
+        _acumular(deltas, estado, 1, status_processos)
+
+    aplicar_deltas(session, deltas)
+    aplicar_deltas_fechados(session, deltas_fechados)
+
+def setup_ledger_listeners(session_class):
+    event.listen(session_class, "before_flush", ledger_listener)
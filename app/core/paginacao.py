@@ -0,0 +1,25 @@
+import base64
+import binascii
+import json
+import uuid
+from datetime import date
+
+# Cursor opaco da paginação por chave (keyset): a chave de ordenação da última
+# linha entregue, (data_vencimento, id), serializada em JSON e codificada em
+# base64 url-safe. O cliente só repassa o valor recebido em `next_cursor`.
+
+def codificar_cursor(data_vencimento: date | None, id: uuid.UUID) -> str:
+    bruto = json.dumps([data_vencimento.isoformat() if data_vencimento else None, str(id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(bruto.encode()).decode().rstrip("=")
+
+def decodificar_cursor(cursor: str) -> tuple[date | None, uuid.UUID]:
+    """
+    Chave (data_vencimento, id) contida no cursor. ValueError se o cursor não
+    foi gerado por codificar_cursor.
+    """
+    try:
+        bruto = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data_vencimento, id = json.loads(bruto)
+        return (date.fromisoformat(data_vencimento) if data_vencimento else None), uuid.UUID(id)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as exc:
+        raise ValueError("Cursor de paginação inválido") from exc
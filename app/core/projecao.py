@@ -0,0 +1,152 @@
+import functools
+from typing import get_args
+from pydantic import BaseModel, TypeAdapter, create_model
+from sqlalchemy import Select, inspect, select
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import aliased
+
+# Projeção de campos (sparse fieldsets): `fields=id,valor,centro_custo.nome`
+# vira um SELECT apenas com essas colunas e com LEFT JOIN só para os
+# relacionamentos citados. As linhas são montadas como dicts, sem instâncias do
+# ORM nem selectinload. Os campos aceitos são os do schema público da entidade;
+# um relacionamento sem subcampo ("processo") traz o objeto inteiro do schema.
+
+Caminho = tuple[str, ...]
+
+def _esquema_aninhado(esquema: type[BaseModel], nome: str) -> type[BaseModel] | None:
+    anotacao = esquema.model_fields[nome].annotation
+    for tipo in get_args(anotacao) or (anotacao,):
+        if isinstance(tipo, type) and issubclass(tipo, BaseModel):
+            return tipo
+    return None
+
+@functools.lru_cache(maxsize=256)
+def _esquema_parcial(esquema: type[BaseModel], caminhos: tuple[Caminho, ...]) -> type[BaseModel]:
+    """
+    Schema com apenas os campos de `caminhos`, mantendo tipos e validações do original.
+    """
+    campos = {}
+    for nome in dict.fromkeys(caminho[0] for caminho in caminhos):
+        subcaminhos = tuple(caminho[1:] for caminho in caminhos if caminho[0] == nome and len(caminho) > 1)
+        if subcaminhos:
+            aninhado = _esquema_parcial(_esquema_aninhado(esquema, nome), subcaminhos)
+            campos[nome] = (aninhado | None, None)
+        else:
+            info = esquema.model_fields[nome]
+            campos[nome] = (info.annotation, info)
+    return create_model(f"{esquema.__name__}Parcial", **campos)
+
+@functools.lru_cache(maxsize=256)
+def _adaptador(esquema: type[BaseModel], caminhos: tuple[Caminho, ...], lista: bool = True) -> TypeAdapter:
+    parcial = _esquema_parcial(esquema, caminhos)
+    return TypeAdapter(list[parcial] if lista else parcial)
+
+class Projecao:
+    """
+    SELECT das colunas pedidas em `campos` (separados por vírgula, com "." para
+    relacionamentos) e montagem das linhas. `obrigatorios` são colunas da
+    entidade sempre selecionadas (ex.: a chave do cursor) e omitidas da resposta
+    quando não pedidas. ValueError para campos fora do schema.
+    """
+
+    def __init__(self, modelo, esquema: type[BaseModel], campos: str, obrigatorios: tuple[str, ...] = ("id",)):
+        self.modelo = modelo
+        self.esquema = esquema
+        self._colunas: dict[Caminho, object] = {}
+        self._ocultas: set[Caminho] = set()
+        self._entidades: dict[Caminho, object] = {(): modelo}
+        # Chave primária de cada relacionamento: NULL quando o LEFT JOIN não encontrou a linha
+        self._marcadores: dict[Caminho, str] = {}
+        self._juncoes = []
+
+        caminhos = [campo.strip() for campo in campos.split(",") if campo.strip()]
+        if not caminhos:
+            raise ValueError("Informe ao menos um campo em fields")
+        for caminho in caminhos:
+            self._adicionar(tuple(caminho.split(".")))
+        for nome in obrigatorios:
+            self._coluna((nome,), oculta=True)
+
+    def _adicionar(self, caminho: Caminho):
+        esquema = self.esquema
+        for i, nome in enumerate(caminho):
+            if nome not in esquema.model_fields:
+                raise ValueError(f"Campo desconhecido em fields: {'.'.join(caminho[:i + 1])}")
+            aninhado = _esquema_aninhado(esquema, nome)
+            if i < len(caminho) - 1:
+                if aninhado is None:
+                    raise ValueError(f"{'.'.join(caminho[:i + 1])} não é um relacionamento")
+                esquema = aninhado
+            elif aninhado is not None:
+                for campo in aninhado.model_fields:
+                    self._adicionar(caminho + (campo,))
+                return
+        self._coluna(caminho)
+
+    def _entidade(self, prefixo: Caminho):
+        if prefixo not in self._entidades:
+            relacao = getattr(self._entidade(prefixo[:-1]), prefixo[-1])
+            alias = aliased(relacao.property.mapper.class_)
+            self._juncoes.append(relacao.of_type(alias))
+            self._entidades[prefixo] = alias
+            chave = prefixo + (inspect(alias).mapper.primary_key[0].key,)
+            self._coluna(chave, oculta=True)
+            self._marcadores[prefixo] = ".".join(chave)
+        return self._entidades[prefixo]
+
+    def _coluna(self, caminho: Caminho, oculta: bool = False):
+        entidade = self._entidade(caminho[:-1])
+        if caminho in self._colunas:
+            if not oculta:
+                self._ocultas.discard(caminho)
+            return
+        if caminho[-1] not in inspect(entidade).mapper.column_attrs:
+            raise ValueError(f"Campo não pode ser projetado: {'.'.join(caminho)}")
+        self._colunas[caminho] = getattr(entidade, caminho[-1])
+        if oculta:
+            self._ocultas.add(caminho)
+
+    @property
+    def _visiveis(self) -> tuple[Caminho, ...]:
+        return tuple(caminho for caminho in self._colunas if caminho not in self._ocultas)
+
+    @property
+    def rotulos(self) -> list[str]:
+        """
+        Rótulos das colunas pedidas, na ordem do SELECT (ex.: "centro_custo.nome").
+        """
+        return [".".join(caminho) for caminho in self._visiveis]
+
+    def select(self) -> Select:
+        stmt = select(*(coluna.label(".".join(caminho)) for caminho, coluna in self._colunas.items()))
+        stmt = stmt.select_from(self.modelo)
+        for juncao in self._juncoes:
+            stmt = stmt.outerjoin(juncao)
+        return stmt
+
+    def montar(self, linha: Row) -> dict:
+        valores = linha._mapping
+        raiz: dict = {}
+        for caminho in self._colunas:
+            if caminho in self._ocultas:
+                continue
+            destino = raiz
+            for i, nome in enumerate(caminho[:-1]):
+                if valores[self._marcadores[caminho[:i + 1]]] is None:
+                    destino[nome] = None
+                    break
+                destino = destino.setdefault(nome, {})
+            else:
+                destino[caminho[-1]] = valores[".".join(caminho)]
+        return raiz
+
+    def serializar(self, linhas: list[Row]) -> bytes:
+        """
+        JSON das linhas montadas, validado por um schema reduzido aos campos pedidos.
+        """
+        adaptador = _adaptador(self.esquema, self._visiveis)
+        return adaptador.dump_json(adaptador.validate_python([self.montar(linha) for linha in linhas]))
+
+    def serializar_linha(self, linha: Row) -> bytes:
+        adaptador = _adaptador(self.esquema, self._visiveis, lista=False)
+        return adaptador.dump_json(adaptador.validate_python(self.montar(linha)))
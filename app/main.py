@@ -1,11 +1,19 @@
 
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
 from app.core.audit import setup_audit_listeners
+from app.core.ledger import setup_ledger_listeners, PeriodoFechado
+from app.core.cache import setup_cache_listeners
 
 # Setup audit listeners for Session (underlying AsyncSession)
 setup_audit_listeners(Session)
+# Rollup diário (daily_ledger) mantido no mesmo ponto do flush
+setup_ledger_listeners(Session)
+# Invalidação dos caches de relatórios após cada commit
+setup_cache_listeners(Session)
 
 from app.api import auth
 from app.api import participantes
@@ -15,8 +23,18 @@ from app.api import cartoes
 from app.api import centros_custo
 from app.api import conciliacao
 from app.api import dashboard
+from app.api import fechamentos
+from app.services.ofx_parser import shutdown_process_pool
+from app.services.conciliacao_jobs import worker as conciliacao_worker
 
-app = FastAPI(title="Sistema Financeiro Jurídico")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    conciliacao_worker.iniciar()
+    yield
+    await conciliacao_worker.parar()
+    shutdown_process_pool()
+
+app = FastAPI(title="Sistema Financeiro Jurídico", lifespan=lifespan)
 
 # Configuração de CORS
 origins = [
@@ -34,8 +52,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Cursor da próxima página da listagem de lançamentos
+    expose_headers=["X-Next-Cursor"],
 )
 
+# Escrita que muda os saldos de um mês fechado é recusada no flush
+# (app/core/ledger.py), qualquer que seja a rota que alterou os lançamentos
+@app.exception_handler(PeriodoFechado)
+async def periodo_fechado_handler(request: Request, exc: PeriodoFechado):
+    return JSONResponse(status_code=status.HTTP_409_CONFLICT, content={"detail": str(exc)})
+
 app.include_router(auth.router)
 app.include_router(participantes.router)
 app.include_router(processos.router)
@@ -44,6 +70,7 @@ app.include_router(cartoes.router)
 app.include_router(centros_custo.router)
 app.include_router(conciliacao.router)
 app.include_router(dashboard.router)
+app.include_router(fechamentos.router)
 
 @app.get("/")
 async def root():
@@ -1,5 +1,5 @@
 
-from .enums import TipoParticipante, TipoLancamento, NaturezaLancamento, StatusLancamento
+from .enums import TipoParticipante, TipoLancamento, NaturezaLancamento, StatusLancamento, StatusJob
 from .participante import Participante
 from .processo import Processo
 from .lancamento import Lancamento
@@ -7,3 +7,7 @@ from .usuario import Usuario
 from .cartao_credito import CartaoCredito
 from .centro_custo import CentroCusto
 from .audit_log import AuditLog
+from .conciliacao_job import ConciliacaoJob, ConciliacaoJobResultado
+from .transacao_processada import TransacaoProcessada
+from .daily_ledger import DailyLedger
+from .fechamento import FechamentoMensal, SaldoFechamento
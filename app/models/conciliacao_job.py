@@ -0,0 +1,51 @@
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy import String, Text, Integer, Numeric, Boolean, Enum, ForeignKey, Uuid, DateTime, JSON, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+from app.core.database import Base
+from app.models.enums import StatusJob
+
+class ConciliacaoJob(Base):
+    """
+    Conciliação executada em segundo plano. As transações ficam no próprio job
+    (JSON) e o worker reserva jobs pendentes com SELECT ... FOR UPDATE SKIP LOCKED.
+    """
+    __tablename__ = "conciliacao_jobs"
+    __table_args__ = (
+        # Fila: jobs pendentes em ordem de chegada
+        Index("ix_conciliacao_jobs_status_criado_em", "status", "criado_em"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    status: Mapped[StatusJob] = mapped_column(Enum(StatusJob), default=StatusJob.PENDENTE)
+    estrategia: Mapped[str] = mapped_column(String(20))
+    agrupar: Mapped[bool] = mapped_column(Boolean, default=False)
+    deduplicar: Mapped[bool] = mapped_column(Boolean, default=True)
+    transacoes: Mapped[list] = mapped_column(JSON)
+    total: Mapped[int] = mapped_column(Integer)
+    processadas: Mapped[int] = mapped_column(Integer, default=0)
+    erro: Mapped[str | None] = mapped_column(Text, nullable=True)
+    usuario_id: Mapped[uuid.UUID | None] = mapped_column(Uuid(as_uuid=True), nullable=True)
+
+    criado_em: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    iniciado_em: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    atualizado_em: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    concluido_em: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+class ConciliacaoJobResultado(Base):
+    """
+    ConciliacaoResult persistido de um job, na ordem das transações (job_id, ordem).
+    """
+    __tablename__ = "conciliacao_job_resultados"
+
+    job_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("conciliacao_jobs.id", ondelete="CASCADE"), primary_key=True)
+    ordem: Mapped[int] = mapped_column(Integer, primary_key=True)
+    ofx_id: Mapped[str] = mapped_column(String)
+    lancamento_id: Mapped[str | None] = mapped_column(String(36), nullable=True)
+    lancamento_ids: Mapped[list | None] = mapped_column(JSON, nullable=True)
+    tipo_match: Mapped[str] = mapped_column(String(10))
+    valor_taxa_sugerida: Mapped[Decimal | None] = mapped_column(Numeric(10, 2), nullable=True)
+    mensagem: Mapped[str] = mapped_column(String)
+    conta: Mapped[str | None] = mapped_column(String(50), nullable=True)
@@ -0,0 +1,28 @@
+import uuid
+from datetime import date
+from decimal import Decimal
+from sqlalchemy import String, Date, Numeric, Integer, Enum, Uuid
+from sqlalchemy.orm import Mapped, mapped_column
+from app.core.database import Base
+from app.models.enums import TipoLancamento, NaturezaLancamento, StatusLancamento
+
+# Valor de status_processo para lançamentos sem processo vinculado
+SEM_PROCESSO = ""
+
+class DailyLedger(Base):
+    """
+    Totais diários dos lançamentos (por vencimento) mantidos incrementalmente pelo
+    hook de before_flush em app/core/ledger.py. Lançamentos sem data de vencimento
+    não entram no rollup.
+    """
+    __tablename__ = "daily_ledger"
+
+    data: Mapped[date] = mapped_column(Date, primary_key=True)
+    centro_custo_id: Mapped[uuid.UUID] = mapped_column(Uuid(as_uuid=True), primary_key=True)
+    tipo: Mapped[TipoLancamento] = mapped_column(Enum(TipoLancamento), primary_key=True)
+    natureza: Mapped[NaturezaLancamento] = mapped_column(Enum(NaturezaLancamento), primary_key=True)
+    status: Mapped[StatusLancamento] = mapped_column(Enum(StatusLancamento), primary_key=True)
+    status_processo: Mapped[str] = mapped_column(String(20), primary_key=True, default=SEM_PROCESSO)
+
+    valor: Mapped[Decimal] = mapped_column(Numeric(15, 2), default=0)
+    quantidade: Mapped[int] = mapped_column(Integer, default=0)
@@ -26,3 +26,9 @@ class StatusProcesso(str, enum.Enum):
     SUSPENSO = "SUSPENSO"
     ENCERRADO = "ENCERRADO"
     TRANSITO_JULGADO = "TRANSITO_JULGADO"
+
+class StatusJob(str, enum.Enum):
+    PENDENTE = "PENDENTE"
+    PROCESSANDO = "PROCESSANDO"
+    CONCLUIDO = "CONCLUIDO"
+    ERRO = "ERRO"
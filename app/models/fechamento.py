@@ -0,0 +1,40 @@
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from sqlalchemy import String, Date, Numeric, Integer, Enum, ForeignKey, Uuid, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+from app.core.database import Base
+from app.models.enums import TipoLancamento
+
+class FechamentoMensal(Base):
+    """
+    Mês fechado. Os saldos acumulados até `ate` (último dia do mês) ficam
+    congelados em saldos_fechamento; alterações de lançamentos com vencimento
+    até `ate` que mudariam esses saldos (valor, tipo, centro de custo, processo,
+    inclusão, remoção ou cancelamento) são recusadas (reabrir e fechar de novo
+    para corrigir). A baixa de um lançamento vencido segue permitida.
+    """
+    __tablename__ = "fechamentos_mensais"
+
+    mes: Mapped[date] = mapped_column(Date, primary_key=True)  # Primeiro dia do mês
+    ate: Mapped[date] = mapped_column(Date, unique=True)
+    fechado_em: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    usuario_id: Mapped[uuid.UUID | None] = mapped_column(Uuid(as_uuid=True), nullable=True)
+
+class SaldoFechamento(Base):
+    """
+    Totais acumulados desde o início até o fim do mês fechado, por centro de
+    custo, tipo e status do processo (lançamentos cancelados não entram). A
+    mudança de status de um processo move os totais dos seus lançamentos para a
+    nova chave, como no daily_ledger (app/core/ledger.py).
+    """
+    __tablename__ = "saldos_fechamento"
+
+    mes: Mapped[date] = mapped_column(Date, ForeignKey("fechamentos_mensais.mes", ondelete="CASCADE"), primary_key=True)
+    centro_custo_id: Mapped[uuid.UUID] = mapped_column(Uuid(as_uuid=True), primary_key=True)
+    tipo: Mapped[TipoLancamento] = mapped_column(Enum(TipoLancamento), primary_key=True)
+    status_processo: Mapped[str] = mapped_column(String(20), primary_key=True)
+
+    valor: Mapped[Decimal] = mapped_column(Numeric(15, 2), default=0)
+    quantidade: Mapped[int] = mapped_column(Integer, default=0)
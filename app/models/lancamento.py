@@ -2,7 +2,7 @@
 import uuid
 from datetime import date, datetime
 from decimal import Decimal
-from sqlalchemy import String, Date, Numeric, Enum, ForeignKey, Uuid, CheckConstraint, Boolean, DateTime
+from sqlalchemy import String, Date, Numeric, Enum, ForeignKey, Uuid, CheckConstraint, Boolean, DateTime, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -21,6 +21,22 @@ class Lancamento(Base):
             "(natureza != 'EXITO') OR (processo_id IS NOT NULL)",
             name="check_exito_requires_processo"
         ),
+        # Listagem e dashboard por período de vencimento; o id no fim atende a
+        # ordenação e a busca da paginação por cursor, (data_vencimento, id)
+        Index("ix_lancamentos_data_vencimento_id", "data_vencimento", "id"),
+        # Janela de candidatos da conciliação (PENDENTE) e listagem por status + período
+        Index("ix_lancamentos_status_data_vencimento_id", "status", "data_vencimento", "id"),
+        # Filtro por centro de custo (+ período)
+        Index("ix_lancamentos_centro_custo_data_vencimento_id", "centro_custo_id", "data_vencimento", "id"),
+        # Lançamentos de um processo e reembolsos de uma despesa: parciais, a maioria é NULL
+        Index(
+            "ix_lancamentos_processo_id", "processo_id",
+            postgresql_where=text("processo_id IS NOT NULL"), sqlite_where=text("processo_id IS NOT NULL")
+        ),
+        Index(
+            "ix_lancamentos_lancamento_pai_id", "lancamento_pai_id",
+            postgresql_where=text("lancamento_pai_id IS NOT NULL"), sqlite_where=text("lancamento_pai_id IS NOT NULL")
+        ),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -46,7 +62,7 @@ class Lancamento(Base):
     lancamento_pai_id: Mapped[uuid.UUID | None] = mapped_column(ForeignKey("lancamentos.id"), nullable=True)
     
     # Auditoria
-    criado_em: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    criado_em: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), index=True)
 
     # Relacionamentos
     participante: Mapped["Participante"] = relationship(back_populates="lancamentos")
@@ -0,0 +1,29 @@
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from sqlalchemy import String, Date, Numeric, Uuid, DateTime, JSON
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class TransacaoProcessada(Base):
+    """
+    Transação bancária (OFX) já conciliada, com a sugestão dada na época.
+    `chave` é o hash de (conta, FITID, valor, data); reimportações do mesmo
+    extrato são reconhecidas por ela e não passam de novo pela conciliação.
+    """
+    __tablename__ = "transacoes_processadas"
+
+    id: Mapped[uuid.UUID] = mapped_column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    chave: Mapped[str] = mapped_column(String(40), unique=True, index=True)
+    conta: Mapped[str | None] = mapped_column(String(50), nullable=True)
+    fitid: Mapped[str] = mapped_column(String)
+    valor: Mapped[Decimal] = mapped_column(Numeric(15, 2))
+    data: Mapped[date] = mapped_column(Date)
+
+    tipo_match: Mapped[str] = mapped_column(String(10))
+    lancamento_id: Mapped[str | None] = mapped_column(String(36), nullable=True)
+    lancamento_ids: Mapped[list | None] = mapped_column(JSON, nullable=True)
+    valor_taxa_sugerida: Mapped[Decimal | None] = mapped_column(Numeric(10, 2), nullable=True)
+
+    processado_em: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
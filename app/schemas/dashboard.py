@@ -0,0 +1,67 @@
+import enum
+from datetime import date
+from pydantic import BaseModel
+
+class Granularidade(str, enum.Enum):
+    DIA = "DIA"
+    SEMANA = "SEMANA"
+    MES = "MES"
+    TRIMESTRE = "TRIMESTRE"
+    AUTO = "AUTO"  # menor período que mantém a série dentro do limite de pontos
+
+class Comparacao(str, enum.Enum):
+    PERIODO_ANTERIOR = "PERIODO_ANTERIOR"
+    ANO_ANTERIOR = "ANO_ANTERIOR"
+    PERSONALIZADO = "PERSONALIZADO"  # a partir de comparacao_inicio, com a mesma duração
+
+class DashboardCards(BaseModel):
+    saldo_atual: float
+    burn_rate: float
+    ticket_medio_exito: float
+    pipeline_recebiveis: float
+
+class CashFlowPoint(BaseModel):
+    date: str
+    entradas: float
+    saidas: float
+
+class ProjectedFlowPoint(BaseModel):
+    date: str
+    realizado: float
+    projetado: float
+
+class ExpenseCategory(BaseModel):
+    name: str
+    value: float
+
+class DashboardComparacao(BaseModel):
+    """
+    Indicadores do período de comparação. Nas séries, `date` é a data alinhada ao
+    período analisado (o n-ésimo ponto de cada período na mesma data), para que
+    as curvas se sobreponham no gráfico.
+    """
+    data_inicio: date
+    data_fim: date
+    cards: DashboardCards
+    cash_flow: list[CashFlowPoint]
+    projected_flow: list[ProjectedFlowPoint]
+    expenses_by_category: list[ExpenseCategory]
+
+class DashboardData(BaseModel):
+    cards: DashboardCards
+    cash_flow: list[CashFlowPoint]
+    projected_flow: list[ProjectedFlowPoint]
+    expenses_by_category: list[ExpenseCategory]
+    comparacao: DashboardComparacao | None = None
+
+class CacheEstatisticas(BaseModel):
+    itens: int
+    max_itens: int
+    ttl: float
+    acertos: int
+    falhas: int
+    remocoes: int
+    obsoletos: int
+    taxa_acerto: float
+    em_andamento: int
+    compartilhados: int
@@ -0,0 +1,15 @@
+import uuid
+from datetime import date, datetime
+from pydantic import BaseModel
+
+class FechamentoCreate(BaseModel):
+    mes: date  # Qualquer dia do mês a fechar
+
+class FechamentoPublic(BaseModel):
+    mes: date
+    ate: date
+    fechado_em: datetime | None = None
+    usuario_id: uuid.UUID | None = None
+
+    class Config:
+        from_attributes = True
@@ -1,14 +1,20 @@
 
+import enum
 import uuid
 from datetime import date
 from decimal import Decimal
 from pydantic import BaseModel, Field
 from app.models.enums import TipoLancamento, NaturezaLancamento, StatusLancamento
 from app.schemas.participante import ParticipantePublic
-from app.schemas.processo import ProcessoPublic
+from app.schemas.processo import ProcessoBase, ProcessoPublic
 from app.schemas.cartao_credito import CartaoCreditoPublic
 from app.schemas.centro_custo import CentroCustoPublic
 
+class FormatoExportacao(str, enum.Enum):
+    CSV = "CSV"
+    NDJSON = "NDJSON"
+    XLSX = "XLSX"
+
 class LancamentoBase(BaseModel):
     descricao: str
     valor: Decimal = Field(..., max_digits=10, decimal_places=2)
@@ -56,3 +62,42 @@ class LancamentoPublic(LancamentoBase):
     
     class Config:
         from_attributes = True
+
+class LancamentoCompacto(LancamentoBase):
+    """
+    LancamentoPublic sem os objetos relacionados: só os ids, resolvidos em
+    LancamentosCompactos.included.
+    """
+    id: uuid.UUID
+
+    class Config:
+        from_attributes = True
+
+class ProcessoCompacto(ProcessoBase):
+    """
+    ProcessoPublic sem o cliente embutido (cliente_id aponta para included.participantes).
+    """
+    id: uuid.UUID
+
+    class Config:
+        from_attributes = True
+
+class LancamentosIncluidos(BaseModel):
+    participantes: dict[uuid.UUID, ParticipantePublic] = {}
+    processos: dict[uuid.UUID, ProcessoCompacto] = {}
+    cartoes: dict[uuid.UUID, CartaoCreditoPublic] = {}
+    centros_custo: dict[uuid.UUID, CentroCustoPublic] = {}
+
+class LancamentosCompactos(BaseModel):
+    """
+    Listagem compacta: cada entidade referenciada pelas linhas aparece uma
+    única vez em `included`, indexada pelo id.
+    """
+    data: list[LancamentoCompacto]
+    included: LancamentosIncluidos
+    next_cursor: str | None = None
+
+class LancamentosCriados(BaseModel):
+    lancamentos: list[LancamentoCompacto]
+    # Receitas de reembolso geradas para as despesas reembolsáveis com processo
+    reembolsos: list[LancamentoCompacto]
@@ -1,17 +1,77 @@
 
+import enum
+import uuid
 from decimal import Decimal
-from datetime import date
+from datetime import date, datetime
 from pydantic import BaseModel
+from app.models.enums import StatusJob
+
+class EstrategiaConciliacao(str, enum.Enum):
+    GULOSA = "GULOSA"  # cada transação escolhe o melhor candidato isoladamente
+    OTIMA = "OTIMA"    # atribuição um-para-um de custo mínimo por lote
 
 class OfxTransactionSchema(BaseModel):
     id: str
     data: date
     valor: Decimal
     descricao: str
+    conta: str | None = None  # ACCTID da conta do extrato, quando informado
 
 class ConciliacaoResult(BaseModel):
     ofx_id: str
     lancamento_id: str | None = None
-    tipo_match: str  # EXACT, PARTIAL, NONE
+    lancamento_ids: list[str] | None = None  # Preenchido apenas em GROUPED
+    tipo_match: str  # EXACT, PARTIAL, GROUPED, DUPLICATE, NONE
     valor_taxa_sugerida: Decimal | None = None
     mensagem: str
+    conta: str | None = None  # Conta da transação, devolvida em /aplicar
+
+class ArquivoConciliacao(BaseModel):
+    nome: str
+    transacoes: int
+    duplicadas: int  # FITIDs já vistos em arquivos anteriores do mesmo lote
+    tempo_leitura_ms: float
+
+class ConciliacaoLoteResult(BaseModel):
+    arquivos: list[ArquivoConciliacao]
+    tempo_conciliacao_ms: float
+    resultados: list[ConciliacaoResult]
+
+class ConciliacaoJobPublic(BaseModel):
+    id: uuid.UUID
+    status: StatusJob
+    estrategia: EstrategiaConciliacao
+    agrupar: bool
+    deduplicar: bool
+    total: int
+    processadas: int
+    erro: str | None = None
+    criado_em: datetime | None = None
+    iniciado_em: datetime | None = None
+    concluido_em: datetime | None = None
+
+    class Config:
+        from_attributes = True
+
+class ConciliacaoAceita(ConciliacaoResult):
+    """
+    Sugestão aceita pelo usuário, com a data e o valor da transação bancária.
+    """
+    data: date
+    valor: Decimal
+    mensagem: str = ""
+
+class AplicarConciliacaoRequest(BaseModel):
+    itens: list[ConciliacaoAceita]
+    # Centro de custo das taxas geradas; sem ele, usa o do lançamento conciliado
+    centro_custo_taxa_id: uuid.UUID | None = None
+
+class ItemIgnorado(BaseModel):
+    ofx_id: str
+    motivo: str
+
+class AplicacaoConciliacaoResult(BaseModel):
+    lancamentos_pagos: int
+    taxas_criadas: int
+    taxa_ids: list[uuid.UUID]
+    ignorados: list[ItemIgnorado]
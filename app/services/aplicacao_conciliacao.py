@@ -0,0 +1,208 @@
+import uuid
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from sqlalchemy import select, update, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.audit import registrar_auditoria_em_lote
+from app.core.ledger import CAMPOS, registrar_movimentos
+from app.models.lancamento import Lancamento
+from app.models.enums import TipoLancamento, NaturezaLancamento, StatusLancamento
+from app.schemas.ofx import ConciliacaoAceita, AplicacaoConciliacaoResult, ItemIgnorado
+from app.services.conciliacao import TOLERANCIA_PERCENTUAL
+from app.services.deduplicacao import registrar_processadas
+
+# Tipos de correspondência que podem ser aplicados
+TIPOS_APLICAVEIS = {"EXACT", "PARTIAL", "GROUPED", "DUPLICATE"}
+
+class AplicacaoInvalida(ValueError):
+    """
+    Itens recusados da requisição: (índice, campo, mensagem). Nada é gravado.
+    """
+    def __init__(self, erros: list[tuple[int, str, str]]):
+        super().__init__(f"{len(erros)} item(ns) inválido(s)")
+        self.erros = erros
+
+class AplicacaoConciliacaoService:
+    """
+    Baixa em lote das sugestões aceitas da conciliação: lançamentos marcados como
+    PAGO com UPDATEs por conjunto (um por data de pagamento), taxas criadas em um
+    INSERT multi-linha, auditoria e transações baixadas (deduplicação) gravadas
+    em lote, tudo em uma única transação.
+    """
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def aplicar(
+        self, itens: list[ConciliacaoAceita], centro_custo_taxa_id: uuid.UUID | None = None
+    ) -> AplicacaoConciliacaoResult:
+        ignorados: list[ItemIgnorado] = []
+        solicitados: list[tuple[int, ConciliacaoAceita, list[uuid.UUID]]] = []
+        for indice, item in enumerate(itens):
+            ids = self._ids_do_item(item)
+            if ids is None:
+                ignorados.append(ItemIgnorado(ofx_id=item.ofx_id, motivo="Item sem lançamento correspondente."))
+            else:
+                solicitados.append((indice, item, ids))
+
+        lancamentos = await self._bloquear_pendentes({i for _, _, ids in solicitados for i in ids})
+
+        por_data: dict[date, list[uuid.UUID]] = defaultdict(list)
+        baixados: list[ConciliacaoAceita] = []
+        taxas = []
+        usados: set[uuid.UUID] = set()
+        erros: list[tuple[int, str, str]] = []
+        for indice, item, ids in solicitados:
+            if any(i not in lancamentos or i in usados for i in ids):
+                ignorados.append(ItemIgnorado(
+                    ofx_id=item.ofx_id,
+                    motivo="Lançamento inexistente, já baixado ou repetido na requisição."
+                ))
+                continue
+            usados.update(ids)
+            por_data[item.data].extend(ids)
+
+            if len(ids) > 1 and item.tipo_match != "GROUPED":
+                erros.append((
+                    indice, "lancamento_ids",
+                    f"Só correspondências GROUPED baixam mais de um lançamento ({item.tipo_match})"
+                ))
+                continue
+            grupo = [lancamentos[i] for i in ids]
+            try:
+                valor_taxa = self._valor_taxa(item, grupo)
+            except ValueError as e:
+                erros.append((indice, "valor_taxa_sugerida", str(e)))
+                continue
+            if valor_taxa:
+                taxas.append(self._taxa(item, grupo, valor_taxa, centro_custo_taxa_id))
+                item = item.model_copy(update={"valor_taxa_sugerida": valor_taxa})
+            baixados.append(item)
+
+        if erros:
+            raise AplicacaoInvalida(erros)
+
+        # UPDATE/INSERT em lote não passam pelo flush do ORM: ajusta o daily_ledger
+        # aqui, antes deles, pois é também a verificação de mês fechado
+        pagos = [lancamentos[i] for ids in por_data.values() for i in ids]
+        await self.db.run_sync(
+            registrar_movimentos,
+            [{campo: getattr(l, campo) for campo in CAMPOS} for l in pagos],
+            [{campo: getattr(l, campo) for campo in CAMPOS} | {"status": StatusLancamento.PAGO} for l in pagos]
+            + [{campo: taxa[campo] for campo in CAMPOS} for taxa in taxas]
+        )
+
+        for data_pagamento, ids in por_data.items():
+            await self.db.execute(
+                update(Lancamento)
+                .where(Lancamento.id.in_(ids), Lancamento.status == StatusLancamento.PENDENTE)
+                .values(status=StatusLancamento.PAGO, data_pagamento=data_pagamento, valor_realizado=Lancamento.valor)
+                .execution_options(synchronize_session=False)
+            )
+
+        if taxas:
+            await self.db.execute(insert(Lancamento), taxas)
+
+        await registrar_auditoria_em_lote(self.db, Lancamento.__tablename__, "UPDATE", [
+            (
+                i,
+                {
+                    "status": lancamentos[i].status,
+                    "data_pagamento": lancamentos[i].data_pagamento,
+                    "valor_realizado": lancamentos[i].valor_realizado
+                },
+                {"status": StatusLancamento.PAGO, "data_pagamento": data_pagamento, "valor_realizado": lancamentos[i].valor},
+            )
+            for data_pagamento, ids in por_data.items() for i in ids
+        ])
+        await registrar_auditoria_em_lote(self.db, Lancamento.__tablename__, "INSERT", [
+            (taxa["id"], None, {k: v for k, v in taxa.items() if v is not None}) for taxa in taxas
+        ])
+        # Reimportações do extrato passam a devolver estas transações como DUPLICATE
+        await registrar_processadas(self.db, baixados)
+        await self.db.commit()
+
+        return AplicacaoConciliacaoResult(
+            lancamentos_pagos=len(usados),
+            taxas_criadas=len(taxas),
+            taxa_ids=[taxa["id"] for taxa in taxas],
+            ignorados=ignorados
+        )
+
+    @staticmethod
+    def _ids_do_item(item: ConciliacaoAceita) -> list[uuid.UUID] | None:
+        if item.tipo_match not in TIPOS_APLICAVEIS:
+            return None
+        brutos = item.lancamento_ids or ([item.lancamento_id] if item.lancamento_id else [])
+        try:
+            ids = [uuid.UUID(i) for i in brutos]
+        except ValueError:
+            return None
+        return ids or None
+
+    async def _bloquear_pendentes(self, ids: set[uuid.UUID]) -> dict[uuid.UUID, Lancamento]:
+        """
+        Carrega (com FOR UPDATE) os lançamentos ainda pendentes entre os solicitados.
+        """
+        if not ids:
+            return {}
+        stmt = (
+            select(Lancamento)
+            .where(Lancamento.id.in_(ids), Lancamento.status == StatusLancamento.PENDENTE)
+            .with_for_update()
+        )
+        return {lancamento.id: lancamento for lancamento in (await self.db.execute(stmt)).scalars()}
+
+    @staticmethod
+    def _valor_taxa(item: ConciliacaoAceita, grupo: list[Lancamento]) -> Decimal:
+        """
+        Diferença entre o valor do banco e o dos lançamentos (soma dos valores
+        absolutos, no GROUPED), calculada aqui e não recebida do cliente.
+        ValueError se `valor_taxa_sugerida` foi enviado com outro valor ou se a
+        diferença passa de TOLERANCIA_PERCENTUAL.
+        """
+        valor_lancamentos = sum((abs(lancamento.valor) for lancamento in grupo), Decimal(0))
+        valor = abs(abs(item.valor) - valor_lancamentos).quantize(Decimal("0.01"))
+        if item.valor_taxa_sugerida is not None and Decimal(item.valor_taxa_sugerida) != valor:
+            raise ValueError(f"Taxa sugerida ({item.valor_taxa_sugerida}) difere da diferença de valores ({valor})")
+        if valor and (not valor_lancamentos or valor / valor_lancamentos * 100 >= TOLERANCIA_PERCENTUAL):
+            raise ValueError(f"Diferença de valores ({valor}) acima da tolerância de {TOLERANCIA_PERCENTUAL}%")
+        return valor
+
+    @staticmethod
+    def _taxa(
+        item: ConciliacaoAceita, grupo: list[Lancamento], valor: Decimal, centro_custo_taxa_id: uuid.UUID | None
+    ) -> dict:
+        """
+        Lançamento (já pago) da diferença entre o valor do banco e o dos
+        lançamentos: despesa quando o banco ficou com a diferença (recebeu-se menos
+        ou pagou-se mais) e receita no caso contrário (juros recebidos, desconto
+        obtido). Participante, processo e centro de custo vêm do primeiro lançamento.
+        """
+        lancamento = grupo[0]
+        valor_banco = abs(item.valor)
+        valor_lancamento = sum((abs(l.valor) for l in grupo), Decimal(0))
+        if lancamento.tipo == TipoLancamento.RECEITA:
+            tipo = TipoLancamento.DESPESA if valor_banco < valor_lancamento else TipoLancamento.RECEITA
+        else:
+            tipo = TipoLancamento.DESPESA if valor_banco > valor_lancamento else TipoLancamento.RECEITA
+
+        return {
+            "id": uuid.uuid4(),
+            "descricao": f"Taxa/ajuste de conciliação - {lancamento.descricao}",
+            "valor": valor,
+            "valor_realizado": valor,
+            "tipo": tipo,
+            "natureza": NaturezaLancamento.PONTUAL,
+            "status": StatusLancamento.PAGO,
+            "data_vencimento": item.data,
+            "data_pagamento": item.data,
+            "participante_id": lancamento.participante_id,
+            "processo_id": lancamento.processo_id,
+            "centro_custo_id": centro_custo_taxa_id or lancamento.centro_custo_id,
+            "reembolsavel": False,
+            "lancamento_pai_id": None,
+            "cartao_id": None,
+            "valor_previsto": None,
+        }
@@ -0,0 +1,126 @@
+import heapq
+
+# Atribuição um-para-um de custo mínimo em grafos bipartidos esparsos.
+# Lado esquerdo: transações; lado direito: candidatos. Cada vértice esquerdo
+# recebe no máximo um candidato e cada candidato atende no máximo um vértice.
+
+def componentes(arestas: list[list[tuple[int, int]]], n_direita: int) -> list[list[int]]:
+    """
+    Agrupa os vértices esquerdos em componentes conexas (via candidatos em comum).
+    Componentes são independentes e podem ser resolvidas separadamente.
+    """
+    n_esquerda = len(arestas)
+    pai = list(range(n_esquerda + n_direita))
+
+    def raiz(v: int) -> int:
+        while pai[v] != v:
+            pai[v] = pai[pai[v]]
+            v = pai[v]
+        return v
+
+    for x, vizinhos in enumerate(arestas):
+        rx = raiz(x)
+        for y, _ in vizinhos:
+            ry = raiz(n_esquerda + y)
+            if ry != rx:
+                pai[ry] = rx
+
+    grupos: dict[int, list[int]] = {}
+    for x, vizinhos in enumerate(arestas):
+        if vizinhos:
+            grupos.setdefault(raiz(x), []).append(x)
+    return list(grupos.values())
+
+def emparelhar(arestas: list[list[tuple[int, int]]], n_direita: int) -> list[int | None]:
+    """
+    Retorna, para cada vértice esquerdo, o candidato atribuído (ou None).
+
+    Maximiza o número de pares e, entre os emparelhamentos máximos, minimiza
+    a soma dos custos. arestas[x] lista (candidato, custo) com custo inteiro >= 0.
+    """
+    atribuicao: list[int | None] = [None] * len(arestas)
+
+    for grupo in componentes(arestas, n_direita):
+        if len(grupo) == 1:
+            # Caso trivial: uma transação, escolhe o menor custo (primeiro em caso de empate)
+            x = grupo[0]
+            atribuicao[x] = min(arestas[x], key=lambda aresta: aresta[1])[0]
+            continue
+
+        for x, y in _hungaro_esparso(grupo, arestas).items():
+            atribuicao[x] = y
+
+    return atribuicao
+
+def _hungaro_esparso(grupo: list[int], arestas: list[list[tuple[int, int]]]) -> dict[int, int]:
+    """
+    Algoritmo húngaro com caminhos mínimos (Dijkstra sobre custos reduzidos).
+
+    Cada vértice esquerdo ganha um candidato fictício exclusivo de custo
+    `sem_par`, maior que a soma de quaisquer custos reais da componente, o que
+    garante um emparelhamento perfeito do lado esquerdo e prioriza a
+    quantidade de pares reais.
+    """
+    maior_custo = max(c for x in grupo for _, c in arestas[x])
+    sem_par = (maior_custo + 1) * (len(grupo) + 1)
+
+    # Candidatos fictícios são codificados como inteiros negativos (-1 - x)
+    adjacencia = {x: arestas[x] + [(-1 - x, sem_par)] for x in grupo}
+
+    # Potenciais duais: custo reduzido = custo - pot_esq[x] - pot_dir[y] >= 0
+    pot_esq = {x: min(c for _, c in adjacencia[x]) for x in grupo}
+    pot_dir: dict[int, int] = {}
+    par_esq: dict[int, int] = {}
+    par_dir: dict[int, int] = {}
+
+    for raiz in grupo:
+        dist: dict[int, int] = {}
+        anterior: dict[int, int] = {}
+        fila: list[tuple[int, int]] = []
+        visitados_esq = [(raiz, 0)]
+        finalizados_dir: list[tuple[int, int]] = []
+        fechados: set[int] = set()
+
+        def explorar(x: int, dx: int):
+            px = pot_esq[x]
+            for y, c in adjacencia[x]:
+                nd = dx + c - px - pot_dir.get(y, 0)
+                if nd < dist.get(y, nd + 1):
+                    dist[y] = nd
+                    anterior[y] = x
+                    heapq.heappush(fila, (nd, y))
+
+        explorar(raiz, 0)
+        livre = None
+        total = 0
+        while fila:
+            d, y = heapq.heappop(fila)
+            if y in fechados or d > dist[y]:
+                continue
+            fechados.add(y)
+            finalizados_dir.append((y, d))
+            x = par_dir.get(y)
+            if x is None:
+                livre, total = y, d
+                break
+            visitados_esq.append((x, d))
+            explorar(x, d)
+
+        # Atualiza os potenciais apenas dos vértices alcançados
+        for x, dx in visitados_esq:
+            pot_esq[x] += total - dx
+        for y, dy in finalizados_dir:
+            pot_dir[y] = pot_dir.get(y, 0) - (total - dy)
+
+        # Inverte o caminho aumentante
+        y = livre
+        while True:
+            x = anterior[y]
+            proximo = par_esq.get(x)
+            par_esq[x] = y
+            par_dir[y] = x
+            if x == raiz:
+                break
+            y = proximo
+
+    return {x: y for x, y in par_esq.items() if y >= 0}
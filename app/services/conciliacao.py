@@ -1,87 +1,500 @@
-
-from datetime import timedelta
+import asyncio
+import time
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
 from decimal import Decimal
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
+from sqlalchemy.orm import joinedload
 from app.models.lancamento import Lancamento, StatusLancamento
-from app.schemas.ofx import OfxTransactionSchema, ConciliacaoResult
+from app.models.participante import Participante
+from app.schemas.ofx import OfxTransactionSchema, ConciliacaoResult, EstrategiaConciliacao
+from app.services.atribuicao import emparelhar
+from app.services import pontuacao_vetorizada
+from app.services.deduplicacao import chave_transacao, buscar_processadas, resultado_processada
+from app.services.soma_subconjunto import encontrar_combinacao, MAX_CANDIDATOS
+from app.services.similaridade import IndiceTrigramas
+
+# Tolerância de datas usada na busca de candidatos (+/- dias)
+JANELA_DIAS = 3
+# Diferença percentual máxima (exclusiva) para uma correspondência parcial
+TOLERANCIA_PERCENTUAL = Decimal("10")
+# Resolução do percentual no custo da atribuição ótima (1 unidade = 0,0001%)
+ESCALA_CUSTO = 10000
+# Tempo máximo (segundos) da busca de combinação agrupada por transação
+TEMPO_MAXIMO_AGRUPAMENTO = 0.05
+# Resolução da similaridade de descrição no custo da atribuição ótima
+ESCALA_SIMILARIDADE = 100
+
+class IndiceCandidatos:
+    """
+    Índice em memória dos lançamentos pendentes, ordenado por data de vencimento.
+    Permite resolver a janela de +/- JANELA_DIAS de cada transação via bisect,
+    sem nova consulta ao banco.
+    """
+    def __init__(self, lancamentos: list[Lancamento]):
+        # Guarda a posição original de carga para preservar a ordem de desempate
+        # (o primeiro candidato exato encontrado vence, como na busca por transação).
+        ordenados = sorted(enumerate(lancamentos), key=lambda par: par[1].data_vencimento)
+        self._posicoes = [posicao for posicao, _ in ordenados]
+        self._lancamentos = [lancamento for _, lancamento in ordenados]
+        self._datas = [lancamento.data_vencimento for lancamento in self._lancamentos]
+        self._por_dia: dict[date, tuple[list[Decimal], list[int]]] | None = None
+        self._trigramas: IndiceTrigramas | None = None
+
+    def __len__(self) -> int:
+        return len(self._lancamentos)
+
+    def limites(self, data: date, dias: int = JANELA_DIAS) -> tuple[int, int]:
+        inicio = bisect_left(self._datas, data - timedelta(days=dias))
+        fim = bisect_right(self._datas, data + timedelta(days=dias))
+        return inicio, fim
+
+    def __getitem__(self, indice: int) -> Lancamento:
+        return self._lancamentos[indice]
+
+    @property
+    def lancamentos(self) -> list[Lancamento]:
+        """Candidatos na ordem por data de vencimento."""
+        return self._lancamentos
+
+    @property
+    def posicoes(self) -> list[int]:
+        """Posição original de carga de cada candidato (na ordem por data)."""
+        return self._posicoes
+
+    def janela_indices(self, data: date, dias: int = JANELA_DIAS) -> list[int]:
+        """
+        Índices (na ordem por data) dos candidatos da janela, na ordem original de carga.
+        """
+        inicio, fim = self.limites(data, dias)
+        return sorted(range(inicio, fim), key=self._posicoes.__getitem__)
+
+    def janela(self, data: date, dias: int = JANELA_DIAS) -> list[Lancamento]:
+        return [self._lancamentos[i] for i in self.janela_indices(data, dias)]
+
+    def faixa_indices(self, data: date, valor_min: Decimal, valor_max: Decimal, dias: int = JANELA_DIAS) -> list[int]:
+        """
+        Como janela_indices, mas só com candidatos cujo valor absoluto está em [valor_min, valor_max].
+        Usa, para cada dia, os valores absolutos ordenados (montados na primeira chamada).
+        """
+        if self._por_dia is None:
+            por_dia: dict[date, list[tuple[Decimal, int]]] = {}
+            for i, lancamento in enumerate(self._lancamentos):
+                por_dia.setdefault(lancamento.data_vencimento, []).append((abs(lancamento.valor), i))
+            self._por_dia = {}
+            for dia, pares in por_dia.items():
+                pares.sort()
+                self._por_dia[dia] = ([valor for valor, _ in pares], [i for _, i in pares])
+
+        indices = []
+        for deslocamento in range(-dias, dias + 1):
+            dia = self._por_dia.get(data + timedelta(days=deslocamento))
+            if dia:
+                valores, posicoes = dia
+                indices.extend(posicoes[bisect_left(valores, valor_min):bisect_right(valores, valor_max)])
+        indices.sort(key=self._posicoes.__getitem__)
+        return indices
+
+    def similaridades(self, texto: str | None) -> dict[int, float]:
+        """
+        Similaridade (0 a 1) entre `texto` e a descrição / nome do participante de
+        cada candidato, por índice na ordem por data; candidatos ausentes têm 0.
+        O índice de trigramas é montado na primeira chamada.
+        """
+        if self._trigramas is None:
+            self._trigramas = IndiceTrigramas([
+                [lancamento.descricao, lancamento.participante.nome if lancamento.participante else None]
+                for lancamento in self._lancamentos
+            ])
+        return self._trigramas.pontuar(texto)
 
 class ConciliacaoService:
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def processar_ofx(self, transacoes: list[OfxTransactionSchema]) -> list[ConciliacaoResult]:
-        resultados = []
-        
-        for tx in transacoes:
-            # Busca lançamentos pendentes próximos à data (+/- 3 dias)
-            data_min = tx.data - timedelta(days=3)
-            data_max = tx.data + timedelta(days=3)
-            
-            stmt = select(Lancamento).where(
-                and_(
-                    Lancamento.status == StatusLancamento.PENDENTE,
-                    Lancamento.data_vencimento >= data_min,
-                    Lancamento.data_vencimento <= data_max
-                )
+    async def processar_ofx(
+        self,
+        transacoes: list[OfxTransactionSchema],
+        estrategia: EstrategiaConciliacao = EstrategiaConciliacao.GULOSA,
+        vetorizar: bool | None = None,
+        agrupar: bool = False,
+        deduplicar: bool = False,
+        similaridade: bool = True
+    ) -> list[ConciliacaoResult]:
+        """
+        vetorizar=None escolhe automaticamente a pontuação NumPy para lotes a partir
+        de pontuacao_vetorizada.LIMIAR_TRANSACOES (se o numpy estiver instalado).
+        agrupar=True procura, para as transações sem correspondência, parcelas do
+        mesmo participante que somadas resultem no valor da transação.
+        deduplicar=True retorna como DUPLICATE, sem nova busca, as transações já
+        baixadas por /aplicar (nada é registrado aqui: a conciliação só sugere).
+        similaridade=True usa a semelhança entre a descrição da transação e a
+        descrição / participante dos lançamentos para escolher entre candidatos
+        de mesmo valor.
+        """
+        if not transacoes:
+            return []
+
+        if deduplicar:
+            return await self._processar_novas(transacoes, estrategia, vetorizar, agrupar, similaridade)
+
+        # Uma única consulta cobre a janela de todas as transações do lote
+        indice = await self.carregar_candidatos(transacoes)
+
+        if vetorizar is None:
+            vetorizar = len(transacoes) >= pontuacao_vetorizada.LIMIAR_TRANSACOES
+
+        # A atribuição ótima e o agrupamento podem levar minutos em lotes grandes:
+        # rodam em uma thread para não travar o loop (e o batimento dos jobs)
+        if estrategia == EstrategiaConciliacao.OTIMA:
+            resultados = await asyncio.to_thread(self.atribuir_otimo, transacoes, indice, similaridade)
+        else:
+            if vetorizar and pontuacao_vetorizada.disponivel():
+                resultados = self.conciliar_vetorizado(transacoes, indice)
+            else:
+                resultados = [
+                    self.conciliar_transacao(tx, indice.janela(tx.data))
+                    for tx in transacoes
+                ]
+            if similaridade:
+                self.desempatar_por_descricao(transacoes, resultados, indice)
+
+        if agrupar:
+            await asyncio.to_thread(self.agrupar_pendentes, transacoes, resultados, indice)
+
+        # A conta compõe a chave da transação registrada ao aplicar a sugestão
+        for tx, resultado in zip(transacoes, resultados):
+            resultado.conta = tx.conta
+        return resultados
+
+    async def _processar_novas(
+        self,
+        transacoes: list[OfxTransactionSchema],
+        estrategia: EstrategiaConciliacao,
+        vetorizar: bool | None,
+        agrupar: bool,
+        similaridade: bool
+    ) -> list[ConciliacaoResult]:
+        chaves = [chave_transacao(tx) for tx in transacoes]
+        processadas = await buscar_processadas(self.db, chaves)
+
+        novas = [i for i, chave in enumerate(chaves) if chave not in processadas]
+        resultados: list[ConciliacaoResult | None] = [
+            resultado_processada(tx, processadas[chave]) if chave in processadas else None
+            for tx, chave in zip(transacoes, chaves)
+        ]
+        if not novas:
+            return resultados
+
+        transacoes_novas = [transacoes[i] for i in novas]
+        resultados_novos = await self.processar_ofx(
+            transacoes_novas, estrategia, vetorizar, agrupar, similaridade=similaridade
+        )
+        for i, resultado in zip(novas, resultados_novos):
+            resultados[i] = resultado
+        return resultados
+
+    async def carregar_candidatos(self, transacoes: list[OfxTransactionSchema]) -> IndiceCandidatos:
+        """
+        Busca de uma vez os lançamentos pendentes entre min(data) - 3 dias e max(data) + 3 dias.
+        """
+        data_min = min(tx.data for tx in transacoes) - timedelta(days=JANELA_DIAS)
+        data_max = max(tx.data for tx in transacoes) + timedelta(days=JANELA_DIAS)
+
+        # O nome do participante vem na mesma consulta (usado na similaridade de descrição)
+        stmt = select(Lancamento).options(
+            joinedload(Lancamento.participante).load_only(Participante.nome)
+        ).where(
+            and_(
+                Lancamento.status == StatusLancamento.PENDENTE,
+                Lancamento.data_vencimento >= data_min,
+                Lancamento.data_vencimento <= data_max
             )
-            
-            result = await self.db.execute(stmt)
-            candidatos = result.scalars().all()
-            
-            match_encontrado = None
-            melhor_candidato_parcial = None
-            menor_diferenca_percentual = Decimal("100") # Inicializa com 100%
-
-            # Primeiro passo: procurar correspondência exata
-            # Compara valores absolutos para evitar problemas com sinais (crédito/débito)
+        )
+
+        result = await self.db.execute(stmt)
+        return IndiceCandidatos(list(result.scalars().all()))
+
+    @staticmethod
+    def custo_par(tx: OfxTransactionSchema, lancamento: Lancamento, similaridade: float = 0.0) -> int | None:
+        """
+        Custo inteiro do par (transação, lançamento), ou None se fora da tolerância.
+        A diferença percentual domina; entre diferenças iguais, decide a similaridade
+        de descrição (0 a 1) e, por fim, a distância em dias.
+        """
+        valor_tx_abs = abs(tx.valor)
+        valor_lanc_abs = abs(lancamento.valor)
+        dias = abs((lancamento.data_vencimento - tx.data).days)
+
+        if valor_lanc_abs == valor_tx_abs:
+            custo_percentual = 0
+        elif valor_lanc_abs == 0:
+            return None
+        else:
+            percentual = (abs(valor_lanc_abs - valor_tx_abs) / valor_lanc_abs) * 100
+            if percentual >= TOLERANCIA_PERCENTUAL:
+                return None
+            custo_percentual = max(int(percentual * ESCALA_CUSTO), 1)
+
+        custo_descricao = ESCALA_SIMILARIDADE - 1 - round(similaridade * (ESCALA_SIMILARIDADE - 1))
+        return (custo_percentual * ESCALA_SIMILARIDADE + custo_descricao) * (JANELA_DIAS + 1) + dias
+
+    def atribuir_otimo(
+        self, transacoes: list[OfxTransactionSchema], indice: IndiceCandidatos, similaridade: bool = True
+    ) -> list[ConciliacaoResult]:
+        """
+        Resolve uma única atribuição para o lote: cada lançamento pendente é
+        sugerido para no máximo uma transação, maximizando o número de pares e
+        minimizando a soma das diferenças de valor, de descrição e de data.
+        """
+        # Faixa de valores em que a diferença percentual pode ficar abaixo da tolerância:
+        # |lanc - tx| < lanc * t  <=>  tx / (1 + t) < lanc < tx / (1 - t)
+        fator = TOLERANCIA_PERCENTUAL / 100
+        arestas = []
+        for tx in transacoes:
             valor_tx_abs = abs(tx.valor)
-            
-            for lancamento in candidatos:
-                if abs(lancamento.valor) == valor_tx_abs:
-                    match_encontrado = ConciliacaoResult(
-                        ofx_id=tx.id,
-                        lancamento_id=str(lancamento.id),
-                        tipo_match="EXACT",
-                        mensagem="Correspondência exata encontrada."
-                    )
-                    break
-            
-            # Segundo passo: se não houver exata, procurar melhor parcial
-            if not match_encontrado:
-                for lancamento in candidatos:
-                    valor_lanc_abs = abs(lancamento.valor)
-                    diferenca = abs(valor_lanc_abs - valor_tx_abs)
-                    
-                    # Evita divisão por zero
-                    if valor_lanc_abs == 0:
-                        continue
-                        
-                    percentual = (diferenca / valor_lanc_abs) * 100
-                    
-                    if percentual < 10:
-                        # Mantém o candidato com a menor diferença percentual
-                        if percentual < menor_diferenca_percentual:
-                            menor_diferenca_percentual = percentual
-                            melhor_candidato_parcial = (lancamento, diferenca)
-
-                if melhor_candidato_parcial:
-                    lancamento, diferenca = melhor_candidato_parcial
-                    match_encontrado = ConciliacaoResult(
-                        ofx_id=tx.id,
-                        lancamento_id=str(lancamento.id),
-                        tipo_match="PARTIAL",
-                        valor_taxa_sugerida=diferenca,
-                        mensagem=f"Diferença de {menor_diferenca_percentual:.2f}% detectada. Sugestão de lançamento de taxa/imposto."
-                    )
-
-            if match_encontrado:
-                resultados.append(match_encontrado)
+            vizinhos = []
+            faixa = indice.faixa_indices(tx.data, valor_tx_abs / (1 + fator), valor_tx_abs / (1 - fator))
+            semelhanca = indice.similaridades(tx.descricao) if similaridade and faixa else {}
+            for j in faixa:
+                custo = self.custo_par(tx, indice[j], semelhanca.get(j, 0.0))
+                if custo is not None:
+                    vizinhos.append((j, custo))
+            arestas.append(vizinhos)
+
+        resultados = []
+        for tx, j in zip(transacoes, emparelhar(arestas, len(indice))):
+            if j is None:
+                resultados.append(self.resultado_nenhum(tx))
+                continue
+
+            lancamento = indice[j]
+            valor_tx_abs = abs(tx.valor)
+            valor_lanc_abs = abs(lancamento.valor)
+            if valor_lanc_abs == valor_tx_abs:
+                resultados.append(self.resultado_exato(tx, lancamento))
+            else:
+                diferenca = abs(valor_lanc_abs - valor_tx_abs)
+                percentual = (diferenca / valor_lanc_abs) * 100
+                resultados.append(self.resultado_parcial(tx, lancamento, diferenca, percentual))
+
+        return resultados
+
+    def conciliar_vetorizado(self, transacoes: list[OfxTransactionSchema], indice: IndiceCandidatos) -> list[ConciliacaoResult]:
+        """
+        Mesmo resultado de conciliar_transacao, com a pontuação feita em blocos NumPy
+        (centavos int64 e ordinais de dia). Decimal só é usado para montar a sugestão de taxa.
+        Transações com mais de duas casas decimais seguem pelo caminho Decimal.
+        """
+        np = pontuacao_vetorizada.np
+        cand_centavos = [pontuacao_vetorizada.centavos(l.valor) for l in indice.lancamentos]
+        if None in cand_centavos:
+            return [self.conciliar_transacao(tx, indice.janela(tx.data)) for tx in transacoes]
+
+        tx_centavos = [pontuacao_vetorizada.centavos(tx.valor) for tx in transacoes]
+        vetorizaveis = [i for i, c in enumerate(tx_centavos) if c is not None]
+
+        tipos, escolhidos = pontuacao_vetorizada.escolher_candidatos(
+            np.array([transacoes[i].data.toordinal() for i in vetorizaveis], dtype=np.int64),
+            np.array([tx_centavos[i] for i in vetorizaveis], dtype=np.int64),
+            np.array([l.data_vencimento.toordinal() for l in indice.lancamentos], dtype=np.int64),
+            np.array(cand_centavos, dtype=np.int64),
+            np.array(indice.posicoes, dtype=np.int64),
+            JANELA_DIAS,
+            int(TOLERANCIA_PERCENTUAL)
+        )
+
+        resultados: list[ConciliacaoResult | None] = [None] * len(transacoes)
+        for i, tipo, j in zip(vetorizaveis, tipos.tolist(), escolhidos.tolist()):
+            tx = transacoes[i]
+            if tipo == pontuacao_vetorizada.EXATO:
+                resultados[i] = self.resultado_exato(tx, indice[j])
+            elif tipo == pontuacao_vetorizada.PARCIAL:
+                lancamento = indice[j]
+                valor_lanc_abs = abs(lancamento.valor)
+                diferenca = abs(valor_lanc_abs - abs(tx.valor))
+                percentual = (diferenca / valor_lanc_abs) * 100
+                resultados[i] = self.resultado_parcial(tx, lancamento, diferenca, percentual)
             else:
-                resultados.append(ConciliacaoResult(
-                    ofx_id=tx.id,
-                    tipo_match="NONE",
-                    mensagem="Nenhum lançamento correspondente encontrado."
-                ))
-                
+                resultados[i] = self.resultado_nenhum(tx)
+
+        for i, resultado in enumerate(resultados):
+            if resultado is None:
+                tx = transacoes[i]
+                resultados[i] = self.conciliar_transacao(tx, indice.janela(tx.data))
+
         return resultados
+
+    def desempatar_por_descricao(
+        self, transacoes: list[OfxTransactionSchema], resultados: list[ConciliacaoResult], indice: IndiceCandidatos
+    ):
+        """
+        Na busca gulosa, entre os candidatos da janela com o mesmo valor do escolhido
+        (mesma pontuação), fica o de descrição mais parecida com a da transação.
+        Sem nenhuma semelhança, mantém o primeiro na ordem de carga.
+        """
+        posicao_por_id = None
+        for i, tx in enumerate(transacoes):
+            resultado = resultados[i]
+            if resultado.tipo_match not in ("EXACT", "PARTIAL"):
+                continue
+
+            if posicao_por_id is None:
+                posicao_por_id = {str(lancamento.id): j for j, lancamento in enumerate(indice.lancamentos)}
+            escolhido = indice[posicao_por_id[resultado.lancamento_id]]
+            valor = abs(escolhido.valor)
+            empatados = indice.faixa_indices(tx.data, valor, valor)
+            if len(empatados) < 2:
+                continue
+
+            semelhanca = indice.similaridades(tx.descricao)
+            melhor = max(empatados, key=lambda j: semelhanca.get(j, 0.0))
+            if indice[melhor] is escolhido:
+                continue
+
+            if resultado.tipo_match == "EXACT":
+                resultados[i] = self.resultado_exato(tx, indice[melhor])
+            else:
+                resultados[i] = resultado.model_copy(update={"lancamento_id": str(indice[melhor].id)})
+
+    def agrupar_pendentes(
+        self, transacoes: list[OfxTransactionSchema], resultados: list[ConciliacaoResult], indice: IndiceCandidatos
+    ):
+        """
+        Substitui, em `resultados`, os NONE que puderem ser explicados por uma
+        combinação de lançamentos do mesmo participante (GROUPED). Lançamentos já
+        sugeridos para outra transação do lote não entram nas combinações.
+        """
+        usados = {r.lancamento_id for r in resultados if r.lancamento_id}
+
+        for i, tx in enumerate(transacoes):
+            if resultados[i].tipo_match != "NONE":
+                continue
+
+            alvo = pontuacao_vetorizada.centavos(tx.valor)
+            if not alvo:
+                continue
+
+            grupo = self.buscar_grupo(tx, alvo, indice.janela(tx.data), usados)
+            if grupo:
+                resultados[i] = self.resultado_agrupado(tx, grupo)
+                usados.update(str(lancamento.id) for lancamento in grupo)
+
+    @staticmethod
+    def buscar_grupo(
+        tx: OfxTransactionSchema, alvo: int, candidatos: list[Lancamento], usados: set[str]
+    ) -> list[Lancamento] | None:
+        """
+        Menor combinação (2 ou mais lançamentos) de um mesmo participante cuja soma
+        dos valores absolutos é exatamente `alvo` centavos. Cada participante usa no
+        máximo MAX_CANDIDATOS lançamentos (os mais próximos da data) e a busca toda
+        respeita TEMPO_MAXIMO_AGRUPAMENTO.
+        """
+        por_participante: dict = {}
+        for lancamento in candidatos:
+            if str(lancamento.id) in usados:
+                continue
+            valor = pontuacao_vetorizada.centavos(lancamento.valor)
+            if not valor or valor > alvo:
+                continue
+            por_participante.setdefault(lancamento.participante_id, []).append((lancamento, valor))
+
+        prazo = time.perf_counter() + TEMPO_MAXIMO_AGRUPAMENTO
+        melhor = None
+        for itens in por_participante.values():
+            if len(itens) < 2:
+                continue
+            if len(itens) > MAX_CANDIDATOS:
+                itens = sorted(itens, key=lambda item: abs((item[0].data_vencimento - tx.data).days))[:MAX_CANDIDATOS]
+
+            combinacao = encontrar_combinacao([valor for _, valor in itens], alvo, prazo)
+            if combinacao and (melhor is None or len(combinacao) < len(melhor)):
+                melhor = [itens[k][0] for k in combinacao]
+
+            if time.perf_counter() > prazo:
+                break
+
+        return melhor
+
+    @staticmethod
+    def conciliar_transacao(tx: OfxTransactionSchema, candidatos: list[Lancamento]) -> ConciliacaoResult:
+        match_encontrado = None
+        melhor_candidato_parcial = None
+        menor_diferenca_percentual = Decimal("100") # Inicializa com 100%
+
+        # Primeiro passo: procurar correspondência exata
+        # Compara valores absolutos para evitar problemas com sinais (crédito/débito)
+        valor_tx_abs = abs(tx.valor)
+
+        for lancamento in candidatos:
+            if abs(lancamento.valor) == valor_tx_abs:
+                match_encontrado = ConciliacaoService.resultado_exato(tx, lancamento)
+                break
+
+        # Segundo passo: se não houver exata, procurar melhor parcial
+        if not match_encontrado:
+            for lancamento in candidatos:
+                valor_lanc_abs = abs(lancamento.valor)
+                diferenca = abs(valor_lanc_abs - valor_tx_abs)
+
+                # Evita divisão por zero
+                if valor_lanc_abs == 0:
+                    continue
+
+                percentual = (diferenca / valor_lanc_abs) * 100
+
+                if percentual < TOLERANCIA_PERCENTUAL:
+                    # Mantém o candidato com a menor diferença percentual
+                    if percentual < menor_diferenca_percentual:
+                        menor_diferenca_percentual = percentual
+                        melhor_candidato_parcial = (lancamento, diferenca)
+
+            if melhor_candidato_parcial:
+                lancamento, diferenca = melhor_candidato_parcial
+                match_encontrado = ConciliacaoService.resultado_parcial(
+                    tx, lancamento, diferenca, menor_diferenca_percentual
+                )
+
+        if match_encontrado:
+            return match_encontrado
+
+        return ConciliacaoService.resultado_nenhum(tx)
+
+    @staticmethod
+    def resultado_exato(tx: OfxTransactionSchema, lancamento: Lancamento) -> ConciliacaoResult:
+        return ConciliacaoResult(
+            ofx_id=tx.id,
+            lancamento_id=str(lancamento.id),
+            tipo_match="EXACT",
+            mensagem="Correspondência exata encontrada."
+        )
+
+    @staticmethod
+    def resultado_parcial(
+        tx: OfxTransactionSchema, lancamento: Lancamento, diferenca: Decimal, percentual: Decimal
+    ) -> ConciliacaoResult:
+        return ConciliacaoResult(
+            ofx_id=tx.id,
+            lancamento_id=str(lancamento.id),
+            tipo_match="PARTIAL",
+            valor_taxa_sugerida=diferenca,
+            mensagem=f"Diferença de {percentual:.2f}% detectada. Sugestão de lançamento de taxa/imposto."
+        )
+
+    @staticmethod
+    def resultado_agrupado(tx: OfxTransactionSchema, lancamentos: list[Lancamento]) -> ConciliacaoResult:
+        return ConciliacaoResult(
+            ofx_id=tx.id,
+            lancamento_ids=[str(lancamento.id) for lancamento in lancamentos],
+            tipo_match="GROUPED",
+            mensagem=f"{len(lancamentos)} lançamentos do mesmo participante somam o valor da transação."
+        )
+
+    @staticmethod
+    def resultado_nenhum(tx: OfxTransactionSchema) -> ConciliacaoResult:
+        return ConciliacaoResult(
+            ofx_id=tx.id,
+            tipo_match="NONE",
+            mensagem="Nenhum lançamento correspondente encontrado."
+        )
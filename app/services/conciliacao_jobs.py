@@ -0,0 +1,276 @@
+import asyncio
+import contextlib
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, update, insert, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
+
+from app.core.database import async_session
+from app.models.conciliacao_job import ConciliacaoJob, ConciliacaoJobResultado
+from app.models.enums import StatusJob
+from app.schemas.ofx import OfxTransactionSchema, ConciliacaoResult, EstrategiaConciliacao
+from app.services.conciliacao import ConciliacaoService
+
+logger = logging.getLogger(__name__)
+
+# Transações conciliadas entre duas atualizações de progresso (apenas estratégia
+# gulosa sem agrupamento, em que cada transação é independente das demais)
+TAMANHO_LOTE_JOB = 1000
+
+# Intervalo máximo entre verificações da fila quando não há aviso de novo job
+INTERVALO_FILA = 2.0
+
+# Jobs em PROCESSANDO sem progresso há mais tempo que isso voltam para a fila
+# (worker interrompido no meio da execução)
+TEMPO_ABANDONO = timedelta(minutes=10)
+
+# Intervalo (segundos) com que o worker renova atualizado_em enquanto executa um
+# job; jobs de lote único (ótima, agrupamento) não gravam progresso no meio
+INTERVALO_BATIMENTO = 60.0
+
+# Intervalo (segundos) entre buscas de jobs abandonados: também os deixados em
+# PROCESSANDO por outra instância que caiu, sem esperar um reinício deste worker
+INTERVALO_RECUPERACAO = TEMPO_ABANDONO.total_seconds() / 2
+
+class ConciliacaoJobService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def criar(
+        self,
+        transacoes: list[OfxTransactionSchema],
+        estrategia: EstrategiaConciliacao,
+        agrupar: bool,
+        usuario_id: uuid.UUID | None = None,
+        deduplicar: bool = True
+    ) -> ConciliacaoJob:
+        job_id = uuid.uuid4()
+        await self.db.execute(insert(ConciliacaoJob).values(
+            id=job_id,
+            status=StatusJob.PENDENTE,
+            estrategia=estrategia.value,
+            agrupar=agrupar,
+            deduplicar=deduplicar,
+            transacoes=[tx.model_dump(mode="json") for tx in transacoes],
+            total=len(transacoes),
+            processadas=0,
+            usuario_id=usuario_id
+        ))
+        await self.db.commit()
+        return await self.obter(job_id)
+
+    async def obter(self, job_id: uuid.UUID) -> ConciliacaoJob | None:
+        # Sem o payload de transações: consultas de progresso são frequentes
+        stmt = (
+            select(ConciliacaoJob)
+            .options(defer(ConciliacaoJob.transacoes))
+            .where(ConciliacaoJob.id == job_id)
+            .execution_options(populate_existing=True)
+        )
+        return (await self.db.execute(stmt)).scalars().first()
+
+    async def resultados(self, job_id: uuid.UUID, offset: int = 0, limit: int | None = None) -> list[ConciliacaoResult]:
+        stmt = (
+            select(ConciliacaoJobResultado)
+            .where(ConciliacaoJobResultado.job_id == job_id)
+            .order_by(ConciliacaoJobResultado.ordem)
+            .offset(offset)
+            .limit(limit)
+        )
+        linhas = (await self.db.execute(stmt)).scalars().all()
+        return [
+            ConciliacaoResult(
+                ofx_id=linha.ofx_id,
+                lancamento_id=linha.lancamento_id,
+                lancamento_ids=linha.lancamento_ids,
+                tipo_match=linha.tipo_match,
+                valor_taxa_sugerida=linha.valor_taxa_sugerida,
+                mensagem=linha.mensagem,
+                conta=linha.conta
+            )
+            for linha in linhas
+        ]
+
+    async def reservar_proximo(self) -> uuid.UUID | None:
+        """
+        Marca o job pendente mais antigo como PROCESSANDO e retorna seu id.
+        SKIP LOCKED permite vários workers (um por instância da API) sem disputa.
+        """
+        stmt = (
+            select(ConciliacaoJob.id)
+            .where(ConciliacaoJob.status == StatusJob.PENDENTE)
+            .order_by(ConciliacaoJob.criado_em)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        job_id = (await self.db.execute(stmt)).scalar()
+        if job_id is None:
+            await self.db.rollback()
+            return None
+
+        await self.db.execute(
+            update(ConciliacaoJob)
+            .where(ConciliacaoJob.id == job_id)
+            .values(status=StatusJob.PROCESSANDO, iniciado_em=func.now(), atualizado_em=func.now())
+        )
+        await self.db.commit()
+        return job_id
+
+    async def recuperar_abandonados(self) -> int:
+        limite = datetime.now(timezone.utc) - TEMPO_ABANDONO
+        resultado = await self.db.execute(
+            update(ConciliacaoJob)
+            .where(ConciliacaoJob.status == StatusJob.PROCESSANDO, ConciliacaoJob.atualizado_em < limite)
+            .values(status=StatusJob.PENDENTE, processadas=0)
+        )
+        # Resultados parciais da execução interrompida são descartados
+        await self.db.commit()
+        return resultado.rowcount
+
+    async def executar(self, job_id: uuid.UUID):
+        """
+        Concilia as transações do job, gravando resultados e progresso a cada lote.
+        """
+        stmt = select(
+            ConciliacaoJob.transacoes, ConciliacaoJob.estrategia, ConciliacaoJob.agrupar, ConciliacaoJob.deduplicar
+        ).where(ConciliacaoJob.id == job_id)
+        dados, estrategia, agrupar, deduplicar = (await self.db.execute(stmt)).one()
+        estrategia = EstrategiaConciliacao(estrategia)
+        transacoes = [OfxTransactionSchema.model_validate(tx) for tx in dados]
+
+        # A estratégia ótima e o agrupamento consideram o lote inteiro de uma vez (sem
+        # progresso intermediário: manter_ativo renova atualizado_em enquanto isso)
+        lote = TAMANHO_LOTE_JOB if estrategia == EstrategiaConciliacao.GULOSA and not agrupar else max(len(transacoes), 1)
+
+        try:
+            await self.db.execute(
+                ConciliacaoJobResultado.__table__.delete().where(ConciliacaoJobResultado.job_id == job_id)
+            )
+            service = ConciliacaoService(self.db)
+            for inicio in range(0, len(transacoes), lote):
+                resultados = await service.processar_ofx(
+                    transacoes[inicio:inicio + lote], estrategia, agrupar=agrupar, deduplicar=deduplicar
+                )
+                await self.db.execute(insert(ConciliacaoJobResultado), [
+                    {"job_id": job_id, "ordem": inicio + i, **r.model_dump()}
+                    for i, r in enumerate(resultados)
+                ])
+                await self.db.execute(
+                    update(ConciliacaoJob)
+                    .where(ConciliacaoJob.id == job_id)
+                    .values(processadas=inicio + len(resultados), atualizado_em=func.now())
+                )
+                await self.db.commit()
+
+            await self.db.execute(
+                update(ConciliacaoJob)
+                .where(ConciliacaoJob.id == job_id)
+                .values(status=StatusJob.CONCLUIDO, concluido_em=func.now(), atualizado_em=func.now())
+            )
+            await self.db.commit()
+        except Exception as e:
+            await self.db.rollback()
+            logger.exception("Falha no job de conciliação %s", job_id)
+            await self.db.execute(
+                update(ConciliacaoJob)
+                .where(ConciliacaoJob.id == job_id)
+                .values(status=StatusJob.ERRO, erro=str(e), concluido_em=func.now(), atualizado_em=func.now())
+            )
+            await self.db.commit()
+
+async def manter_ativo(session_factory, job_id: uuid.UUID):
+    """
+    Renova atualizado_em a cada INTERVALO_BATIMENTO, em sessão própria, para que o
+    job em execução não seja tomado por abandonado (TEMPO_ABANDONO).
+    """
+    while True:
+        await asyncio.sleep(INTERVALO_BATIMENTO)
+        try:
+            async with session_factory() as db:
+                await db.execute(
+                    update(ConciliacaoJob)
+                    .where(ConciliacaoJob.id == job_id, ConciliacaoJob.status == StatusJob.PROCESSANDO)
+                    .values(atualizado_em=func.now())
+                )
+                await db.commit()
+        except Exception:
+            logger.exception("Falha ao renovar o job de conciliação %s", job_id)
+
+async def processar_proximo(session_factory) -> bool:
+    """
+    Reserva e executa um job pendente. Retorna False se a fila estava vazia.
+    """
+    async with session_factory() as db:
+        service = ConciliacaoJobService(db)
+        job_id = await service.reservar_proximo()
+        if job_id is None:
+            return False
+        batimento = asyncio.create_task(manter_ativo(session_factory, job_id))
+        try:
+            await service.executar(job_id)
+        finally:
+            batimento.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await batimento
+        return True
+
+class ConciliacaoWorker:
+    """
+    Worker em processo (uma tarefa asyncio por instância da API) que consome a fila de jobs.
+    """
+    def __init__(self, session_factory):
+        self.session_factory = session_factory
+        self._aviso = asyncio.Event()
+        self._tarefa: asyncio.Task | None = None
+
+    def iniciar(self):
+        if self._tarefa is None:
+            self._tarefa = asyncio.create_task(self._executar())
+
+    async def parar(self):
+        if self._tarefa is not None:
+            self._tarefa.cancel()
+            try:
+                await self._tarefa
+            except asyncio.CancelledError:
+                pass
+            self._tarefa = None
+
+    def notificar(self):
+        """
+        Acorda o worker após a criação de um job, sem esperar o próximo ciclo.
+        """
+        self._aviso.set()
+
+    async def _recuperar_abandonados(self):
+        try:
+            async with self.session_factory() as db:
+                await ConciliacaoJobService(db).recuperar_abandonados()
+        except Exception:
+            logger.exception("Falha ao recuperar jobs de conciliação abandonados")
+
+    async def _executar(self):
+        relogio = asyncio.get_running_loop()
+        proxima_recuperacao = relogio.time()
+        while True:
+            if relogio.time() >= proxima_recuperacao:
+                await self._recuperar_abandonados()
+                proxima_recuperacao = relogio.time() + INTERVALO_RECUPERACAO
+
+            try:
+                while await processar_proximo(self.session_factory):
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Falha ao consumir a fila de conciliação")
+
+            try:
+                await asyncio.wait_for(self._aviso.wait(), timeout=INTERVALO_FILA)
+            except asyncio.TimeoutError:
+                pass
+            self._aviso.clear()
+
+worker = ConciliacaoWorker(async_session)
@@ -0,0 +1,62 @@
+from decimal import Decimal
+from sqlalchemy import select, delete, insert, func, cast, String
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.lancamento import Lancamento
+from app.models.processo import Processo
+from app.models.daily_ledger import DailyLedger, SEM_PROCESSO
+
+def _agregado_lancamentos():
+    """
+    daily_ledger calculado diretamente de lancamentos (referência do rollup).
+    """
+    status_processo = func.coalesce(cast(Processo.status, String), SEM_PROCESSO)
+    return select(
+        Lancamento.data_vencimento,
+        Lancamento.centro_custo_id,
+        Lancamento.tipo,
+        Lancamento.natureza,
+        Lancamento.status,
+        status_processo.label("status_processo"),
+        func.sum(Lancamento.valor).label("valor"),
+        func.count().label("quantidade"),
+    ).select_from(Lancamento).outerjoin(Processo, Processo.id == Lancamento.processo_id).where(
+        Lancamento.data_vencimento.isnot(None)
+    ).group_by(
+        Lancamento.data_vencimento, Lancamento.centro_custo_id, Lancamento.tipo,
+        Lancamento.natureza, Lancamento.status, status_processo
+    )
+
+async def reconstruir(db: AsyncSession) -> int:
+    """
+    Recalcula todo o daily_ledger a partir dos lançamentos (carga inicial ou correção).
+    """
+    await db.execute(delete(DailyLedger))
+    colunas = ["data", "centro_custo_id", "tipo", "natureza", "status", "status_processo", "valor", "quantidade"]
+    await db.execute(insert(DailyLedger).from_select(colunas, _agregado_lancamentos()))
+    total = (await db.execute(select(func.count()).select_from(DailyLedger))).scalar()
+    await db.commit()
+    return total
+
+async def verificar(db: AsyncSession) -> list[dict]:
+    """
+    Compara o rollup com a agregação dos lançamentos; retorna as chaves divergentes.
+    """
+    esperado = {
+        tuple(linha[:6]): (linha.valor or Decimal(0), linha.quantidade)
+        for linha in (await db.execute(_agregado_lancamentos())).all()
+    }
+    atual = {
+        (l.data, l.centro_custo_id, l.tipo, l.natureza, l.status, l.status_processo): (l.valor, l.quantidade)
+        for l in (await db.execute(select(DailyLedger))).scalars()
+        if l.quantidade or l.valor
+    }
+
+    divergencias = []
+    for chave in sorted(esperado.keys() | atual.keys(), key=str):
+        if esperado.get(chave) != atual.get(chave):
+            divergencias.append({
+                "chave": chave,
+                "esperado": esperado.get(chave, (Decimal(0), 0)),
+                "atual": atual.get(chave, (Decimal(0), 0)),
+            })
+    return divergencias
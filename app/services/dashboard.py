@@ -0,0 +1,420 @@
+import uuid
+from functools import partial
+from datetime import date, datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+from decimal import Decimal
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, case, literal_column, and_, or_
+from app.core.cache import CacheLRU, RelatorioEmCache, Alteracoes, ao_confirmar
+from app.core.config import settings
+from app.core.consultas import executar_em_paralelo
+from app.core.database import async_session
+from app.models.lancamento import Lancamento
+from app.models.processo import Processo
+from app.models.centro_custo import CentroCusto
+from app.models.daily_ledger import DailyLedger
+from app.services.fechamento import consulta_saldo
+from app.services.serie_temporal import TruncarData, escolher_granularidade, faixas, lttb, periodo_comparacao, alinhamento
+from app.models.enums import StatusProcesso, TipoLancamento, NaturezaLancamento, StatusLancamento
+from app.schemas.dashboard import (
+    DashboardCards, CashFlowPoint, ProjectedFlowPoint, ExpenseCategory, DashboardData, DashboardComparacao,
+    Granularidade, Comparacao
+)
+
+def filtros_lancamento(
+    data_inicio: date | None,
+    data_fim: date | None,
+    status_processo: StatusProcesso | None,
+    centro_custo_id: uuid.UUID | None,
+    data_inclusao: date | None,
+    data_inclusao_fim: date | None = None
+) -> list:
+    """
+    Condições do conjunto de lançamentos analisado pelo dashboard.
+    """
+    lanc_filter = [
+        Lancamento.status != StatusLancamento.CANCELADO
+    ]
+
+    if data_inclusao:
+        # Intervalo semiaberto sobre criado_em (usa o índice, ao contrário de CAST(criado_em AS DATE))
+        inicio, fim = intervalo_inclusao(data_inclusao, data_inclusao_fim or data_inclusao)
+        lanc_filter.append(Lancamento.criado_em >= inicio)
+        lanc_filter.append(Lancamento.criado_em < fim)
+    elif data_inicio and data_fim:
+        lanc_filter.append(Lancamento.data_vencimento >= data_inicio)
+        lanc_filter.append(Lancamento.data_vencimento <= data_fim)
+
+    if centro_custo_id:
+        lanc_filter.append(Lancamento.centro_custo_id == centro_custo_id)
+
+    if status_processo:
+        lanc_filter.append(Lancamento.processo.has(Processo.status == status_processo))
+
+    return lanc_filter
+
+def intervalo_inclusao(inicio: date, fim: date) -> tuple[datetime, datetime]:
+    """
+    [início do dia `inicio`, início do dia seguinte a `fim`) no fuso do escritório,
+    convertido para UTC.
+    """
+    fuso = ZoneInfo(settings.FUSO_HORARIO)
+    return tuple(
+        datetime.combine(dia, time.min, fuso).astimezone(timezone.utc)
+        for dia in (inicio, fim + timedelta(days=1))
+    )
+
+# Resultados de analytics por filtro normalizado:
+# (data_inicio, data_fim, status_processo, centro_custo_id, data_inclusao, acumulado, granularidade, max_pontos,
+#  data_inclusao_fim, comparar_com, comparacao_inicio)
+cache_analytics = CacheLRU(max_itens=settings.DASHBOARD_CACHE_MAX_ITENS, ttl=settings.DASHBOARD_CACHE_TTL)
+relatorio_analytics = RelatorioEmCache(
+    cache_analytics,
+    async_session,
+    compartilhar=settings.DASHBOARD_SINGLE_FLIGHT,
+    janela_obsoleta=settings.DASHBOARD_STALE_WHILE_REVALIDATE
+)
+
+@ao_confirmar
+def invalidar_analytics(alteracoes: Alteracoes):
+    """
+    Descarta as entradas afetadas por um commit: todas quando mudou um processo
+    (o pipeline entra em todos os resultados); senão, as de período por vencimento
+    que contêm algum dia x centro de custo alterado, e as sem período (ou por data
+    de inclusão) sempre que algum lançamento mudou. As acumuladas (saldo desde o
+    início) dependem também de todos os dias anteriores ao período.
+    """
+    if alteracoes.processos:
+        cache_analytics.limpar()
+        return
+
+    def afetada(chave) -> bool:
+        data_inicio, data_fim, _, centro_custo_id, data_inclusao, acumulado, *_, comparar_com, comparacao_inicio = chave
+        if data_inclusao or not (data_inicio and data_fim):
+            return alteracoes.lancamentos
+        periodos = [(data_inicio, data_fim)]
+        if comparar_com:
+            periodos.append(periodo_comparacao(data_inicio, data_fim, comparar_com, comparacao_inicio))
+        return any(
+            alteracoes.sobrepoe(date.min if acumulado else inicio, fim, centro_custo_id) for inicio, fim in periodos
+        )
+
+    cache_analytics.invalidar(afetada)
+
+async def analytics_em_cache(
+    data_inicio: date | None = None,
+    data_fim: date | None = None,
+    status_processo: StatusProcesso | None = None,
+    centro_custo_id: uuid.UUID | None = None,
+    data_inclusao: date | None = None,
+    acumulado: bool = False,
+    granularidade: Granularidade = Granularidade.AUTO,
+    max_pontos: int | None = None,
+    data_inclusao_fim: date | None = None,
+    comparar_com: Comparacao | None = None,
+    comparacao_inicio: date | None = None
+) -> DashboardData:
+    """
+    Analytics pelo cache do dashboard (cálculo compartilhado e stale-while-revalidate).
+    """
+    chave = (
+        data_inicio, data_fim, status_processo, centro_custo_id, data_inclusao, acumulado, granularidade, max_pontos,
+        data_inclusao_fim, comparar_com, comparacao_inicio
+    )
+    return await relatorio_analytics.obter(
+        chave, lambda db: DashboardService(db, relatorio_analytics.session_factory).analytics(*chave)
+    )
+
+class DashboardService:
+    """
+    Indicadores do dashboard em três consultas: uma agregação única sobre os
+    lançamentos filtrados (por centro de custo, com somas condicionais para cada
+    indicador), a série temporal (entradas e saídas por período de vencimento,
+    com o realizado acumulado por função de janela) e a do pipeline, que lê os
+    processos. Com período de vencimento (e sem filtro por data de inclusão) as
+    agregações leem o rollup daily_ledger em vez dos lançamentos.
+    Com `acumulado` (saldo desde o início) o saldo e a série realizada partem do
+    saldo anterior ao período: último fechamento mensal + meses abertos.
+    A série tem um ponto por período de `granularidade` (AUTO: o menor período
+    que cabe em max_pontos); com `max_pontos`, a curva projetada é reduzida por
+    LTTB até esse número de pontos e as barras de entradas e saídas são somadas
+    em até max_pontos faixas de mesma duração.
+    Com `comparar_com`, o período de comparação entra nas mesmas consultas, com
+    uma coluna discriminadora (grupo 0 = período analisado, 1 = comparação) no
+    agrupamento e na partição da janela: o custo é o de uma requisição só.
+    Com session_factory as consultas rodam ao mesmo tempo em conexões
+    separadas, sobre o mesmo snapshot (executar_em_paralelo).
+    """
+    def __init__(self, db: AsyncSession, session_factory=None):
+        self.db = db
+        self.session_factory = session_factory
+
+    async def analytics(
+        self,
+        data_inicio: date | None = None,
+        data_fim: date | None = None,
+        status_processo: StatusProcesso | None = None,
+        centro_custo_id: uuid.UUID | None = None,
+        data_inclusao: date | None = None,
+        acumulado: bool = False,
+        granularidade: Granularidade = Granularidade.AUTO,
+        max_pontos: int | None = None,
+        data_inclusao_fim: date | None = None,
+        comparar_com: Comparacao | None = None,
+        comparacao_inicio: date | None = None
+    ) -> DashboardData:
+        granularidade = escolher_granularidade(
+            granularidade, data_inicio, data_fim, max_pontos or settings.DASHBOARD_MAX_PONTOS
+        )
+        consultas = [partial(_escalar, self._consulta_pipeline(status_processo))]
+        periodos = [(data_inicio, data_fim)]
+        if data_inicio and data_fim and not data_inclusao:
+            if comparar_com:
+                periodos.append(periodo_comparacao(data_inicio, data_fim, comparar_com, comparacao_inicio))
+            filtros = self._filtros_ledger(periodos, status_processo, centro_custo_id)
+            grupo = self._grupo(DailyLedger.data, periodos)
+            stmt = self._agregado_ledger(filtros, grupo)
+            serie = self._serie(DailyLedger.data, DailyLedger.tipo, DailyLedger.valor, filtros, granularidade, grupo)
+            if acumulado:
+                consultas += [
+                    partial(_escalar, consulta_saldo(inicio - timedelta(days=1), centro_custo_id, status_processo))
+                    for inicio, _ in periodos
+                ]
+        else:
+            if comparar_com:
+                raise ValueError("A comparação exige um período de vencimento (data_inicio e data_fim)")
+            lanc_filter = filtros_lancamento(
+                data_inicio, data_fim, status_processo, centro_custo_id, data_inclusao, data_inclusao_fim
+            )
+            grupo = self._grupo(Lancamento.data_vencimento, periodos)
+            stmt = self._agregado_lancamentos(lanc_filter, grupo)
+            serie = self._serie(
+                Lancamento.data_vencimento, Lancamento.tipo, Lancamento.valor, lanc_filter, granularidade, grupo
+            )
+
+        linhas, pontos, pipeline, *saldos = await executar_em_paralelo(
+            self.db, [partial(_todas, stmt), partial(_todas, serie), *consultas], self.session_factory
+        )
+        pipeline_recebiveis = float(pipeline or 0)
+        resultados = [
+            self._consolidar(
+                [linha for linha in linhas if linha.grupo == indice],
+                [ponto for ponto in pontos if ponto.grupo == indice],
+                (saldos[indice] if saldos else None) or Decimal(0),
+                pipeline_recebiveis,
+                max_pontos,
+                # Série da comparação nas datas do período analisado
+                alinhamento(periodos[indice][0], data_inicio, granularidade) if indice else None
+            )
+            for indice in range(len(periodos))
+        ]
+
+        dados = resultados[0]
+        if comparar_com:
+            comparacao = resultados[1]
+            dados.comparacao = DashboardComparacao(
+                data_inicio=periodos[1][0],
+                data_fim=periodos[1][1],
+                cards=comparacao.cards,
+                cash_flow=comparacao.cash_flow,
+                projected_flow=comparacao.projected_flow,
+                expenses_by_category=comparacao.expenses_by_category
+            )
+        return dados
+
+    @staticmethod
+    def _consolidar(
+        linhas: list,
+        pontos: list,
+        saldo_inicial: Decimal,
+        pipeline_recebiveis: float,
+        max_pontos: int | None,
+        alinhar=None
+    ) -> DashboardData:
+        """
+        Cards, séries e composição de despesas de um período a partir das linhas agrupadas.
+        """
+        receitas_periodo = Decimal(0)
+        despesas_periodo = Decimal(0)
+        burn_rate = Decimal(0)
+        total_exito = Decimal(0)
+        count_exito = 0
+        por_centro: dict[str, Decimal] = {}
+
+        for linha in linhas:
+            receitas = linha.receitas or Decimal(0)
+            despesas = linha.despesas or Decimal(0)
+            receitas_periodo += receitas
+            despesas_periodo += despesas
+            burn_rate += linha.despesas_fixas or Decimal(0)
+            total_exito += linha.receitas_exito or Decimal(0)
+            count_exito += linha.qtd_exito
+            if linha.qtd_despesas:
+                por_centro[linha.nome] = por_centro.get(linha.nome, Decimal(0)) + despesas
+
+        alinhar = alinhar or (lambda dia: dia)
+        # Barras somadas em no máximo max_pontos faixas, datadas pelo primeiro período de cada uma
+        grupos = faixas(pontos, max_pontos, dia=lambda p: p.periodo) if max_pontos else [[p] for p in pontos]
+        cash_flow_data = [
+            CashFlowPoint(
+                date=alinhar(grupo[0].periodo).isoformat(),
+                entradas=float(sum(p.entradas for p in grupo)),
+                saidas=float(sum(p.saidas for p in grupo))
+            )
+            for grupo in grupos
+        ]
+        if max_pontos:
+            pontos = lttb(pontos, max_pontos, x=lambda p: p.periodo.toordinal(), y=lambda p: float(p.realizado))
+        projected_data = [
+            ProjectedFlowPoint(
+                date=alinhar(p.periodo).isoformat(),
+                realizado=float(saldo_inicial) + float(p.realizado),
+                projetado=float(saldo_inicial) + float(p.realizado) + pipeline_recebiveis
+            )
+            for p in pontos
+        ]
+
+        return DashboardData(
+            cards=DashboardCards(
+                saldo_atual=float(saldo_inicial + receitas_periodo - despesas_periodo),
+                burn_rate=float(burn_rate),
+                ticket_medio_exito=float(total_exito / count_exito) if count_exito > 0 else 0.0,
+                pipeline_recebiveis=pipeline_recebiveis
+            ),
+            cash_flow=cash_flow_data,
+            projected_flow=projected_data,
+            expenses_by_category=[
+                ExpenseCategory(name=nome, value=float(valor)) for nome, valor in sorted(por_centro.items())
+            ]
+        )
+
+    @staticmethod
+    def _grupo(data, periodos: list):
+        """
+        Coluna discriminadora: índice do período (0 = analisado) a que a data
+        pertence; None com um único período (grupo constante 0, fora do GROUP BY).
+        """
+        if len(periodos) == 1:
+            return None
+        return case(
+            *((and_(data >= inicio, data <= fim), indice) for indice, (inicio, fim) in enumerate(periodos[:-1])),
+            else_=len(periodos) - 1
+        )
+
+    @staticmethod
+    def _agregado_lancamentos(lanc_filter: list, grupo):
+        receita = Lancamento.tipo == TipoLancamento.RECEITA
+        despesa = Lancamento.tipo == TipoLancamento.DESPESA
+        return select(
+            _rotulo_grupo(grupo),
+            CentroCusto.nome,
+            func.sum(case((receita, Lancamento.valor), else_=0)).label("receitas"),
+            func.sum(case((despesa, Lancamento.valor), else_=0)).label("despesas"),
+            func.count(case((despesa, 1))).label("qtd_despesas"),
+            func.sum(case(
+                (despesa & (Lancamento.natureza == NaturezaLancamento.FIXO), Lancamento.valor), else_=0
+            )).label("despesas_fixas"),
+            func.sum(case(
+                (receita & (Lancamento.natureza == NaturezaLancamento.EXITO), Lancamento.valor), else_=0
+            )).label("receitas_exito"),
+            func.count(case((receita & (Lancamento.natureza == NaturezaLancamento.EXITO), 1))).label("qtd_exito"),
+        ).select_from(Lancamento).join(CentroCusto).where(
+            *lanc_filter
+        ).group_by(*_agrupamento(grupo, CentroCusto.nome))
+
+    @staticmethod
+    def _filtros_ledger(
+        periodos: list[tuple[date, date]],
+        status_processo: StatusProcesso | None,
+        centro_custo_id: uuid.UUID | None
+    ) -> list:
+        filtros = [
+            DailyLedger.status != StatusLancamento.CANCELADO,
+            or_(*(and_(DailyLedger.data >= inicio, DailyLedger.data <= fim) for inicio, fim in periodos)),
+        ]
+        if centro_custo_id:
+            filtros.append(DailyLedger.centro_custo_id == centro_custo_id)
+        if status_processo:
+            filtros.append(DailyLedger.status_processo == status_processo.value)
+        return filtros
+
+    @staticmethod
+    def _agregado_ledger(filtros: list, grupo):
+        """
+        Mesma agregação lida do daily_ledger (período por vencimento): as linhas já
+        estão somadas por dia, então o custo depende dos dias do período, não do
+        volume de lançamentos.
+        """
+        receita = DailyLedger.tipo == TipoLancamento.RECEITA
+        despesa = DailyLedger.tipo == TipoLancamento.DESPESA
+        return select(
+            _rotulo_grupo(grupo),
+            CentroCusto.nome,
+            func.sum(case((receita, DailyLedger.valor), else_=0)).label("receitas"),
+            func.sum(case((despesa, DailyLedger.valor), else_=0)).label("despesas"),
+            func.sum(case((despesa, DailyLedger.quantidade), else_=0)).label("qtd_despesas"),
+            func.sum(case(
+                (despesa & (DailyLedger.natureza == NaturezaLancamento.FIXO), DailyLedger.valor), else_=0
+            )).label("despesas_fixas"),
+            func.sum(case(
+                (receita & (DailyLedger.natureza == NaturezaLancamento.EXITO), DailyLedger.valor), else_=0
+            )).label("receitas_exito"),
+            func.sum(case(
+                (receita & (DailyLedger.natureza == NaturezaLancamento.EXITO), DailyLedger.quantidade), else_=0
+            )).label("qtd_exito"),
+        ).select_from(DailyLedger).join(CentroCusto, CentroCusto.id == DailyLedger.centro_custo_id).where(
+            *filtros
+        ).group_by(*_agrupamento(grupo, CentroCusto.nome))
+
+    @staticmethod
+    def _serie(data, tipo, valor, filtros: list, granularidade: Granularidade, grupo=None):
+        """
+        Entradas e saídas por período de vencimento e o realizado acumulado (soma
+        em janela ordenada pelo período, por grupo). Lançamentos sem vencimento
+        (êxito aguardando) entram nos cards, não na série.
+        """
+        periodo = TruncarData(data, granularidade)
+        por_periodo = select(
+            _rotulo_grupo(grupo),
+            periodo.label("periodo"),
+            func.sum(case((tipo == TipoLancamento.RECEITA, valor), else_=0)).label("entradas"),
+            func.sum(case((tipo == TipoLancamento.DESPESA, valor), else_=0)).label("saidas"),
+        ).where(data.isnot(None), *filtros).group_by(*_agrupamento(grupo, periodo)).subquery()
+        return select(
+            por_periodo.c.grupo,
+            por_periodo.c.periodo,
+            por_periodo.c.entradas,
+            por_periodo.c.saidas,
+            func.sum(por_periodo.c.entradas - por_periodo.c.saidas).over(
+                partition_by=por_periodo.c.grupo, order_by=por_periodo.c.periodo
+            ).label("realizado"),
+        ).order_by(por_periodo.c.grupo, por_periodo.c.periodo)
+
+    async def pipeline(self, status_processo: StatusProcesso | None = None) -> float:
+        """
+        Pipeline de recebíveis (incerteza/êxito) dos processos ativos.
+        """
+        return float(await _escalar(self._consulta_pipeline(status_processo), self.db) or 0)
+
+    @staticmethod
+    def _consulta_pipeline(status_processo: StatusProcesso | None):
+        pipeline_query = select(
+            func.sum(Processo.valor_causa_estimado * Processo.percentual_exito / 100)
+        ).where(Processo.status == StatusProcesso.ATIVO)
+
+        if status_processo:
+            pipeline_query = pipeline_query.where(Processo.status == status_processo)
+
+        return pipeline_query
+
+def _rotulo_grupo(grupo):
+    return (grupo if grupo is not None else literal_column("0")).label("grupo")
+
+def _agrupamento(grupo, *colunas) -> list:
+    return [grupo, *colunas] if grupo is not None else list(colunas)
+
+async def _todas(stmt, db: AsyncSession) -> list:
+    return (await db.execute(stmt)).all()
+
+async def _escalar(stmt, db: AsyncSession):
+    return (await db.execute(stmt)).scalar()
@@ -0,0 +1,77 @@
+import hashlib
+from datetime import date
+from decimal import Decimal
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.transacao_processada import TransacaoProcessada
+from app.schemas.ofx import OfxTransactionSchema, ConciliacaoResult, ConciliacaoAceita
+
+# Pré-filtro da conciliação: transações OFX já baixadas por /aplicar são
+# reconhecidas pela chave e saem do lote antes da busca de candidatos.
+# Sugestões apenas exibidas (e eventualmente recusadas) não são registradas.
+
+# Chaves por consulta IN (limite de parâmetros do driver)
+CHAVES_POR_CONSULTA = 5000
+
+def chave(conta: str | None, fitid: str, valor: Decimal, data: date) -> str:
+    """
+    Hash de (conta, FITID, valor, data) de uma transação bancária.
+    """
+    conteudo = f"{conta or ''}|{fitid}|{valor.quantize(Decimal('0.01'))}|{data.isoformat()}"
+    return hashlib.sha1(conteudo.encode("utf-8")).hexdigest()
+
+def chave_transacao(tx: OfxTransactionSchema) -> str:
+    return chave(tx.conta, tx.id, tx.valor, tx.data)
+
+async def buscar_processadas(db: AsyncSession, chaves: list[str]) -> dict[str, TransacaoProcessada]:
+    processadas = {}
+    unicas = list(dict.fromkeys(chaves))
+    for inicio in range(0, len(unicas), CHAVES_POR_CONSULTA):
+        stmt = select(TransacaoProcessada).where(
+            TransacaoProcessada.chave.in_(unicas[inicio:inicio + CHAVES_POR_CONSULTA])
+        )
+        for registro in (await db.execute(stmt)).scalars():
+            processadas[registro.chave] = registro
+    return processadas
+
+async def registrar_processadas(db: AsyncSession, itens: list[ConciliacaoAceita]):
+    """
+    Registra as transações baixadas em INSERT multi-linha (o executemany do
+    SQLAlchemy agrupa as linhas em VALUES respeitando o limite de parâmetros), na
+    transação de quem chama: o commit é feito junto com a baixa dos lançamentos.
+    Chaves já existentes (aplicação concorrente do mesmo extrato) são ignoradas.
+    """
+    linhas = {}
+    for item in itens:
+        chave_item = chave(item.conta, item.ofx_id, item.valor, item.data)
+        linhas.setdefault(chave_item, {
+            "chave": chave_item,
+            "conta": item.conta,
+            "fitid": item.ofx_id,
+            "valor": item.valor,
+            "data": item.data,
+            "tipo_match": item.tipo_match,
+            "lancamento_id": item.lancamento_id,
+            "lancamento_ids": item.lancamento_ids,
+            "valor_taxa_sugerida": item.valor_taxa_sugerida,
+        })
+    if not linhas:
+        return
+
+    dialeto = db.get_bind().dialect.name
+    insert = postgresql.insert if dialeto == "postgresql" else sqlite.insert
+    stmt = insert(TransacaoProcessada).on_conflict_do_nothing(index_elements=["chave"])
+    await db.execute(stmt, list(linhas.values()))
+
+def resultado_processada(tx: OfxTransactionSchema, registro: TransacaoProcessada) -> ConciliacaoResult:
+    return ConciliacaoResult(
+        ofx_id=tx.id,
+        conta=tx.conta,
+        lancamento_id=registro.lancamento_id,
+        lancamento_ids=registro.lancamento_ids,
+        tipo_match="DUPLICATE",
+        valor_taxa_sugerida=registro.valor_taxa_sugerida,
+        mensagem=f"Transação já conciliada em importação anterior ({registro.tipo_match})."
+    )
@@ -0,0 +1,267 @@
+import csv
+import enum
+import io
+import re
+import zipfile
+from datetime import date
+from decimal import Decimal
+from typing import AsyncIterator, Iterable
+from xml.sax.saxutils import escape
+from sqlalchemy.engine import Row
+
+from app.core.projecao import Projecao
+from app.models.lancamento import Lancamento
+from app.schemas.lancamento import LancamentoPublic, FormatoExportacao
+from app.services.lancamento import filtros_listagem
+
+# Exportação de lançamentos em CSV, NDJSON ou XLSX, em memória constante: as
+# linhas vêm de um cursor do lado do servidor (yield_per) em lotes de
+# LOTE_EXPORTACAO e cada lote é convertido e enviado antes de buscar o seguinte.
+
+LOTE_EXPORTACAO = 2000
+
+CAMPOS_EXPORTACAO = (
+    "id,descricao,valor,valor_realizado,data_vencimento,data_pagamento,tipo,natureza,status,"
+    "participante.nome,processo.numero,centro_custo.nome,cartao.nome,reembolsavel"
+)
+
+MEDIA_TYPES = {
+    FormatoExportacao.CSV: "text/csv; charset=utf-8",
+    FormatoExportacao.NDJSON: "application/x-ndjson",
+    FormatoExportacao.XLSX: "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+def _texto(valor) -> str:
+    if valor is None:
+        return ""
+    if isinstance(valor, enum.Enum):
+        return str(valor.value)
+    if isinstance(valor, date):
+        return valor.isoformat()
+    return str(valor)
+
+# Início de célula que planilhas interpretam como fórmula (injeção de CSV)
+_INICIO_FORMULA = ("=", "+", "-", "@", "\t", "\r")
+
+def _celula_csv(valor) -> str:
+    """
+    Texto da célula CSV; texto livre iniciado por caractere de fórmula recebe
+    um apóstrofo à frente, para ser exibido como texto. Números (inclusive
+    negativos), datas e enums são escritos como estão.
+    """
+    texto = _texto(valor)
+    if isinstance(valor, str) and not isinstance(valor, enum.Enum) and texto.startswith(_INICIO_FORMULA):
+        return "'" + texto
+    return texto
+
+class _EscritorCsv:
+    def __init__(self, projecao: Projecao):
+        self.rotulos = projecao.rotulos
+        self._buffer = io.StringIO()
+        self._csv = csv.writer(self._buffer)
+
+    def _drenar(self) -> bytes:
+        dados = self._buffer.getvalue().encode()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return dados
+
+    def inicio(self) -> bytes:
+        # BOM: o Excel só lê o arquivo como UTF-8 (acentos) com ele
+        self._buffer.write("\ufeff")
+        self._csv.writerow(self.rotulos)
+        return self._drenar()
+
+    def lote(self, linhas: Iterable[Row]) -> bytes:
+        for linha in linhas:
+            valores = linha._mapping
+            self._csv.writerow([_celula_csv(valores[rotulo]) for rotulo in self.rotulos])
+        return self._drenar()
+
+    def fim(self) -> bytes:
+        return b""
+
+class _EscritorNdjson:
+    def __init__(self, projecao: Projecao):
+        self.projecao = projecao
+
+    def inicio(self) -> bytes:
+        return b""
+
+    def lote(self, linhas: Iterable[Row]) -> bytes:
+        return b"".join(self.projecao.serializar_linha(linha) + b"\n" for linha in linhas)
+
+    def fim(self) -> bytes:
+        return b""
+
+class _SaidaZip(io.RawIOBase):
+    """
+    Destino não posicionável do zipfile: acumula o que foi escrito até ser drenado.
+    Sem seek o zipfile grava os tamanhos em descritores após cada arquivo.
+    """
+
+    def __init__(self):
+        self._partes: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, dados) -> int:
+        self._partes.append(bytes(dados))
+        return len(dados)
+
+    def drenar(self) -> bytes:
+        dados = b"".join(self._partes)
+        self._partes.clear()
+        return dados
+
+# Caracteres de controle não são aceitos em XML 1.0
+_CONTROLE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+# Número de série do Excel: dias desde 30/12/1899
+_EPOCA_EXCEL = date(1899, 12, 30)
+
+_ARQUIVOS_XLSX = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '<Override PartName="/xl/styles.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Lancamentos" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '<Relationship Id="rId2" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+        'Target="styles.xml"/>'
+        '</Relationships>'
+    ),
+    # Estilo 1: data (formato 14), estilo 2: número com duas casas (formato 4)
+    "xl/styles.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+        '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+        '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+        '<fill><patternFill patternType="gray125"/></fill></fills>'
+        '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+        '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+        '<cellXfs count="3"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+        '<xf numFmtId="14" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+        '<xf numFmtId="4" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/></cellXfs>'
+        '</styleSheet>'
+    ),
+}
+
+def _celula(valor) -> str:
+    if valor is None:
+        return "<c/>"
+    if isinstance(valor, bool):
+        return f'<c t="b"><v>{int(valor)}</v></c>'
+    if isinstance(valor, Decimal):
+        return f'<c s="2"><v>{valor}</v></c>'
+    if isinstance(valor, (int, float)):
+        return f"<c><v>{valor}</v></c>"
+    if isinstance(valor, date):
+        return f'<c s="1"><v>{(valor - _EPOCA_EXCEL).days}</v></c>'
+    return f'<c t="inlineStr"><is><t>{escape(_CONTROLE.sub("", _texto(valor)))}</t></is></c>'
+
+class _EscritorXlsx:
+    """
+    Planilha de uma aba com strings inline (sem sharedStrings, que exigiria
+    guardar todos os textos) gravada direto no zip, lote a lote.
+    """
+
+    def __init__(self, projecao: Projecao):
+        self.rotulos = projecao.rotulos
+        self._saida = _SaidaZip()
+        self._zip = zipfile.ZipFile(self._saida, "w", compression=zipfile.ZIP_DEFLATED)
+        self._planilha = None
+
+    def inicio(self) -> bytes:
+        for nome, conteudo in _ARQUIVOS_XLSX.items():
+            self._zip.writestr(nome, conteudo)
+        self._planilha = self._zip.open("xl/worksheets/sheet1.xml", "w", force_zip64=True)
+        cabecalho = "".join(_celula(rotulo) for rotulo in self.rotulos)
+        self._planilha.write((
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+            f"<sheetData><row>{cabecalho}</row>"
+        ).encode())
+        return self._saida.drenar()
+
+    def lote(self, linhas: Iterable[Row]) -> bytes:
+        self._planilha.write("".join(
+            "<row>" + "".join(_celula(valor) for valor in (linha._mapping[r] for r in self.rotulos)) + "</row>"
+            for linha in linhas
+        ).encode())
+        return self._saida.drenar()
+
+    def fim(self) -> bytes:
+        self._planilha.write(b"</sheetData></worksheet>")
+        self._planilha.close()
+        self._zip.close()
+        return self._saida.drenar()
+
+ESCRITORES = {
+    FormatoExportacao.CSV: _EscritorCsv,
+    FormatoExportacao.NDJSON: _EscritorNdjson,
+    FormatoExportacao.XLSX: _EscritorXlsx,
+}
+
+class ExportacaoService:
+    """
+    Abre a própria sessão (session_factory) apenas enquanto lê as linhas: a
+    conexão volta ao pool assim que o último lote é buscado.
+    """
+
+    def __init__(self, session_factory):
+        self.session_factory = session_factory
+
+    def projecao(self, campos: str | None = None) -> Projecao:
+        """
+        Colunas exportadas (campos de LancamentoPublic); ValueError se inválidas.
+        """
+        return Projecao(Lancamento, LancamentoPublic, campos or CAMPOS_EXPORTACAO, obrigatorios=())
+
+    async def lancamentos(self, filtros: dict, formato: FormatoExportacao, projecao: Projecao) -> AsyncIterator[bytes]:
+        """
+        Conteúdo do arquivo em blocos; `filtros` são os argumentos de
+        filtros_listagem. Mesma ordem da listagem: (data_vencimento, id), sem
+        vencimento no fim.
+        """
+        escritor = ESCRITORES[formato](projecao)
+        yield escritor.inicio()
+
+        stmt = projecao.select().where(*filtros_listagem(**filtros)).order_by(
+            Lancamento.data_vencimento.asc().nulls_last(), Lancamento.id
+        ).execution_options(yield_per=LOTE_EXPORTACAO)
+        async with self.session_factory() as db:
+            resultado = await db.stream(stmt)
+            async for lote in resultado.partitions():
+                yield escritor.lote(lote)
+
+        yield escritor.fim()
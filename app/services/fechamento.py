@@ -0,0 +1,114 @@
+import uuid
+from datetime import date, timedelta
+from sqlalchemy import select, delete, insert, func, case, literal, union_all, or_, Date
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.daily_ledger import DailyLedger
+from app.models.fechamento import FechamentoMensal, SaldoFechamento
+from app.models.enums import StatusProcesso, StatusLancamento, TipoLancamento
+
+def ultimo_dia(mes: date) -> date:
+    return (mes.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+
+def _filtros(modelo, centro_custo_id: uuid.UUID | None, status_processo: StatusProcesso | None) -> list:
+    filtros = []
+    if centro_custo_id:
+        filtros.append(modelo.centro_custo_id == centro_custo_id)
+    if status_processo:
+        filtros.append(modelo.status_processo == status_processo.value)
+    return filtros
+
+def consulta_saldo(
+    ate: date,
+    centro_custo_id: uuid.UUID | None = None,
+    status_processo: StatusProcesso | None = None
+):
+    """
+    Saldo (receitas - despesas) acumulado desde o início até `ate`, inclusive:
+    saldos do último fechamento encerrado até essa data mais o daily_ledger do
+    período ainda aberto. O custo depende dos meses abertos, não do histórico.
+    """
+    fechados = FechamentoMensal.ate <= ate
+    corte_mes = select(func.max(FechamentoMensal.mes)).where(fechados).scalar_subquery()
+    corte_ate = select(func.max(FechamentoMensal.ate)).where(fechados).scalar_subquery()
+
+    fechado = select(SaldoFechamento.tipo, SaldoFechamento.valor).where(
+        SaldoFechamento.mes == corte_mes,
+        *_filtros(SaldoFechamento, centro_custo_id, status_processo)
+    )
+    aberto = select(DailyLedger.tipo, DailyLedger.valor).where(
+        DailyLedger.status != StatusLancamento.CANCELADO,
+        or_(corte_ate.is_(None), DailyLedger.data > corte_ate),
+        DailyLedger.data <= ate,
+        *_filtros(DailyLedger, centro_custo_id, status_processo)
+    )
+    partes = union_all(fechado, aberto).subquery()
+    return select(func.sum(case((partes.c.tipo == TipoLancamento.RECEITA, partes.c.valor), else_=-partes.c.valor)))
+
+class FechamentoService:
+    """
+    Fechamento mensal: congela em saldos_fechamento os totais acumulados até o
+    fim do mês (último fechamento + daily_ledger do intervalo), de modo que os
+    saldos "desde o início" leiam só os meses ainda abertos.
+    """
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def listar(self) -> list[FechamentoMensal]:
+        stmt = select(FechamentoMensal).order_by(FechamentoMensal.mes.desc())
+        return list((await self.db.execute(stmt)).scalars())
+
+    async def ultimo(self) -> FechamentoMensal | None:
+        stmt = select(FechamentoMensal).order_by(FechamentoMensal.mes.desc()).limit(1)
+        return (await self.db.execute(stmt)).scalar()
+
+    async def fechar(self, mes: date, usuario_id: uuid.UUID | None = None) -> FechamentoMensal:
+        mes = mes.replace(day=1)
+        ate = ultimo_dia(mes)
+        if ate >= date.today():
+            raise ValueError("Só é possível fechar meses já encerrados")
+        anterior = await self.ultimo()
+        if anterior is not None and anterior.mes >= mes:
+            raise ValueError(f"Meses até {anterior.mes:%m/%Y} já estão fechados")
+
+        fechamento = FechamentoMensal(mes=mes, ate=ate, usuario_id=usuario_id)
+        self.db.add(fechamento)
+        await self.db.flush()
+
+        colunas = [SaldoFechamento.centro_custo_id, SaldoFechamento.tipo, SaldoFechamento.status_processo]
+        aberto = select(
+            DailyLedger.centro_custo_id, DailyLedger.tipo, DailyLedger.status_processo,
+            DailyLedger.valor, DailyLedger.quantidade
+        ).where(
+            DailyLedger.status != StatusLancamento.CANCELADO,
+            DailyLedger.data <= ate
+        )
+        if anterior is not None:
+            aberto = aberto.where(DailyLedger.data > anterior.ate)
+            partes = union_all(
+                select(*colunas, SaldoFechamento.valor, SaldoFechamento.quantidade).where(
+                    SaldoFechamento.mes == anterior.mes
+                ),
+                aberto
+            ).subquery()
+        else:
+            partes = aberto.subquery()
+
+        chave = [partes.c.centro_custo_id, partes.c.tipo, partes.c.status_processo]
+        await self.db.execute(insert(SaldoFechamento).from_select(
+            ["mes", "centro_custo_id", "tipo", "status_processo", "valor", "quantidade"],
+            select(
+                literal(mes, Date), *chave, func.sum(partes.c.valor), func.sum(partes.c.quantidade)
+            ).group_by(*chave)
+        ))
+        await self.db.commit()
+        return fechamento
+
+    async def reabrir(self, mes: date) -> int:
+        """
+        Desfaz o fechamento de `mes` e dos meses seguintes; retorna quantos saíram.
+        """
+        mes = mes.replace(day=1)
+        await self.db.execute(delete(SaldoFechamento).where(SaldoFechamento.mes >= mes))
+        resultado = await self.db.execute(delete(FechamentoMensal).where(FechamentoMensal.mes >= mes))
+        await self.db.commit()
+        return resultado.rowcount
@@ -1,19 +1,120 @@
 
 import uuid
+from datetime import date
 from decimal import Decimal
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import Select, select, tuple_
 from sqlalchemy.orm import selectinload
 
+from app.core.paginacao import codificar_cursor, decodificar_cursor
 from app.models.lancamento import Lancamento
 from app.models.processo import Processo
 from app.models.enums import TipoLancamento, NaturezaLancamento, StatusLancamento
 from app.schemas.lancamento import LancamentoCreate, LancamentoUpdate
 
+# Tamanho máximo das páginas pedidas com cursor; sem cursor `limit` não tem teto
+LIMITE_POR_PAGINA = 1000
+
+def filtros_listagem(
+    data_inicio: date | None = None,
+    data_fim: date | None = None,
+    status: StatusLancamento | None = None,
+    tipo: TipoLancamento | None = None,
+    natureza: NaturezaLancamento | None = None,
+    centro_custo_id: uuid.UUID | None = None
+) -> list:
+    """
+    Condições WHERE dos filtros da listagem de lançamentos.
+    """
+    filtros = []
+    if data_inicio:
+        filtros.append(Lancamento.data_vencimento >= data_inicio)
+    if data_fim:
+        filtros.append(Lancamento.data_vencimento <= data_fim)
+    if status:
+        filtros.append(Lancamento.status == status)
+    if tipo:
+        filtros.append(Lancamento.tipo == tipo)
+    if natureza:
+        filtros.append(Lancamento.natureza == natureza)
+    if centro_custo_id:
+        filtros.append(Lancamento.centro_custo_id == centro_custo_id)
+    return filtros
+
+def _com_vencimento(consulta: Select, filtros: list, apos: tuple[date | None, uuid.UUID] | None) -> Select:
+    stmt = consulta.where(*filtros, Lancamento.data_vencimento.is_not(None))
+    if apos:
+        stmt = stmt.where(tuple_(Lancamento.data_vencimento, Lancamento.id) > tuple_(*apos))
+    return stmt.order_by(Lancamento.data_vencimento, Lancamento.id)
+
+def _sem_vencimento(consulta: Select, filtros: list, apos_id: uuid.UUID | None) -> Select:
+    stmt = consulta.where(*filtros, Lancamento.data_vencimento.is_(None))
+    if apos_id:
+        stmt = stmt.where(Lancamento.id > apos_id)
+    return stmt.order_by(Lancamento.id)
+
 class LancamentoService:
     def __init__(self, db: AsyncSession):
         self.db = db
 
+    async def listar(
+        self,
+        filtros: dict,
+        limit: int = 100,
+        cursor: str | None = None,
+        skip: int = 0,
+        options: tuple = (),
+        consulta: Select | None = None
+    ) -> tuple[list, str | None]:
+        """
+        Página ordenada por (data_vencimento, id), com os lançamentos sem
+        vencimento no fim, e o cursor da página seguinte (None na última).
+        `filtros` são os argumentos de filtros_listagem. `consulta` substitui
+        select(Lancamento) (ex.: Projecao.select()); suas linhas precisam expor
+        data_vencimento e id, e são devolvidas como Row.
+
+        Com `cursor` a consulta parte da chave da última linha entregue: cada
+        página é uma busca no índice (data_vencimento, id), de custo igual na
+        primeira e na milésima página, e inserções concorrentes não repetem nem
+        escondem linhas. `skip` (OFFSET) fica para compatibilidade e é ignorado
+        quando há cursor. Com cursor a página tem no máximo LIMITE_POR_PAGINA
+        linhas (o restante segue pelo próximo cursor).
+        """
+        if cursor:
+            limit = min(limit, LIMITE_POR_PAGINA)
+        async def executar(stmt: Select) -> list:
+            resultado = await self.db.execute(stmt.options(*options))
+            return list(resultado.all() if consulta is not None else resultado.scalars().all())
+
+        base = consulta if consulta is not None else select(Lancamento)
+        if skip and not cursor:
+            linhas = await executar(base.where(*filtros_listagem(**filtros)).order_by(
+                Lancamento.data_vencimento.asc().nulls_last(), Lancamento.id
+            ).offset(skip).limit(limit + 1))
+        else:
+            apos = decodificar_cursor(cursor) if cursor else None
+            com_periodo = bool(filtros.get("data_inicio") or filtros.get("data_fim"))
+            linhas = []
+            # Duas buscas por índice em vez de um OR: primeiro as datas, depois os NULL
+            if apos is None or apos[0] is not None:
+                inicio = filtros.get("data_inicio")
+                if apos:
+                    # Com filtro de período o índice é percorrido a partir do cursor,
+                    # não do início do período
+                    inicio = max(inicio or apos[0], apos[0])
+                stmt = _com_vencimento(base, filtros_listagem(**filtros | {"data_inicio": inicio}), apos)
+                linhas = await executar(stmt.limit(limit + 1))
+                apos = None
+            # Filtro de período exclui os lançamentos sem vencimento
+            if len(linhas) <= limit and not com_periodo:
+                stmt = _sem_vencimento(base, filtros_listagem(**filtros), apos[1] if apos else None)
+                linhas += await executar(stmt.limit(limit + 1 - len(linhas)))
+
+        if len(linhas) <= limit:
+            return linhas, None
+        del linhas[limit:]
+        return linhas, codificar_cursor(linhas[-1].data_vencimento, linhas[-1].id)
+
     async def create(self, lancamento_in: LancamentoCreate) -> Lancamento:
         db_lancamento = Lancamento(**lancamento_in.model_dump())
         self.db.add(db_lancamento)
@@ -0,0 +1,128 @@
+import uuid
+from sqlalchemy import select, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.audit import registrar_auditoria_em_lote
+from app.core.ledger import CAMPOS, registrar_movimentos
+from app.models.lancamento import Lancamento
+from app.models.participante import Participante
+from app.models.processo import Processo
+from app.models.cartao_credito import CartaoCredito
+from app.models.centro_custo import CentroCusto
+from app.models.enums import TipoLancamento, NaturezaLancamento, StatusLancamento
+from app.schemas.lancamento import LancamentoCreate
+
+# Chaves estrangeiras conferidas antes do INSERT: campo -> modelo referenciado
+REFERENCIAS = {
+    "participante_id": Participante,
+    "centro_custo_id": CentroCusto,
+    "cartao_id": CartaoCredito,
+    "lancamento_pai_id": Lancamento,
+}
+
+# render_nulls: sem ele o INSERT em lote do ORM separa as linhas pelo conjunto de
+# colunas não nulas e emite um comando por grupo
+_INSERT = insert(Lancamento).returning(Lancamento, sort_by_parameter_order=True).execution_options(render_nulls=True)
+
+class LoteInvalido(ValueError):
+    """
+    Linhas do lote que não podem ser gravadas: (índice, campo, mensagem).
+    """
+    def __init__(self, erros: list[tuple[int, str, str]]):
+        super().__init__(f"{len(erros)} erro(s) no lote")
+        self.erros = erros
+
+class LancamentoLoteService:
+    """
+    Inclusão de vários lançamentos em uma transação: referências conferidas com
+    uma consulta por tabela, um INSERT multi-linha para os lançamentos e outro
+    para os reembolsos das despesas reembolsáveis, com daily_ledger e auditoria
+    gravados em lote. Qualquer erro recusa o lote inteiro.
+    """
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def criar(self, lancamentos_in: list[LancamentoCreate]) -> tuple[list[Lancamento], list[Lancamento]]:
+        """
+        Lançamentos criados (na ordem recebida) e reembolsos gerados.
+        LoteInvalido se alguma linha tiver referência inexistente ou for
+        inconsistente.
+        """
+        linhas = [{"id": uuid.uuid4()} | lancamento.model_dump() for lancamento in lancamentos_in]
+        clientes = await self._validar(linhas)
+
+        reembolsos_in = [
+            self._reembolso(linha, clientes[linha["processo_id"]]) for linha in linhas
+            if linha["reembolsavel"] and linha["tipo"] == TipoLancamento.DESPESA and linha["processo_id"]
+        ]
+        # INSERT em lote não passa pelo flush do ORM: o daily_ledger é ajustado aqui,
+        # antes dos INSERTs, pois é também a verificação de mês fechado
+        await self.db.run_sync(
+            registrar_movimentos, [], [{campo: linha[campo] for campo in CAMPOS} for linha in linhas + reembolsos_in]
+        )
+
+        criados = list((await self.db.scalars(_INSERT, linhas)).all())
+        reembolsos = []
+        if reembolsos_in:
+            reembolsos = list((await self.db.scalars(_INSERT, reembolsos_in)).all())
+
+        await registrar_auditoria_em_lote(self.db, Lancamento.__tablename__, "INSERT", [
+            (linha["id"], None, {k: v for k, v in linha.items() if v is not None}) for linha in linhas + reembolsos_in
+        ])
+        await self.db.commit()
+        return criados, reembolsos
+
+    async def _validar(self, linhas: list[dict]) -> dict[uuid.UUID, uuid.UUID]:
+        """
+        Confere as referências de todas as linhas; devolve o cliente de cada processo citado.
+        """
+        existentes = {}
+        for campo, modelo in REFERENCIAS.items():
+            ids = {linha[campo] for linha in linhas if linha[campo]}
+            existentes[campo] = set()
+            if ids:
+                existentes[campo] = set((await self.db.scalars(select(modelo.id).where(modelo.id.in_(ids)))).all())
+
+        processo_ids = {linha["processo_id"] for linha in linhas if linha["processo_id"]}
+        clientes = {}
+        if processo_ids:
+            stmt = select(Processo.id, Processo.cliente_id).where(Processo.id.in_(processo_ids))
+            clientes = {linha.id: linha.cliente_id for linha in await self.db.execute(stmt)}
+
+        erros = []
+        for indice, linha in enumerate(linhas):
+            for campo in REFERENCIAS:
+                if linha[campo] and linha[campo] not in existentes[campo]:
+                    erros.append((indice, campo, "Registro referenciado não encontrado"))
+            if linha["processo_id"] and linha["processo_id"] not in clientes:
+                erros.append((indice, "processo_id", "Registro referenciado não encontrado"))
+            if linha["natureza"] == NaturezaLancamento.EXITO and not linha["processo_id"]:
+                erros.append((indice, "processo_id", "Lançamento de êxito exige processo"))
+        if erros:
+            raise LoteInvalido(erros)
+        return clientes
+
+    @staticmethod
+    def _reembolso(despesa: dict, cliente_id: uuid.UUID) -> dict:
+        """
+        Receita de reembolso da despesa, cobrada do cliente do processo (como
+        LancamentoService._gerar_reembolso).
+        """
+        return {
+            "id": uuid.uuid4(),
+            "descricao": f"Reembolso - {despesa['descricao']}",
+            "valor": despesa["valor"],
+            "valor_realizado": None,
+            "valor_previsto": None,
+            "data_vencimento": despesa["data_vencimento"],
+            "data_pagamento": None,
+            "tipo": TipoLancamento.RECEITA,
+            "natureza": NaturezaLancamento.PONTUAL,
+            "status": StatusLancamento.PENDENTE,
+            "participante_id": cliente_id,
+            "processo_id": despesa["processo_id"],
+            "cartao_id": None,
+            "centro_custo_id": despesa["centro_custo_id"],
+            "reembolsavel": False,
+            "lancamento_pai_id": despesa["id"],
+        }
@@ -1,10 +1,35 @@
 
+import html
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
 from io import BytesIO
 from decimal import Decimal
-from datetime import date
+from datetime import date, datetime, timedelta
 from ofxparse import OfxParser as LibOfxParser
+from app.core.config import settings
 from app.schemas.ofx import OfxTransactionSchema
 
+# Tamanho dos blocos lidos do upload na leitura incremental
+TAMANHO_BLOCO = 64 * 1024
+
+_process_pool: ProcessPoolExecutor | None = None
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Pool de processos para a leitura de arquivos OFX fora do event loop (criado sob demanda).
+    """
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=settings.OFX_PARSE_WORKERS)
+    return _process_pool
+
+def shutdown_process_pool():
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+
 class OfxParserService:
     @staticmethod
     def parse_file(file_content: bytes) -> list[OfxTransactionSchema]:
@@ -28,6 +53,11 @@ class OfxParserService:
         for account in accounts:
             if not hasattr(account, 'statement') or not account.statement:
                 continue
+
+            # ofxparse expõe o ACCTID como account_id (str)
+            conta = getattr(account, 'account_id', None)
+            if not isinstance(conta, str) or not conta:
+                conta = None
                 
             for tx in account.statement.transactions:
                 # Converter para o nosso schema
@@ -48,7 +78,154 @@ class OfxParserService:
                     id=tx_id,
                     data=tx_date,
                     valor=valor,
-                    descricao=descricao
+                    descricao=descricao,
+                    conta=conta
                 ))
                 
         return transactions
+
+    @staticmethod
+    def parse_file_cronometrado(file_content: bytes) -> tuple[list[OfxTransactionSchema], float]:
+        """
+        parse_file com o tempo gasto (em segundos); usado pelo pool de processos.
+        """
+        inicio = time.perf_counter()
+        transacoes = OfxParserService.parse_file(file_content)
+        return transacoes, time.perf_counter() - inicio
+
+
+_INICIO_TRANSACAO = re.compile(rb"<STMTTRN>", re.IGNORECASE)
+_FIM_TRANSACAO = re.compile(rb"</STMTTRN>", re.IGNORECASE)
+_INICIO_CORPO = re.compile(rb"<OFX>", re.IGNORECASE)
+_ELEMENTO = re.compile(rb"<([A-Za-z0-9.]+)>([^<]*)")
+_CONTA = re.compile(rb"<ACCTID>([^<]*)<", re.IGNORECASE)
+_LISTA_TRANSACOES = re.compile(rb"<(/?)BANKTRANLIST>", re.IGNORECASE)
+_CHARSET = re.compile(rb"CHARSET:\s*([\w-]+)", re.IGNORECASE)
+_ENCODING = re.compile(rb"(?:ENCODING:\s*|encoding=[\"'])([\w-]+)", re.IGNORECASE)
+_FUSO = re.compile(r"\[(?P<tz>[-+]?\d+\.?\d*)\:\w*\]$")
+
+# Tamanho máximo do cabeçalho antes de <OFX>
+_LIMITE_CABECALHO = 16 * 1024
+
+class OfxStreamParser:
+    """
+    Leitor incremental de OFX (SGML 1.x e XML 2.x).
+
+    Recebe o arquivo em blocos via feed() e devolve as transações completas
+    encontradas até ali; só o trecho ainda incompleto fica em memória.
+    Datas, valores e descrições seguem as mesmas regras de OfxParserService.parse_file.
+    """
+    def __init__(self):
+        self._buffer = bytearray()
+        self._encoding: str | None = None
+        self._conta: str | None = None
+        # <BANKTRANLIST> aberto sem o </BANKTRANLIST> correspondente até aqui
+        self._lista_aberta = False
+
+    def feed(self, bloco: bytes) -> list[OfxTransactionSchema]:
+        self._buffer.extend(bloco)
+
+        if self._encoding is None:
+            inicio = _INICIO_CORPO.search(self._buffer)
+            if inicio is None:
+                if len(self._buffer) > _LIMITE_CABECALHO:
+                    raise ValueError("Cabeçalho OFX não encontrado")
+                return []
+            self._encoding = self._detectar_encoding(bytes(self._buffer[:inicio.start()]))
+            del self._buffer[:inicio.end()]
+
+        transacoes = []
+        while True:
+            inicio = _INICIO_TRANSACAO.search(self._buffer)
+            self._atualizar_conta(inicio.start() if inicio else len(self._buffer))
+            if inicio is None:
+                # Mantém só a partir do último '<' (tag ou elemento partido entre blocos)
+                del self._buffer[:max(self._buffer.rfind(b"<"), 0)]
+                break
+            fim = _FIM_TRANSACAO.search(self._buffer, inicio.end())
+            if fim is None:
+                del self._buffer[:inicio.start()]
+                break
+            transacoes.append(self._converter(bytes(self._buffer[inicio.end():fim.start()])))
+            del self._buffer[:fim.end()]
+
+        return transacoes
+
+    def close(self) -> list[OfxTransactionSchema]:
+        """
+        Fim do arquivo. ValueError se ele terminou no meio de uma transação ou
+        da lista de transações (upload truncado), em vez de descartar a última
+        transação em silêncio.
+        """
+        if self._encoding is None:
+            raise ValueError("Cabeçalho OFX não encontrado")
+        if _INICIO_TRANSACAO.search(self._buffer):
+            raise ValueError("Arquivo OFX truncado: transação sem </STMTTRN>")
+        self._atualizar_conta(len(self._buffer))
+        if self._lista_aberta:
+            raise ValueError("Arquivo OFX truncado: lista de transações sem </BANKTRANLIST>")
+        self._buffer.clear()
+        return []
+
+    def _atualizar_conta(self, fim: int):
+        # A conta (BANKACCTFROM/CCACCTFROM) vem antes da lista de transações do extrato.
+        # Trechos podem ser lidos de novo no bloco seguinte: o estado só guarda a última tag vista
+        for conta in _CONTA.finditer(self._buffer, 0, fim):
+            valor = conta.group(1).strip()
+            self._conta = valor.decode("ascii", errors="replace") if valor else None
+        for lista in _LISTA_TRANSACOES.finditer(self._buffer, 0, fim):
+            self._lista_aberta = not lista.group(1)
+
+    @staticmethod
+    def _detectar_encoding(cabecalho: bytes) -> str:
+        encoding = _ENCODING.search(cabecalho)
+        if encoding and encoding.group(1).upper().replace(b"-", b"") == b"UTF8":
+            return "utf-8"
+        charset = _CHARSET.search(cabecalho)
+        if charset and charset.group(1).upper() in (b"ISO-8859-1", b"8859-1", b"LATIN1"):
+            return "latin-1"
+        return "cp1252"
+
+    def _converter(self, trecho: bytes) -> OfxTransactionSchema:
+        campos: dict[str, str] = {}
+        for tag, valor in _ELEMENTO.findall(trecho):
+            valor = valor.strip()
+            if valor:
+                texto = html.unescape(valor.decode(self._encoding, errors="replace"))
+                campos.setdefault(tag.decode("ascii").upper(), texto)
+
+        if "TRNAMT" not in campos:
+            raise ValueError("Missing Transaction Amount (a required field)")
+        if "DTPOSTED" not in campos:
+            raise ValueError("Missing Transaction Date (a required field)")
+
+        return OfxTransactionSchema(
+            id=campos.get("FITID", ""),
+            data=_data_ofx(campos["DTPOSTED"]),
+            valor=_valor_ofx(campos["TRNAMT"]),
+            descricao=(campos.get("MEMO") or campos.get("NAME") or "Transação OFX").strip(),
+            conta=self._conta
+        )
+
+def _data_ofx(texto: str) -> date:
+    # Mesma regra do ofxparse: o horário local é convertido para UTC pelo fuso entre colchetes
+    fuso = _FUSO.search(texto)
+    deslocamento = timedelta(hours=float(fuso.group("tz"))) if fuso else timedelta(0)
+    try:
+        local = datetime.strptime(texto[:14], "%Y%m%d%H%M%S")
+    except ValueError:
+        local = datetime.strptime(texto[:8], "%Y%m%d")
+    return (local - deslocamento).date()
+
+def _valor_ofx(texto: str) -> Decimal:
+    # Mesmos formatos aceitos pelo ofxparse (1.025,53 / 1,025.53 / 1025,53 / +1058,53)
+    if re.search(r".*\..*,", texto):
+        texto = texto.replace(".", "")
+    if re.search(r".*,.*\.", texto):
+        texto = texto.replace(",", "")
+    if "." not in texto and "," in texto:
+        texto = texto.replace(",", ".")
+    texto = texto.replace(" ", "").replace("+", "")
+    if texto in ("null", "-null"):
+        return Decimal(0)
+    return Decimal(texto)
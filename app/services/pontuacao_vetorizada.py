@@ -0,0 +1,139 @@
+from decimal import Decimal
+from fractions import Fraction
+
+try:
+    import numpy as np
+except ImportError:  # numpy é opcional: sem ele a conciliação usa apenas o caminho Decimal
+    np = None
+
+# Pontuação vetorizada da conciliação gulosa: valores em centavos (int64) e datas
+# em ordinais de dia, avaliando todos os pares (transação, candidato) de um bloco
+# de uma vez. Reproduz exatamente as regras de ConciliacaoService.conciliar_transacao:
+# - EXACT: primeiro candidato (na ordem de carga) com o mesmo valor absoluto;
+# - PARTIAL: menor diferença percentual abaixo da tolerância, primeiro em caso de empate.
+
+SEM_MATCH = 0
+EXATO = 1
+PARCIAL = 2
+
+# A partir deste número de transações a conciliação gulosa usa este caminho
+LIMIAR_TRANSACOES = 1000
+
+# Quantidade máxima de pares avaliados por bloco (limita a memória dos arrays)
+PARES_POR_BLOCO = 2_000_000
+
+# Folga relativa usada para detectar empates prováveis na razão em ponto flutuante;
+# os empates são desfeitos com aritmética exata.
+_FOLGA_EMPATE = 1e-9
+
+def disponivel() -> bool:
+    return np is not None
+
+def centavos(valor: Decimal) -> int | None:
+    """
+    Valor absoluto em centavos, ou None se o valor tiver mais de duas casas decimais.
+    """
+    escalado = abs(valor) * 100
+    inteiro = int(escalado)
+    return inteiro if inteiro == escalado else None
+
+def escolher_candidatos(
+    tx_dias: "np.ndarray",
+    tx_centavos: "np.ndarray",
+    cand_dias: "np.ndarray",
+    cand_centavos: "np.ndarray",
+    cand_posicoes: "np.ndarray",
+    janela_dias: int,
+    tolerancia_percentual: int
+) -> tuple["np.ndarray", "np.ndarray"]:
+    """
+    Retorna (tipo, candidato) para cada transação.
+
+    Os candidatos devem estar ordenados por dia; cand_posicoes é a ordem original
+    de carga, usada no desempate. tipo é SEM_MATCH, EXATO ou PARCIAL e candidato é
+    o índice escolhido (-1 quando SEM_MATCH).
+    """
+    n = len(tx_dias)
+    tipos = np.zeros(n, dtype=np.int8)
+    escolhidos = np.full(n, -1, dtype=np.int64)
+
+    inicio = np.searchsorted(cand_dias, tx_dias - janela_dias, side="left")
+    fim = np.searchsorted(cand_dias, tx_dias + janela_dias, side="right")
+    quantidades = fim - inicio
+
+    # Agrupa transações consecutivas em blocos de até PARES_POR_BLOCO pares
+    acumulado = np.cumsum(quantidades)
+
+    # Posição de carga -> índice no array ordenado por dia
+    por_posicao = np.empty_like(cand_posicoes)
+    por_posicao[cand_posicoes] = np.arange(len(cand_posicoes))
+
+    bloco_inicio = 0
+    while bloco_inicio < n:
+        base = acumulado[bloco_inicio - 1] if bloco_inicio else 0
+        bloco_fim = int(np.searchsorted(acumulado, base + PARES_POR_BLOCO, side="right"))
+        bloco_fim = max(bloco_fim, bloco_inicio + 1)
+        _escolher_bloco(
+            slice(bloco_inicio, bloco_fim), inicio, quantidades, tx_centavos,
+            cand_centavos, cand_posicoes, por_posicao, tolerancia_percentual, tipos, escolhidos
+        )
+        bloco_inicio = bloco_fim
+
+    return tipos, escolhidos
+
+def _escolher_bloco(bloco, inicio, quantidades, tx_centavos, cand_centavos, cand_posicoes,
+                    por_posicao, tolerancia_percentual, tipos, escolhidos):
+    qtd = quantidades[bloco]
+    com_candidatos = np.flatnonzero(qtd) + bloco.start
+    if len(com_candidatos) == 0:
+        return
+
+    qtd = quantidades[com_candidatos]
+    total = int(qtd.sum())
+    segmentos = np.concatenate(([0], np.cumsum(qtd)[:-1]))
+
+    # Pares (transação, candidato) do bloco, contíguos por transação
+    tx_par = np.repeat(com_candidatos, qtd)
+    cand_par = np.arange(total) - np.repeat(segmentos, qtd) + np.repeat(inicio[com_candidatos], qtd)
+
+    valor_tx = tx_centavos[tx_par]
+    valor_cand = cand_centavos[cand_par]
+    posicao = cand_posicoes[cand_par]
+    sem_posicao = np.iinfo(np.int64).max
+
+    # Exata: menor posição de carga entre os candidatos de mesmo valor
+    exata = valor_cand == valor_tx
+    primeira_exata = np.minimum.reduceat(np.where(exata, posicao, sem_posicao), segmentos)
+    tem_exata = primeira_exata != sem_posicao
+
+    # Parcial: diferença / valor < tolerância  <=>  diferença * 100 < valor * tolerância
+    diferenca = np.abs(valor_cand - valor_tx)
+    valida = (valor_cand > 0) & (diferenca * 100 < valor_cand * tolerancia_percentual)
+    razao = np.where(valida, diferenca / np.maximum(valor_cand, 1), np.inf)
+    menor_razao = np.minimum.reduceat(razao, segmentos)
+    tem_parcial = ~tem_exata & np.isfinite(menor_razao)
+
+    proxima = valida & (razao <= np.repeat(menor_razao, qtd) * (1 + _FOLGA_EMPATE))
+    primeira_proxima = np.minimum.reduceat(np.where(proxima, posicao, sem_posicao), segmentos)
+    empates = np.add.reduceat(proxima.astype(np.int64), segmentos)
+
+    tipos[com_candidatos[tem_exata]] = EXATO
+    escolhidos[com_candidatos[tem_exata]] = por_posicao[primeira_exata[tem_exata]]
+
+    tipos[com_candidatos[tem_parcial]] = PARCIAL
+    escolhidos[com_candidatos[tem_parcial]] = por_posicao[primeira_proxima[tem_parcial]]
+
+    # Empates prováveis em ponto flutuante: desempata com frações exatas, na ordem de carga
+    for k in np.flatnonzero(tem_parcial & (empates > 1)):
+        inicio_seg = segmentos[k]
+        fim_seg = inicio_seg + qtd[k]
+        pares = [
+            (int(posicao[p]), Fraction(int(diferenca[p]), int(valor_cand[p])))
+            for p in range(inicio_seg, fim_seg) if proxima[p]
+        ]
+        pares.sort()
+        melhor_posicao, melhor_razao = pares[0]
+        for pos, r in pares[1:]:
+            if r < melhor_razao:
+                melhor_posicao, melhor_razao = pos, r
+        escolhidos[com_candidatos[k]] = por_posicao[melhor_posicao]
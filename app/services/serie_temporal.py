@@ -0,0 +1,203 @@
+import calendar
+import math
+from datetime import date, timedelta
+from typing import Callable, Sequence, TypeVar
+from sqlalchemy import Date
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ColumnElement, FunctionElement
+from sqlalchemy.sql.visitors import InternalTraversal
+from app.schemas.dashboard import Granularidade, Comparacao
+
+# Agrupamento das séries do dashboard em períodos (dia, semana, mês, trimestre)
+# feito no banco, redução do número de pontos (LTTB) para os gráficos e
+# alinhamento de um período de comparação com o período analisado.
+
+T = TypeVar("T")
+
+# Duração aproximada de cada período, em dias, para a escolha automática
+DIAS_POR_PERIODO = {
+    Granularidade.DIA: 1,
+    Granularidade.SEMANA: 7,
+    Granularidade.MES: 30.44,
+    Granularidade.TRIMESTRE: 91.31,
+}
+
+_DATE_TRUNC = {
+    Granularidade.DIA: "day",
+    Granularidade.SEMANA: "week",
+    Granularidade.MES: "month",
+    Granularidade.TRIMESTRE: "quarter",
+}
+
+class TruncarData(FunctionElement):
+    """
+    Primeiro dia do período (semana ISO, começando na segunda-feira) que contém
+    a data: date_trunc no PostgreSQL e funções de data equivalentes no SQLite.
+    """
+    type = Date()
+    inherit_cache = True
+    # A granularidade entra na chave do cache de compilação
+    _traverse_internals = FunctionElement._traverse_internals + [("granularidade", InternalTraversal.dp_string)]
+
+    def __init__(self, coluna: ColumnElement, granularidade: Granularidade):
+        self.granularidade = granularidade
+        super().__init__(coluna)
+
+@compiles(TruncarData)
+def _truncar_data_postgresql(elemento: TruncarData, compiler, **kw):
+    coluna = compiler.process(elemento.clauses, **kw)
+    return f"CAST(date_trunc('{_DATE_TRUNC[elemento.granularidade]}', {coluna}) AS DATE)"
+
+@compiles(TruncarData, "sqlite")
+def _truncar_data_sqlite(elemento: TruncarData, compiler, **kw):
+    coluna = compiler.process(elemento.clauses, **kw)
+    if elemento.granularidade == Granularidade.SEMANA:
+        return f"date({coluna}, '-' || ((CAST(strftime('%w', {coluna}) AS INTEGER) + 6) % 7) || ' days')"
+    if elemento.granularidade == Granularidade.MES:
+        return f"date({coluna}, 'start of month')"
+    if elemento.granularidade == Granularidade.TRIMESTRE:
+        return (
+            f"date({coluna}, 'start of month', "
+            f"'-' || ((CAST(strftime('%m', {coluna}) AS INTEGER) - 1) % 3) || ' months')"
+        )
+    return f"date({coluna})"
+
+def escolher_granularidade(
+    granularidade: Granularidade,
+    data_inicio: date | None,
+    data_fim: date | None,
+    max_pontos: int
+) -> Granularidade:
+    """
+    Resolve AUTO: o menor período em que o intervalo cabe em `max_pontos` pontos
+    (DIA quando não há intervalo de vencimento, como a série diária anterior).
+    """
+    if granularidade != Granularidade.AUTO:
+        return granularidade
+    if not (data_inicio and data_fim):
+        return Granularidade.DIA
+    dias = (data_fim - data_inicio).days + 1
+    for candidata, duracao in DIAS_POR_PERIODO.items():
+        if math.ceil(dias / duracao) <= max_pontos:
+            return candidata
+    return Granularidade.TRIMESTRE
+
+def lttb(pontos: Sequence[T], limite: int, x: Callable[[T], float], y: Callable[[T], float]) -> list[T]:
+    """
+    Largest-Triangle-Three-Buckets: mantém o primeiro e o último ponto e, de cada
+    um dos `limite` - 2 grupos intermediários, o ponto que forma o maior triângulo
+    com o escolhido no grupo anterior e a média do grupo seguinte.
+    """
+    if limite >= len(pontos) or limite < 3:
+        return list(pontos)
+
+    escolhidos = [pontos[0]]
+    tamanho = (len(pontos) - 2) / (limite - 2)
+    anterior = pontos[0]
+    for grupo in range(limite - 2):
+        inicio = int(grupo * tamanho) + 1
+        fim = int((grupo + 1) * tamanho) + 1
+        seguinte = pontos[fim:min(int((grupo + 2) * tamanho) + 1, len(pontos) - 1)] or [pontos[-1]]
+        media_x = sum(x(p) for p in seguinte) / len(seguinte)
+        media_y = sum(y(p) for p in seguinte) / len(seguinte)
+
+        ax, ay = x(anterior), y(anterior)
+        anterior = max(
+            pontos[inicio:fim],
+            key=lambda p: abs((ax - media_x) * (y(p) - ay) - (ax - x(p)) * (media_y - ay))
+        )
+        escolhidos.append(anterior)
+    escolhidos.append(pontos[-1])
+    return escolhidos
+
+def faixas(pontos: Sequence[T], limite: int, dia: Callable[[T], date]) -> list[list[T]]:
+    """
+    Pontos (em ordem de data) separados em no máximo `limite` faixas consecutivas
+    de mesma duração, para somar os valores de cada uma (barras de entradas e
+    saídas, em que descartar pontos, como no LTTB, descartaria dinheiro).
+    Faixas sem pontos não aparecem.
+    """
+    if limite >= len(pontos) or limite < 1:
+        return [[ponto] for ponto in pontos]
+    primeiro = dia(pontos[0]).toordinal()
+    largura = (dia(pontos[-1]).toordinal() - primeiro) // limite + 1
+    grupos: dict[int, list[T]] = {}
+    for ponto in pontos:
+        grupos.setdefault((dia(ponto).toordinal() - primeiro) // largura, []).append(ponto)
+    return list(grupos.values())
+
+def somar_meses(dia: date, meses: int) -> date:
+    """
+    Mesmo dia `meses` depois (ou antes), limitado ao último dia do mês de destino.
+    """
+    indice = dia.year * 12 + dia.month - 1 + meses
+    ano, mes = divmod(indice, 12)
+    return date(ano, mes + 1, min(dia.day, calendar.monthrange(ano, mes + 1)[1]))
+
+def _meses_inteiros(data_inicio: date, data_fim: date) -> int | None:
+    """
+    Quantidade de meses quando o intervalo vai do dia 1 ao último dia de um mês.
+    """
+    if data_inicio.day != 1 or (data_fim + timedelta(days=1)).day != 1:
+        return None
+    return (data_fim.year - data_inicio.year) * 12 + data_fim.month - data_inicio.month + 1
+
+def periodo_comparacao(
+    data_inicio: date,
+    data_fim: date,
+    comparar_com: Comparacao,
+    comparacao_inicio: date | None = None
+) -> tuple[date, date]:
+    """
+    Intervalo comparado com [data_inicio, data_fim]: o imediatamente anterior de
+    mesma duração (meses inteiros recuam em meses: julho compara com junho), o
+    mesmo intervalo um ano antes, ou o de mesma duração a partir de
+    `comparacao_inicio`. Não pode se sobrepor ao período analisado.
+    """
+    meses = _meses_inteiros(data_inicio, data_fim)
+    if comparar_com == Comparacao.PERIODO_ANTERIOR:
+        if meses:
+            inicio = somar_meses(data_inicio, -meses)
+            fim = data_inicio - timedelta(days=1)
+        else:
+            fim = data_inicio - timedelta(days=1)
+            inicio = fim - (data_fim - data_inicio)
+    elif comparar_com == Comparacao.ANO_ANTERIOR:
+        inicio = somar_meses(data_inicio, -12)
+        fim = somar_meses(data_fim + timedelta(days=1), -12) - timedelta(days=1) if meses else somar_meses(data_fim, -12)
+    else:
+        if comparacao_inicio is None:
+            raise ValueError("comparacao_inicio é obrigatório na comparação personalizada")
+        inicio = comparacao_inicio
+        fim = (
+            somar_meses(inicio, meses) - timedelta(days=1) if meses and inicio.day == 1
+            else inicio + (data_fim - data_inicio)
+        )
+
+    if inicio <= data_fim and data_inicio <= fim:
+        raise ValueError("O período de comparação não pode se sobrepor ao período analisado")
+    return inicio, fim
+
+def inicio_do_periodo(dia: date, granularidade: Granularidade) -> date:
+    """
+    Equivalente em Python de TruncarData.
+    """
+    if granularidade == Granularidade.SEMANA:
+        return dia - timedelta(days=dia.weekday())
+    if granularidade == Granularidade.MES:
+        return dia.replace(day=1)
+    if granularidade == Granularidade.TRIMESTRE:
+        return dia.replace(month=(dia.month - 1) // 3 * 3 + 1, day=1)
+    return dia
+
+def alinhamento(origem: date, destino: date, granularidade: Granularidade):
+    """
+    Função que leva o n-ésimo período contado a partir de `origem` ao n-ésimo
+    período a partir de `destino` (ex.: junho/2023 -> junho/2024 na comparação
+    com o ano anterior), para sobrepor as séries nos gráficos.
+    """
+    origem = inicio_do_periodo(origem, granularidade)
+    destino = inicio_do_periodo(destino, granularidade)
+    if granularidade in (Granularidade.MES, Granularidade.TRIMESTRE):
+        return lambda dia: somar_meses(destino, (dia.year - origem.year) * 12 + dia.month - origem.month)
+    return lambda dia: destino + (dia - origem)
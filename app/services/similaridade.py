@@ -0,0 +1,70 @@
+import re
+import unicodedata
+
+# Similaridade de textos por trigramas, com a mesma definição do pg_trgm:
+# cada palavra (sequência alfanumérica, em minúsculas) é completada com dois
+# espaços no início e um no fim; a similaridade é |A ∩ B| / |A ∪ B|.
+# Acentos são removidos antes (como com unaccent), já que extratos bancários
+# costumam vir sem acentuação.
+
+_PALAVRA = re.compile(r"[0-9a-z]+")
+
+def normalizar(texto: str) -> str:
+    decomposto = unicodedata.normalize("NFKD", texto.lower())
+    return "".join(c for c in decomposto if not unicodedata.combining(c))
+
+def trigramas(texto: str | None) -> frozenset[str]:
+    if not texto:
+        return frozenset()
+    resultado = set()
+    for palavra in _PALAVRA.findall(normalizar(texto)):
+        completa = f"  {palavra} "
+        resultado.update(completa[i:i + 3] for i in range(len(completa) - 2))
+    return frozenset(resultado)
+
+def similaridade(a: frozenset[str], b: frozenset[str]) -> float:
+    if not a or not b:
+        return 0.0
+    comuns = len(a & b)
+    return comuns / (len(a) + len(b) - comuns)
+
+class IndiceTrigramas:
+    """
+    Índice invertido trigrama -> documentos. Cada item tem um ou mais textos
+    (ex.: descrição do lançamento e nome do participante) e sua pontuação é a
+    maior similaridade entre eles. A consulta percorre apenas as listas dos
+    trigramas da busca, sem comparar a busca com todos os textos.
+    """
+    def __init__(self, textos_por_item: list[list[str | None]]):
+        self._itens: list[int] = []            # documento -> item
+        self._tamanhos: list[int] = []         # documento -> quantidade de trigramas
+        self._postings: dict[str, list[int]] = {}
+        for item, textos in enumerate(textos_por_item):
+            for texto in textos:
+                grams = trigramas(texto)
+                if not grams:
+                    continue
+                documento = len(self._itens)
+                self._itens.append(item)
+                self._tamanhos.append(len(grams))
+                for gram in grams:
+                    self._postings.setdefault(gram, []).append(documento)
+
+    def pontuar(self, texto: str | None) -> dict[int, float]:
+        """
+        Similaridade de `texto` com cada item que compartilha ao menos um trigrama
+        (itens ausentes do resultado têm similaridade 0).
+        """
+        busca = trigramas(texto)
+        comuns: dict[int, int] = {}
+        for gram in busca:
+            for documento in self._postings.get(gram, ()):
+                comuns[documento] = comuns.get(documento, 0) + 1
+
+        pontuacao: dict[int, float] = {}
+        for documento, n in comuns.items():
+            valor = n / (len(busca) + self._tamanhos[documento] - n)
+            item = self._itens[documento]
+            if valor > pontuacao.get(item, 0.0):
+                pontuacao[item] = valor
+        return pontuacao
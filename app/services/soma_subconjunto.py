@@ -0,0 +1,82 @@
+import time
+
+# Busca de combinações de valores (em centavos) que somam exatamente um alvo,
+# por meet-in-the-middle: as somas de cada metade são enumeradas (2^(n/2) cada)
+# e cruzadas por dicionário. Usada na conciliação agrupada, onde uma única
+# transação bancária quita várias parcelas.
+
+# Limite de candidatos por busca (2^12 subconjuntos por metade)
+MAX_CANDIDATOS = 24
+
+# Quantas combinações enumerar entre verificações do prazo
+_PASSO_VERIFICACAO = 1024
+
+class _PrazoEsgotado(Exception):
+    pass
+
+def encontrar_combinacao(valores: list[int], alvo: int, prazo: float, minimo_itens: int = 2) -> list[int] | None:
+    """
+    Retorna os índices de uma combinação de `valores` cuja soma é `alvo`,
+    com pelo menos `minimo_itens` itens e o menor número de itens possível.
+
+    `prazo` é um instante de time.perf_counter(); a busca desiste (None) ao ultrapassá-lo.
+    Valores devem ser positivos e a lista não deve passar de MAX_CANDIDATOS.
+    """
+    if len(valores) > MAX_CANDIDATOS:
+        raise ValueError(f"No máximo {MAX_CANDIDATOS} candidatos por busca")
+    if len(valores) < minimo_itens or sum(valores) < alvo:
+        return None
+
+    meio = len(valores) // 2
+    esquerda, direita = valores[:meio], valores[meio:]
+
+    try:
+        # soma -> melhores[k] = (itens, máscara) da menor combinação com pelo menos k itens
+        indice: dict[int, list[tuple[int, int] | None]] = {}
+        for soma, itens, mascara in _subconjuntos(esquerda, alvo, prazo):
+            melhores = indice.setdefault(soma, [None] * (minimo_itens + 1))
+            for k in range(min(itens, minimo_itens) + 1):
+                if melhores[k] is None or itens < melhores[k][0]:
+                    melhores[k] = (itens, mascara)
+
+        melhor = None
+        for soma, itens, mascara in _subconjuntos(direita, alvo, prazo):
+            melhores = indice.get(alvo - soma)
+            if melhores is None:
+                continue
+            complemento = melhores[max(minimo_itens - itens, 0)]
+            if complemento is None:
+                continue
+            total = itens + complemento[0]
+            if melhor is None or total < melhor[0]:
+                melhor = (total, complemento[1], mascara)
+    except _PrazoEsgotado:
+        return None
+
+    if melhor is None:
+        return None
+
+    _, mascara_esquerda, mascara_direita = melhor
+    return _indices(mascara_esquerda, 0, len(esquerda)) + _indices(mascara_direita, meio, len(direita))
+
+def _subconjuntos(valores: list[int], alvo: int, prazo: float):
+    """
+    Gera (soma, itens, máscara) de todos os subconjuntos com soma <= alvo.
+    """
+    pilha = [(0, 0, 0, 0)]  # (próximo índice, soma, itens, máscara)
+    contador = 0
+    while pilha:
+        i, soma, itens, mascara = pilha.pop()
+        if i == len(valores):
+            yield soma, itens, mascara
+            contador += 1
+            if contador % _PASSO_VERIFICACAO == 0 and time.perf_counter() > prazo:
+                raise _PrazoEsgotado()
+            continue
+        pilha.append((i + 1, soma, itens, mascara))
+        novo = soma + valores[i]
+        if novo <= alvo:
+            pilha.append((i + 1, novo, itens + 1, mascara | (1 << i)))
+
+def _indices(mascara: int, deslocamento: int, tamanho: int) -> list[int]:
+    return [deslocamento + i for i in range(tamanho) if mascara & (1 << i)]
@@ -0,0 +1,133 @@
+import argparse
+import asyncio
+import random
+import sys
+import os
+import time
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+
+# Adicionar diretório raiz ao path para importar app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import select, insert, delete, and_
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.lancamento import Lancamento
+from app.models.participante import Participante
+from app.models.centro_custo import CentroCusto
+from app.models.enums import TipoParticipante, TipoLancamento, NaturezaLancamento, StatusLancamento
+from app.schemas.ofx import OfxTransactionSchema
+from app.services.conciliacao import ConciliacaoService
+
+# Benchmark da conciliação OFX: uma consulta por transação (legado) x carga única em lote.
+# Uso: python scripts/benchmark_conciliacao.py --tamanhos 1000 10000 50000
+# Por padrão roda em SQLite em memória; use --url para apontar para um PostgreSQL de testes.
+
+DATA_BASE = date(2024, 1, 1)
+DIAS_EXTRATO = 365
+
+async def processar_legado(db: AsyncSession, transacoes: list[OfxTransactionSchema]):
+    resultados = []
+    for tx in transacoes:
+        stmt = select(Lancamento).where(
+            and_(
+                Lancamento.status == StatusLancamento.PENDENTE,
+                Lancamento.data_vencimento >= tx.data - timedelta(days=3),
+                Lancamento.data_vencimento <= tx.data + timedelta(days=3)
+            )
+        )
+        candidatos = (await db.execute(stmt)).scalars().all()
+        resultados.append(ConciliacaoService.conciliar_transacao(tx, candidatos))
+    return resultados
+
+async def popular(db: AsyncSession, tamanho: int, rng: random.Random) -> list[OfxTransactionSchema]:
+    await db.execute(delete(Lancamento))
+
+    participante_id = uuid.uuid4()
+    centro_id = uuid.uuid4()
+    await db.execute(insert(Participante).values(
+        id=participante_id, nome="Cliente Benchmark", documento=str(participante_id), tipo=TipoParticipante.CLIENTE
+    ))
+    await db.execute(insert(CentroCusto).values(id=centro_id, nome=f"Benchmark {centro_id}"))
+
+    linhas = []
+    transacoes = []
+    for i in range(tamanho):
+        vencimento = DATA_BASE + timedelta(days=rng.randrange(DIAS_EXTRATO))
+        valor = Decimal(rng.randrange(1000, 500000)) / 100
+        linhas.append(dict(
+            id=uuid.uuid4(),
+            descricao=f"Lançamento {i}",
+            valor=valor,
+            tipo=TipoLancamento.RECEITA,
+            natureza=NaturezaLancamento.PONTUAL,
+            status=StatusLancamento.PENDENTE,
+            data_vencimento=vencimento,
+            participante_id=participante_id,
+            centro_custo_id=centro_id,
+            reembolsavel=False
+        ))
+
+        # Metade exata, um quarto com taxa, um quarto sem correspondência
+        sorteio = rng.random()
+        if sorteio < 0.5:
+            valor_tx = valor
+        elif sorteio < 0.75:
+            valor_tx = (valor * Decimal("0.97")).quantize(Decimal("0.01"))
+        else:
+            valor_tx = Decimal(rng.randrange(1000, 500000)) / 100
+        transacoes.append(OfxTransactionSchema(
+            id=f"FIT{i}",
+            data=vencimento + timedelta(days=rng.randint(-2, 2)),
+            valor=valor_tx,
+            descricao=f"Transação {i}"
+        ))
+
+    await db.execute(insert(Lancamento), linhas)
+    await db.commit()
+    return transacoes
+
+async def executar(url: str, tamanhos: list[int], limite_legado: int | None):
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    rng = random.Random(42)
+
+    print(f"{'transações':>12} {'legado (s)':>12} {'lote (s)':>10} {'speedup':>9}")
+    for tamanho in tamanhos:
+        async with session_factory() as db:
+            transacoes = await popular(db, tamanho, rng)
+
+            inicio = time.perf_counter()
+            resultados = await ConciliacaoService(db).processar_ofx(transacoes)
+            tempo_lote = time.perf_counter() - inicio
+            db.expunge_all()
+
+            if limite_legado is not None and tamanho > limite_legado:
+                print(f"{tamanho:>12} {'-':>12} {tempo_lote:>10.3f} {'-':>9}")
+                continue
+
+            inicio = time.perf_counter()
+            esperados = await processar_legado(db, transacoes)
+            tempo_legado = time.perf_counter() - inicio
+
+            if [r.tipo_match for r in resultados] != [r.tipo_match for r in esperados]:
+                raise SystemExit(f"Divergência entre os modos com {tamanho} transações")
+
+            print(f"{tamanho:>12} {tempo_legado:>12.3f} {tempo_lote:>10.3f} {tempo_legado / tempo_lote:>8.1f}x")
+
+    await engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark da conciliação OFX")
+    parser.add_argument("--url", default="sqlite+aiosqlite:///:memory:")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--limite-legado", type=int, default=None,
+                        help="Não executa o modo legado acima deste número de transações")
+    args = parser.parse_args()
+    asyncio.run(executar(args.url, args.tamanhos, args.limite_legado))
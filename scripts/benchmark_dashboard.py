@@ -0,0 +1,175 @@
+import argparse
+import asyncio
+import random
+import sys
+import os
+import time
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+
+# Adicionar diretório raiz ao path para importar app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import select, insert, delete, func, case
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.lancamento import Lancamento
+from app.models.participante import Participante
+from app.models.processo import Processo
+from app.models.centro_custo import CentroCusto
+from app.models.enums import TipoParticipante, TipoLancamento, NaturezaLancamento, StatusLancamento, StatusProcesso
+from app.schemas.dashboard import DashboardCards, CashFlowPoint, ProjectedFlowPoint, ExpenseCategory, DashboardData
+from app.services.dashboard import DashboardService, filtros_lancamento
+from app.services import daily_ledger
+
+# Benchmark do dashboard: seis consultas sequenciais (legado) x agregação única.
+# Uso: python scripts/benchmark_dashboard.py --tamanhos 100000 1000000
+# Por padrão roda em SQLite em memória; use --url para apontar para um PostgreSQL de testes.
+
+DATA_BASE = date(2023, 1, 1)
+DIAS = 730
+CENTROS = ["Administrativo", "Contencioso", "Consultivo", "Trabalhista", "Tributário", "Marketing"]
+LOTE_INSERCAO = 20000
+
+async def analytics_legado(db: AsyncSession, data_inicio: date, data_fim: date) -> DashboardData:
+    lanc_filter = filtros_lancamento(data_inicio, data_fim, None, None, None)
+
+    row_saldo = (await db.execute(select(
+        func.sum(case((Lancamento.tipo == TipoLancamento.RECEITA, Lancamento.valor), else_=0)),
+        func.sum(case((Lancamento.tipo == TipoLancamento.DESPESA, Lancamento.valor), else_=0))
+    ).where(*lanc_filter))).first()
+    saldo_atual = float((row_saldo[0] or Decimal(0)) - (row_saldo[1] or Decimal(0)))
+
+    burn_rate = float((await db.execute(select(func.sum(Lancamento.valor)).where(
+        *lanc_filter, Lancamento.tipo == TipoLancamento.DESPESA, Lancamento.natureza == NaturezaLancamento.FIXO
+    ))).scalar() or 0)
+
+    row_ticket = (await db.execute(select(func.sum(Lancamento.valor), func.count(Lancamento.id)).where(
+        *lanc_filter, Lancamento.tipo == TipoLancamento.RECEITA, Lancamento.natureza == NaturezaLancamento.EXITO
+    ))).first()
+    ticket_medio = float((row_ticket[0] or Decimal(0)) / row_ticket[1]) if row_ticket[1] else 0.0
+
+    pipeline = float((await db.execute(select(
+        func.sum(Processo.valor_causa_estimado * Processo.percentual_exito / 100)
+    ).where(Processo.status == StatusProcesso.ATIVO))).scalar() or 0)
+
+    timeline_rows = (await db.execute(select(
+        Lancamento.data_vencimento,
+        func.sum(case((Lancamento.tipo == TipoLancamento.RECEITA, Lancamento.valor), else_=0)).label("entradas"),
+        func.sum(case((Lancamento.tipo == TipoLancamento.DESPESA, Lancamento.valor), else_=0)).label("saidas")
+    ).where(*lanc_filter).group_by(Lancamento.data_vencimento).order_by(Lancamento.data_vencimento))).all()
+
+    cash_flow, projected = [], []
+    acumulado = 0.0
+    for row in timeline_rows:
+        entradas, saidas = float(row.entradas or 0), float(row.saidas or 0)
+        cash_flow.append(CashFlowPoint(date=row.data_vencimento.isoformat(), entradas=entradas, saidas=saidas))
+        acumulado += entradas - saidas
+        projected.append(ProjectedFlowPoint(
+            date=row.data_vencimento.isoformat(), realizado=acumulado, projetado=acumulado + pipeline
+        ))
+
+    expense_rows = (await db.execute(select(CentroCusto.nome, func.sum(Lancamento.valor)).select_from(Lancamento).join(
+        CentroCusto
+    ).where(*lanc_filter, Lancamento.tipo == TipoLancamento.DESPESA).group_by(CentroCusto.nome))).all()
+
+    return DashboardData(
+        cards=DashboardCards(
+            saldo_atual=saldo_atual, burn_rate=burn_rate, ticket_medio_exito=ticket_medio, pipeline_recebiveis=pipeline
+        ),
+        cash_flow=cash_flow,
+        projected_flow=projected,
+        expenses_by_category=sorted(
+            [ExpenseCategory(name=row[0], value=float(row[1])) for row in expense_rows], key=lambda e: e.name
+        )
+    )
+
+async def popular(db: AsyncSession, tamanho: int, rng: random.Random):
+    await db.execute(delete(Lancamento))
+    await db.execute(delete(Processo))
+    await db.execute(delete(CentroCusto))
+    await db.execute(delete(Participante))
+
+    participante_id = uuid.uuid4()
+    await db.execute(insert(Participante).values(
+        id=participante_id, nome="Cliente Benchmark", documento=str(participante_id), tipo=TipoParticipante.CLIENTE
+    ))
+    processos = [uuid.uuid4() for _ in range(200)]
+    await db.execute(insert(Processo), [
+        {
+            "id": p, "numero": f"bench-{p}", "status": rng.choice(list(StatusProcesso)), "cliente_id": participante_id,
+            "valor_causa_estimado": Decimal(rng.randrange(10000, 10000000)) / 100,
+            "percentual_exito": Decimal(rng.randrange(5, 30))
+        }
+        for p in processos
+    ])
+    centros = [uuid.uuid4() for _ in CENTROS]
+    await db.execute(insert(CentroCusto), [{"id": c, "nome": n} for c, n in zip(centros, CENTROS)])
+
+    for inicio in range(0, tamanho, LOTE_INSERCAO):
+        linhas = []
+        for _ in range(min(LOTE_INSERCAO, tamanho - inicio)):
+            natureza = rng.choice(list(NaturezaLancamento))
+            linhas.append({
+                "id": uuid.uuid4(),
+                "descricao": "Benchmark",
+                "valor": Decimal(rng.randrange(100, 2000000)) / 100,
+                "tipo": rng.choice(list(TipoLancamento)),
+                "natureza": natureza,
+                "status": rng.choice(list(StatusLancamento)),
+                "data_vencimento": DATA_BASE + timedelta(days=rng.randrange(DIAS)),
+                "participante_id": participante_id,
+                "processo_id": rng.choice(processos) if natureza == NaturezaLancamento.EXITO else None,
+                "centro_custo_id": rng.choice(centros),
+                "reembolsavel": False,
+            })
+        await db.execute(insert(Lancamento), linhas)
+    await db.commit()
+    # Carga em lote não passa pelo hook do ORM: recalcula o rollup
+    await daily_ledger.reconstruir(db)
+
+async def medir(funcao, repeticoes: int):
+    melhor = None
+    resultado = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = await funcao()
+        decorrido = time.perf_counter() - inicio
+        melhor = decorrido if melhor is None else min(melhor, decorrido)
+    return melhor, resultado
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark do dashboard")
+    parser.add_argument("--url", default="sqlite+aiosqlite:///:memory:")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    engine = create_async_engine(args.url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    rng = random.Random(42)
+    periodo = (DATA_BASE, DATA_BASE + timedelta(days=DIAS))
+    print(f"{'lançamentos':>12} {'legado (s)':>12} {'único (s)':>12} {'speedup':>9}")
+    for tamanho in args.tamanhos:
+        async with session_factory() as db:
+            await popular(db, tamanho, rng)
+            t_legado, legado = await medir(lambda: analytics_legado(db, *periodo), args.repeticoes)
+            t_unico, unico = await medir(lambda: DashboardService(db).analytics(*periodo), args.repeticoes)
+
+            # Mesma resposta (as somas de ponto flutuante podem diferir no último dígito)
+            assert legado.cards == unico.cards, (legado.cards, unico.cards)
+            assert [p.date for p in legado.cash_flow] == [p.date for p in unico.cash_flow]
+            assert [e.name for e in legado.expenses_by_category] == [e.name for e in unico.expenses_by_category]
+
+            print(f"{tamanho:>12} {t_legado:>12.3f} {t_unico:>12.3f} {t_legado / t_unico:>8.1f}x")
+
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
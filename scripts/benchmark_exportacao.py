@@ -0,0 +1,59 @@
+import argparse
+import asyncio
+import os
+import random
+import resource
+import sys
+import time
+
+# Adicionar diretório raiz ao path para importar app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.schemas.lancamento import FormatoExportacao
+from app.services.exportacao import ExportacaoService
+from scripts.benchmark_paginacao import popular
+
+# Benchmark da exportação de lançamentos: tempo, tamanho do arquivo e memória
+# residente (RSS) durante o envio, medida como o maior acréscimo sobre o RSS do
+# início da exportação.
+# Uso: python scripts/benchmark_exportacao.py --tamanho 500000
+# Por padrão roda em SQLite em memória; use --url para apontar para um PostgreSQL de testes.
+
+PAGINA = resource.getpagesize()
+
+def rss() -> int:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * PAGINA
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark da exportação de lançamentos")
+    parser.add_argument("--url", default="sqlite+aiosqlite:///:memory:")
+    parser.add_argument("--tamanho", type=int, default=500000)
+    args = parser.parse_args()
+
+    engine = create_async_engine(args.url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with session_factory() as db:
+        await popular(db, args.tamanho, random.Random(42))
+
+    service = ExportacaoService(session_factory)
+    print(f"{'formato':>8} {'tempo (s)':>10} {'arquivo (MB)':>13} {'RSS extra (MB)':>15}")
+    for formato in FormatoExportacao:
+        inicio, base = time.perf_counter(), rss()
+        tamanho, pico = 0, 0
+        async for bloco in service.lancamentos({}, formato, service.projecao()):
+            tamanho += len(bloco)
+            pico = max(pico, rss() - base)
+        decorrido = time.perf_counter() - inicio
+        print(f"{formato.value:>8} {decorrido:>10.1f} {tamanho / 2**20:>13.1f} {pico / 2**20:>15.1f}")
+
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
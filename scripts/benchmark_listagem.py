@@ -0,0 +1,125 @@
+import argparse
+import asyncio
+import random
+import sys
+import os
+import time
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+
+# Adicionar diretório raiz ao path para importar app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pydantic import TypeAdapter
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker, selectinload
+
+from app.api.lancamentos import _incluidos
+from app.core.database import Base
+from app.core.projecao import Projecao
+from app.models.lancamento import Lancamento
+from app.models.participante import Participante
+from app.models.processo import Processo
+from app.models.centro_custo import CentroCusto
+from app.models.enums import TipoParticipante, TipoLancamento, NaturezaLancamento, StatusLancamento, StatusProcesso
+from app.schemas.lancamento import LancamentoPublic, LancamentosCompactos
+from app.services.lancamento import LancamentoService
+
+# Benchmark da listagem de lançamentos: tamanho da resposta e tempo de consulta
+# + validação + serialização JSON, nos formatos completo, compacto (included) e
+# com fields (só as colunas da grade).
+# Uso: python scripts/benchmark_listagem.py --limites 100 1000 --clientes 30
+
+DATA_BASE = date(2024, 1, 1)
+
+async def popular(db: AsyncSession, tamanho: int, clientes: int, rng: random.Random):
+    participantes = [uuid.uuid4() for _ in range(clientes)]
+    await db.execute(insert(Participante), [
+        {"id": p, "nome": f"Cliente {i}", "documento": str(p), "tipo": TipoParticipante.CLIENTE}
+        for i, p in enumerate(participantes)
+    ])
+    processos = [(uuid.uuid4(), rng.choice(participantes)) for _ in range(clientes * 3)]
+    await db.execute(insert(Processo), [
+        {"id": p, "numero": f"bench-{p}", "status": StatusProcesso.ATIVO, "cliente_id": c,
+         "titulo_causa": "Ação de cobrança", "valor_causa_estimado": Decimal("100000.00"), "percentual_exito": Decimal(20)}
+        for p, c in processos
+    ])
+    centros = [uuid.uuid4() for _ in range(6)]
+    await db.execute(insert(CentroCusto), [{"id": c, "nome": f"Centro {i}"} for i, c in enumerate(centros)])
+    await db.execute(insert(Lancamento), [
+        {
+            "id": uuid.uuid4(), "descricao": "Honorários mensais", "valor": Decimal(rng.randrange(100, 2000000)) / 100,
+            "tipo": TipoLancamento.RECEITA, "natureza": NaturezaLancamento.PONTUAL,
+            "status": rng.choice(list(StatusLancamento)), "data_vencimento": DATA_BASE + timedelta(days=rng.randrange(365)),
+            "participante_id": processo[1], "processo_id": processo[0],
+            "centro_custo_id": rng.choice(centros), "reembolsavel": False,
+        }
+        for processo in (rng.choice(processos) for _ in range(tamanho))
+    ])
+    await db.commit()
+
+async def medir(funcao, repeticoes: int):
+    melhor, resultado = None, None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = await funcao()
+        decorrido = time.perf_counter() - inicio
+        melhor = decorrido if melhor is None else min(melhor, decorrido)
+    return melhor, resultado
+
+OPCOES = (
+    selectinload(Lancamento.participante),
+    selectinload(Lancamento.processo).selectinload(Processo.cliente),
+    selectinload(Lancamento.cartao),
+    selectinload(Lancamento.centro_custo)
+)
+# Colunas da grade do Financeiro
+CAMPOS_GRADE = "descricao,valor,data_vencimento,status,participante.nome,centro_custo.nome"
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark da listagem de lançamentos")
+    parser.add_argument("--limites", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--clientes", type=int, default=30)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    completo = TypeAdapter(list[LancamentoPublic])
+    compacto = TypeAdapter(LancamentosCompactos)
+
+    async def formato_completo(db, limite):
+        # Sessão limpa: o custo de montar as instâncias do ORM entra na medida
+        db.expunge_all()
+        lancamentos, _ = await LancamentoService(db).listar({}, limite, options=OPCOES)
+        return completo.dump_json(completo.validate_python(lancamentos))
+
+    async def formato_compacto(db, limite):
+        db.expunge_all()
+        lancamentos, _ = await LancamentoService(db).listar({}, limite, options=OPCOES)
+        return compacto.dump_json(compacto.validate_python({"data": lancamentos, "included": _incluidos(lancamentos)}))
+
+    async def formato_fields(db, limite):
+        projecao = Projecao(Lancamento, LancamentoPublic, CAMPOS_GRADE, obrigatorios=("id", "data_vencimento"))
+        linhas, _ = await LancamentoService(db).listar({}, limite, consulta=projecao.select())
+        return projecao.serializar(linhas)
+
+    formatos = {"completo": formato_completo, "compacto": formato_compacto, "fields": formato_fields}
+    print(f"consulta + validação + JSON; fields = {CAMPOS_GRADE}")
+    print(f"{'linhas':>7} {'formato':>9} {'KB':>9} {'ms':>8}")
+    async with session_factory() as db:
+        await popular(db, max(args.limites), args.clientes, random.Random(42))
+        for limite in args.limites:
+            for nome, formato in formatos.items():
+                tempo, corpo = await medir(lambda: formato(db, limite), args.repeticoes)
+                print(f"{limite:>7} {nome:>9} {len(corpo) / 1024:>9.1f} {tempo * 1000:>8.1f}")
+
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
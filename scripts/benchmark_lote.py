@@ -0,0 +1,89 @@
+import argparse
+import asyncio
+import sys
+import os
+import time
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+
+# Adicionar diretório raiz ao path para importar app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.participante import Participante
+from app.models.processo import Processo
+from app.models.centro_custo import CentroCusto
+from app.models.enums import TipoParticipante, TipoLancamento, NaturezaLancamento, StatusProcesso
+from app.schemas.lancamento import LancamentoCreate
+from app.services.lancamento import LancamentoService
+from app.services.lancamento_lote import LancamentoLoteService
+
+# Benchmark da inclusão de lançamentos: N chamadas de LancamentoService.create x
+# uma de LancamentoLoteService.criar (POST /lancamentos/bulk).
+# Uso: python scripts/benchmark_lote.py --tamanhos 100 1000 5000
+# Por padrão roda em SQLite em memória; use --url para apontar para um PostgreSQL de testes.
+
+DATA_BASE = date(2024, 1, 1)
+
+async def referencias(db: AsyncSession) -> dict:
+    cliente_id, processo_id, centro_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    await db.execute(insert(Participante).values(
+        id=cliente_id, nome="Cliente Benchmark", documento=str(cliente_id), tipo=TipoParticipante.CLIENTE
+    ))
+    await db.execute(insert(Processo).values(
+        id=processo_id, numero=str(processo_id), status=StatusProcesso.ATIVO, cliente_id=cliente_id
+    ))
+    await db.execute(insert(CentroCusto).values(id=centro_id, nome=f"Centro {centro_id}"))
+    await db.commit()
+    return {"participante_id": cliente_id, "processo_id": processo_id, "centro_custo_id": centro_id}
+
+def lote(ref: dict, tamanho: int) -> list[LancamentoCreate]:
+    # Uma despesa reembolsável a cada dez, para gerar reembolsos
+    return [
+        LancamentoCreate(
+            descricao=f"Benchmark {i}", valor=Decimal(100 + i % 1000) / 100,
+            data_vencimento=DATA_BASE + timedelta(days=i % 365), tipo=TipoLancamento.DESPESA,
+            natureza=NaturezaLancamento.PONTUAL, participante_id=ref["participante_id"],
+            centro_custo_id=ref["centro_custo_id"], reembolsavel=i % 10 == 0,
+            processo_id=ref["processo_id"] if i % 10 == 0 else None,
+        )
+        for i in range(tamanho)
+    ]
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark da inclusão de lançamentos em lote")
+    parser.add_argument("--url", default="sqlite+aiosqlite:///:memory:")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[100, 1000, 5000])
+    args = parser.parse_args()
+
+    engine = create_async_engine(args.url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    print(f"{'linhas':>8} {'um a um (ms)':>14} {'lote (ms)':>10}")
+    for tamanho in args.tamanhos:
+        async with session_factory() as db:
+            ref = await referencias(db)
+            lancamentos = lote(ref, tamanho)
+
+            inicio = time.perf_counter()
+            service = LancamentoService(db)
+            for lancamento in lancamentos:
+                await service.create(lancamento)
+            t_um_a_um = time.perf_counter() - inicio
+
+            inicio = time.perf_counter()
+            await LancamentoLoteService(db).criar(lancamentos)
+            t_lote = time.perf_counter() - inicio
+        print(f"{tamanho:>8} {t_um_a_um * 1000:>14.1f} {t_lote * 1000:>10.1f}")
+
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,108 @@
+import argparse
+import asyncio
+import random
+import sys
+import os
+import time
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+
+# Adicionar diretório raiz ao path para importar app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import insert, delete, text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.lancamento import Lancamento
+from app.models.participante import Participante
+from app.models.centro_custo import CentroCusto
+from app.models.enums import TipoParticipante, TipoLancamento, NaturezaLancamento, StatusLancamento
+from app.services.lancamento import LancamentoService
+
+# Benchmark da listagem de lançamentos: página N por OFFSET x por cursor.
+# Uso: python scripts/benchmark_paginacao.py --tamanho 1000000 --paginas 1 10 100 1000
+# Por padrão roda em SQLite em memória; use --url para apontar para um PostgreSQL de testes.
+
+DATA_BASE = date(2023, 1, 1)
+DIAS = 730
+LOTE_INSERCAO = 20000
+
+async def popular(db: AsyncSession, tamanho: int, rng: random.Random):
+    await db.execute(delete(Lancamento))
+    await db.execute(delete(CentroCusto))
+    await db.execute(delete(Participante))
+
+    participante_id = uuid.uuid4()
+    await db.execute(insert(Participante).values(
+        id=participante_id, nome="Cliente Benchmark", documento=str(participante_id), tipo=TipoParticipante.CLIENTE
+    ))
+    centros = [uuid.uuid4() for _ in range(6)]
+    await db.execute(insert(CentroCusto), [{"id": c, "nome": f"Centro {i}"} for i, c in enumerate(centros)])
+
+    for inicio in range(0, tamanho, LOTE_INSERCAO):
+        await db.execute(insert(Lancamento), [
+            {
+                "id": uuid.uuid4(),
+                "descricao": "Benchmark",
+                "valor": Decimal(rng.randrange(100, 2000000)) / 100,
+                "tipo": rng.choice(list(TipoLancamento)),
+                "natureza": NaturezaLancamento.PONTUAL,
+                "status": rng.choice(list(StatusLancamento)),
+                "data_vencimento": DATA_BASE + timedelta(days=rng.randrange(DIAS)),
+                "participante_id": participante_id,
+                "centro_custo_id": rng.choice(centros),
+                "reembolsavel": False,
+            }
+            for _ in range(min(LOTE_INSERCAO, tamanho - inicio))
+        ])
+    await db.commit()
+    await db.execute(text("ANALYZE"))
+
+async def medir(funcao, repeticoes: int) -> float:
+    melhor = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        await funcao()
+        decorrido = time.perf_counter() - inicio
+        melhor = decorrido if melhor is None else min(melhor, decorrido)
+    return melhor
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark da paginação de lançamentos")
+    parser.add_argument("--url", default="sqlite+aiosqlite:///:memory:")
+    parser.add_argument("--tamanho", type=int, default=1000000)
+    parser.add_argument("--limite", type=int, default=100)
+    parser.add_argument("--paginas", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    engine = create_async_engine(args.url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with session_factory() as db:
+        await popular(db, args.tamanho, random.Random(42))
+        service = LancamentoService(db)
+
+        # Cursor de cada página obtido percorrendo a listagem uma vez
+        cursores, cursor = {1: None}, None
+        for pagina in range(2, max(args.paginas) + 1):
+            _, cursor = await service.listar({}, args.limite, cursor)
+            cursores[pagina] = cursor
+
+        print(f"{'página':>8} {'offset (ms)':>12} {'cursor (ms)':>12}")
+        for pagina in args.paginas:
+            t_offset = await medir(
+                lambda: service.listar({}, args.limite, skip=(pagina - 1) * args.limite), args.repeticoes
+            )
+            t_cursor = await medir(lambda: service.listar({}, args.limite, cursores[pagina]), args.repeticoes)
+            print(f"{pagina:>8} {t_offset * 1000:>12.1f} {t_cursor * 1000:>12.1f}")
+
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
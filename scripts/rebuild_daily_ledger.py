@@ -0,0 +1,33 @@
+import argparse
+import asyncio
+import sys
+import os
+
+# Adicionar diretório raiz ao path para importar app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.database import async_session
+from app.services import daily_ledger
+
+# Carga / verificação do rollup daily_ledger usado pelo dashboard.
+# Uso: python scripts/rebuild_daily_ledger.py             (recalcula tudo)
+#      python scripts/rebuild_daily_ledger.py --verificar (só compara com os lançamentos)
+
+async def main():
+    parser = argparse.ArgumentParser(description="Reconstrói ou verifica o daily_ledger")
+    parser.add_argument("--verificar", action="store_true", help="Apenas verifica a consistência do rollup")
+    args = parser.parse_args()
+
+    async with async_session() as db:
+        if args.verificar:
+            divergencias = await daily_ledger.verificar(db)
+            for d in divergencias:
+                print(f"{d['chave']}: esperado {d['esperado']}, atual {d['atual']}")
+            print(f"{len(divergencias)} divergência(s) encontrada(s).")
+            sys.exit(1 if divergencias else 0)
+
+        total = await daily_ledger.reconstruir(db)
+        print(f"daily_ledger reconstruído: {total} linhas.")
+
+if __name__ == "__main__":
+    asyncio.run(main())
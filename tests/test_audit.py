@@ -0,0 +1,40 @@
+import pytest
+import uuid
+from decimal import Decimal
+from sqlalchemy import select
+from app.models.audit_log import AuditLog
+from app.models.lancamento import Lancamento
+from app.models.participante import Participante
+from app.models.centro_custo import CentroCusto
+from app.models.enums import TipoParticipante, TipoLancamento, NaturezaLancamento, StatusLancamento
+
+@pytest.mark.asyncio
+async def test_auditoria_serializa_colunas_do_lancamento(db_session):
+    cliente = Participante(nome="Cliente Auditoria", documento="auditoria-1", tipo=TipoParticipante.CLIENTE)
+    centro = CentroCusto(nome="Centro Auditoria")
+    db_session.add_all([cliente, centro])
+    await db_session.flush()
+    lancamento = Lancamento(
+        id=uuid.uuid4(), descricao="Honorários", valor=Decimal("1500.50"), tipo=TipoLancamento.RECEITA,
+        natureza=NaturezaLancamento.PONTUAL, status=StatusLancamento.PENDENTE,
+        participante_id=cliente.id, centro_custo_id=centro.id, participante=cliente
+    )
+    db_session.add(lancamento)
+    await db_session.commit()
+
+    lancamento.valor = Decimal("1400.00")
+    lancamento.status = StatusLancamento.PAGO
+    await db_session.commit()
+
+    stmt = select(AuditLog).where(AuditLog.registro_id == str(lancamento.id)).order_by(AuditLog.acao)
+    inclusao, alteracao = (await db_session.execute(stmt)).scalars().all()
+
+    # Decimal e enums em JSON; relacionamentos ficam de fora (já aparecem como *_id)
+    assert inclusao.acao == "INSERT"
+    assert inclusao.dados_novos["valor"] == "1500.50"
+    assert inclusao.dados_novos["tipo"] == "RECEITA"
+    assert inclusao.dados_novos["participante_id"] == str(cliente.id)
+    assert "participante" not in inclusao.dados_novos
+    assert alteracao.acao == "UPDATE"
+    assert alteracao.dados_antigos == {"valor": "1500.50", "status": "PENDENTE"}
+    assert alteracao.dados_novos == {"valor": "1400.00", "status": "PAGO"}
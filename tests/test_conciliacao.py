@@ -0,0 +1,442 @@
+import itertools
+import pytest
+import random
+import time
+import uuid
+from decimal import Decimal
+from datetime import date, timedelta
+from sqlalchemy import select, insert, and_, func
+from app.models.lancamento import Lancamento, NaturezaLancamento, TipoLancamento, StatusLancamento
+from app.models.participante import Participante, TipoParticipante
+from app.models.centro_custo import CentroCusto
+from app.models.audit_log import AuditLog
+from app.models.transacao_processada import TransacaoProcessada
+from app.services.conciliacao import ConciliacaoService, IndiceCandidatos
+from app.services.aplicacao_conciliacao import AplicacaoConciliacaoService, AplicacaoInvalida
+from app.services.atribuicao import emparelhar
+from app.services.soma_subconjunto import encontrar_combinacao
+from app.services.similaridade import IndiceTrigramas, trigramas, similaridade
+from app.services import daily_ledger
+from app.schemas.ofx import OfxTransactionSchema, EstrategiaConciliacao, ConciliacaoAceita
+
+BASE = date(2024, 3, 10)
+
+async def _seed(db_session, linhas, nome="Cliente Conciliação"):
+    """
+    Insere participante, centro de custo e lançamentos pendentes via Core
+    (linhas: lista de (dias a partir de BASE, valor)).
+    """
+    participante_id = uuid.uuid4()
+    centro_id = uuid.uuid4()
+    await db_session.execute(insert(Participante).values(
+        id=participante_id, nome=nome, documento=str(participante_id), tipo=TipoParticipante.CLIENTE
+    ))
+    await db_session.execute(insert(CentroCusto).values(id=centro_id, nome=f"Centro {centro_id}"))
+
+    ids = []
+    for dias, valor in linhas:
+        lancamento_id = uuid.uuid4()
+        ids.append(str(lancamento_id))
+        await db_session.execute(insert(Lancamento).values(
+            id=lancamento_id,
+            descricao=f"Parcela {valor}",
+            valor=Decimal(valor),
+            tipo=TipoLancamento.RECEITA,
+            natureza=NaturezaLancamento.PONTUAL,
+            status=StatusLancamento.PENDENTE,
+            data_vencimento=BASE + timedelta(days=dias),
+            participante_id=participante_id,
+            centro_custo_id=centro_id,
+            reembolsavel=False
+        ))
+    return ids
+
+def _tx(ofx_id, dias, valor, descricao="OFX"):
+    return OfxTransactionSchema(id=ofx_id, data=BASE + timedelta(days=dias), valor=Decimal(valor), descricao=descricao)
+
+async def _processar_por_transacao(db_session, transacoes):
+    # Referência: uma consulta por transação, como antes do modo em lote
+    resultados = []
+    for tx in transacoes:
+        stmt = select(Lancamento).where(and_(
+            Lancamento.status == StatusLancamento.PENDENTE,
+            Lancamento.data_vencimento >= tx.data - timedelta(days=3),
+            Lancamento.data_vencimento <= tx.data + timedelta(days=3)
+        ))
+        candidatos = (await db_session.execute(stmt)).scalars().all()
+        resultados.append(ConciliacaoService.conciliar_transacao(tx, candidatos))
+    return resultados
+
+def test_indice_candidatos_janela_inclusiva():
+    lancamentos = [
+        Lancamento(valor=Decimal("1"), data_vencimento=BASE + timedelta(days=d))
+        for d in (-4, -3, 0, 3, 4)
+    ]
+    indice = IndiceCandidatos(lancamentos)
+
+    janela = indice.janela(BASE)
+    assert [l.data_vencimento for l in janela] == [BASE - timedelta(days=3), BASE, BASE + timedelta(days=3)]
+
+@pytest.mark.asyncio
+async def test_processar_ofx_lote_equivale_busca_por_transacao(db_session):
+    await _seed(db_session, [
+        (0, "100.00"), (1, "100.00"), (-2, "250.00"), (5, "93.00"),
+        (6, "1000.00"), (9, "980.00"), (20, "50.00"), (-10, "75.00")
+    ])
+    transacoes = [
+        _tx("a", 0, "100.00"),     # exata
+        _tx("b", 1, "-106.38"),    # parcial (débito)
+        _tx("c", 7, "990.00"),     # parcial, melhor entre dois candidatos
+        _tx("d", 3, "95.00"),      # parcial contra 93.00 e 100.00
+        _tx("e", 14, "50.00"),     # fora da janela
+        _tx("f", -9, "500.00"),    # sem candidato próximo em valor
+    ]
+
+    service = ConciliacaoService(db_session)
+    resultados = await service.processar_ofx(transacoes)
+    esperados = await _processar_por_transacao(db_session, transacoes)
+
+    assert [r.model_dump() for r in resultados] == [r.model_dump() for r in esperados]
+    assert [r.tipo_match for r in resultados] == ["EXACT", "PARTIAL", "PARTIAL", "PARTIAL", "NONE", "NONE"]
+
+@pytest.mark.asyncio
+async def test_processar_ofx_lista_vazia(db_session):
+    service = ConciliacaoService(db_session)
+    assert await service.processar_ofx([]) == []
+
+def _melhor_por_forca_bruta(arestas, n_direita):
+    # (quantidade de pares, -custo) ótimo enumerando todas as escolhas
+    melhor = (0, 0)
+
+    def busca(x, usados, pares, custo):
+        nonlocal melhor
+        if x == len(arestas):
+            melhor = max(melhor, (pares, -custo))
+            return
+        busca(x + 1, usados, pares, custo)
+        for y, c in arestas[x]:
+            if y not in usados:
+                busca(x + 1, usados | {y}, pares + 1, custo + c)
+
+    busca(0, frozenset(), 0, 0)
+    return melhor
+
+def test_emparelhar_equivale_forca_bruta():
+    rng = random.Random(7)
+    for _ in range(200):
+        n_esq, n_dir = rng.randint(1, 6), rng.randint(1, 6)
+        arestas = [
+            [(y, rng.randint(0, 20)) for y in range(n_dir) if rng.random() < 0.5]
+            for _ in range(n_esq)
+        ]
+        atribuicao = emparelhar(arestas, n_dir)
+
+        escolhidos = [y for y in atribuicao if y is not None]
+        assert len(escolhidos) == len(set(escolhidos))
+        custo = sum(dict(arestas[x])[y] for x, y in enumerate(atribuicao) if y is not None)
+        assert (len(escolhidos), -custo) == _melhor_por_forca_bruta(arestas, n_dir)
+
+@pytest.mark.asyncio
+async def test_processar_ofx_otima_nao_repete_lancamento(db_session):
+    ids = await _seed(db_session, [(0, "500.00"), (2, "500.00"), (1, "480.00")])
+    transacoes = [_tx("a", 0, "-500.00"), _tx("b", 0, "-500.00"), _tx("c", 1, "-500.00")]
+
+    service = ConciliacaoService(db_session)
+    gulosa = await service.processar_ofx(transacoes)
+    otima = await service.processar_ofx(transacoes, EstrategiaConciliacao.OTIMA)
+
+    # Na busca gulosa as três transações disputam o mesmo lançamento
+    assert len({r.lancamento_id for r in gulosa}) == 1
+
+    assert sorted(r.lancamento_id for r in otima) == sorted(ids)
+    assert [r.tipo_match for r in otima].count("EXACT") == 2
+    parcial = next(r for r in otima if r.tipo_match == "PARTIAL")
+    assert parcial.lancamento_id == ids[2]
+    assert parcial.valor_taxa_sugerida == Decimal("20.00")
+
+def test_conciliar_vetorizado_equivale_caminho_decimal(monkeypatch):
+    from app.services import pontuacao_vetorizada
+
+    # Blocos pequenos para exercitar a divisão em blocos
+    monkeypatch.setattr(pontuacao_vetorizada, "PARES_POR_BLOCO", 50)
+
+    rng = random.Random(3)
+    lancamentos = [
+        Lancamento(
+            id=uuid.uuid4(),
+            valor=Decimal(rng.randrange(0, 3000)) / 100,
+            data_vencimento=BASE + timedelta(days=rng.randrange(40))
+        )
+        for _ in range(300)
+    ]
+    transacoes = []
+    for i in range(400):
+        base = rng.choice(lancamentos)
+        valor = base.valor * Decimal(rng.choice(["1", "0.97", "1.05", "0.5"]))
+        valor = valor.quantize(Decimal("0.01")) if i % 50 else valor + Decimal("0.001")
+        transacoes.append(OfxTransactionSchema(
+            id=f"tx{i}",
+            data=base.data_vencimento + timedelta(days=rng.randint(-4, 4)),
+            valor=-valor if i % 3 == 0 else valor,
+            descricao="OFX"
+        ))
+
+    indice = IndiceCandidatos(lancamentos)
+    service = ConciliacaoService(None)
+    decimal = [service.conciliar_transacao(tx, indice.janela(tx.data)) for tx in transacoes]
+    vetorizado = service.conciliar_vetorizado(transacoes, indice)
+
+    assert [r.model_dump() for r in vetorizado] == [r.model_dump() for r in decimal]
+    assert {r.tipo_match for r in vetorizado} == {"EXACT", "PARTIAL", "NONE"}
+
+def test_encontrar_combinacao_menor_quantidade_de_itens():
+    rng = random.Random(11)
+    for _ in range(100):
+        valores = [rng.randint(1, 40) for _ in range(rng.randint(2, 10))]
+        alvo = rng.randint(1, 120)
+        prazo = time.perf_counter() + 5
+
+        combinacao = encontrar_combinacao(valores, alvo, prazo)
+
+        tamanhos = [
+            n for n in range(2, len(valores) + 1)
+            if any(sum(c) == alvo for c in itertools.combinations(valores, n))
+        ]
+        if not tamanhos:
+            assert combinacao is None
+        else:
+            assert sum(valores[i] for i in combinacao) == alvo
+            assert len(combinacao) == min(tamanhos)
+
+def test_encontrar_combinacao_respeita_prazo():
+    valores = [2 * i + 1 for i in range(24)]
+    assert encontrar_combinacao(valores, 10**6 + 1, prazo=time.perf_counter() - 1) is None
+
+@pytest.mark.asyncio
+async def test_processar_ofx_agrupa_parcelas_do_mesmo_participante(db_session):
+    parcelas = await _seed(db_session, [(0, "100.00"), (1, "250.00"), (2, "250.00")])
+    # Parcelas de participantes diferentes não são combinadas entre si
+    await _seed(db_session, [(0, "300.00")])
+    await _seed(db_session, [(1, "300.00")])
+    transacoes = [_tx("a", 1, "500.00"), _tx("b", 1, "600.00")]
+
+    service = ConciliacaoService(db_session)
+    sem_agrupar = await service.processar_ofx(transacoes)
+    agrupados = await service.processar_ofx(transacoes, agrupar=True)
+
+    assert [r.tipo_match for r in sem_agrupar] == ["NONE", "NONE"]
+    assert agrupados[0].tipo_match == "GROUPED"
+    assert agrupados[0].lancamento_id is None
+    assert sorted(agrupados[0].lancamento_ids) == sorted(parcelas[1:])
+    assert agrupados[1].tipo_match == "NONE"
+
+@pytest.mark.asyncio
+async def test_processar_ofx_deduplicar_ignora_transacoes_ja_aplicadas(db_session, monkeypatch):
+    ids = await _seed(db_session, [(0, "100.00"), (1, "200.00"), (2, "300.00"), (3, "400.00")])
+    primeira = [_tx("a", 0, "100.00"), _tx("b", 1, "-195.00"), _tx("c", 9, "50.00"), _tx("e", 3, "400.00")]
+
+    service = ConciliacaoService(db_session)
+    resultados = await service.processar_ofx(primeira, deduplicar=True)
+    assert [r.tipo_match for r in resultados] == ["EXACT", "PARTIAL", "NONE", "EXACT"]
+
+    # Só a conciliação não registra nada: a prévia repetida concilia tudo de novo
+    repetida = await service.processar_ofx(primeira, deduplicar=True)
+    assert repetida == resultados
+    assert (await db_session.execute(select(TransacaoProcessada))).first() is None
+
+    # "a" e "b" são aplicadas; a sugestão de "e" é recusada
+    aceitas = [
+        ConciliacaoAceita(**r.model_dump(), data=tx.data, valor=tx.valor)
+        for tx, r in zip(primeira[:2], resultados[:2])
+    ]
+    await AplicacaoConciliacaoService(db_session).aplicar(aceitas)
+
+    # Reimportação sobreposta: só "c" (sem correspondência), "e" (recusada) e "d" (nova) são conciliadas
+    conciliadas = []
+    original = ConciliacaoService.carregar_candidatos
+
+    async def espiar(self, transacoes):
+        conciliadas.extend(tx.id for tx in transacoes)
+        return await original(self, transacoes)
+
+    monkeypatch.setattr(ConciliacaoService, "carregar_candidatos", espiar)
+    segunda = primeira + [_tx("d", 2, "300.00")]
+    resultados = await service.processar_ofx(segunda, deduplicar=True)
+
+    assert conciliadas == ["c", "e", "d"]
+    assert [r.tipo_match for r in resultados] == ["DUPLICATE", "DUPLICATE", "NONE", "EXACT", "EXACT"]
+    assert [r.lancamento_id for r in resultados] == [ids[0], ids[1], None, ids[3], ids[2]]
+    assert resultados[1].valor_taxa_sugerida == Decimal("5.00")
+
+    # Mesma transação com outro valor não é considerada repetida
+    alterada = await service.processar_ofx([_tx("a", 0, "100.01")], deduplicar=True)
+    assert alterada[0].tipo_match == "NONE"
+
+@pytest.mark.asyncio
+async def test_aplicar_conciliacao_baixa_em_lote(db_session):
+    ids = await _seed(db_session, [(0, "100.00"), (1, "200.00"), (2, "300.00"), (3, "50.00")])
+    await daily_ledger.reconstruir(db_session)
+    itens = [
+        ConciliacaoAceita(ofx_id="a", lancamento_id=ids[0], tipo_match="EXACT", data=BASE, valor=Decimal("100.00")),
+        ConciliacaoAceita(
+            ofx_id="b", lancamento_id=ids[1], tipo_match="PARTIAL", valor_taxa_sugerida=Decimal("5.00"),
+            data=BASE + timedelta(days=1), valor=Decimal("195.00")
+        ),
+        ConciliacaoAceita(
+            ofx_id="c", lancamento_ids=[ids[2], ids[3]], tipo_match="GROUPED",
+            data=BASE + timedelta(days=3), valor=Decimal("350.00")
+        ),
+        ConciliacaoAceita(ofx_id="d", lancamento_id=ids[0], tipo_match="EXACT", data=BASE, valor=Decimal("100.00")),
+        ConciliacaoAceita(ofx_id="e", tipo_match="NONE", data=BASE, valor=Decimal("10.00")),
+    ]
+
+    resultado = await AplicacaoConciliacaoService(db_session).aplicar(itens)
+
+    assert (resultado.lancamentos_pagos, resultado.taxas_criadas) == (4, 1)
+    assert [i.ofx_id for i in resultado.ignorados] == ["e", "d"]
+
+    stmt = select(Lancamento).where(Lancamento.id.in_([uuid.UUID(i) for i in ids])).execution_options(populate_existing=True)
+    pagos = {str(l.id): l for l in (await db_session.execute(stmt)).scalars()}
+    assert all(l.status == StatusLancamento.PAGO and l.valor_realizado == l.valor for l in pagos.values())
+    assert pagos[ids[1]].data_pagamento == BASE + timedelta(days=1)
+    assert pagos[ids[3]].data_pagamento == BASE + timedelta(days=3)
+
+    taxa = (await db_session.execute(select(Lancamento).where(Lancamento.id == resultado.taxa_ids[0]))).scalar_one()
+    # Recebeu-se 195 de uma receita de 200: a diferença é despesa bancária
+    assert (taxa.tipo, taxa.valor, taxa.status) == (TipoLancamento.DESPESA, Decimal("5.00"), StatusLancamento.PAGO)
+    assert taxa.centro_custo_id == pagos[ids[1]].centro_custo_id
+
+    auditoria = (await db_session.execute(
+        select(AuditLog.acao, AuditLog.registro_id).where(AuditLog.tabela == "lancamentos")
+    )).all()
+    assert sorted(a for a, r in auditoria if r in ids) == ["UPDATE"] * 4
+    assert ("INSERT", str(taxa.id)) in auditoria
+
+    # UPDATE/INSERT em lote também atualizam o rollup do dashboard
+    assert await daily_ledger.verificar(db_session) == []
+
+    # Aplicar de novo não baixa nada: os lançamentos já não estão pendentes
+    repetido = await AplicacaoConciliacaoService(db_session).aplicar(itens[:1])
+    assert repetido.lancamentos_pagos == 0 and len(repetido.ignorados) == 1
+
+@pytest.mark.asyncio
+async def test_aplicar_conciliacao_calcula_a_taxa_no_servidor(db_session):
+    ids = await _seed(db_session, [(0, "200.00"), (1, "300.00"), (2, "400.00")])
+    service = AplicacaoConciliacaoService(db_session)
+
+    # Taxa enviada pelo cliente diferente da diferença de valores
+    divergente = ConciliacaoAceita(
+        ofx_id="a", lancamento_id=ids[0], tipo_match="PARTIAL", valor_taxa_sugerida=Decimal("150.00"),
+        data=BASE, valor=Decimal("195.00")
+    )
+    # Diferença acima da tolerância (20%)
+    distante = ConciliacaoAceita(
+        ofx_id="b", lancamento_id=ids[1], tipo_match="PARTIAL", data=BASE, valor=Decimal("240.00")
+    )
+    with pytest.raises(AplicacaoInvalida) as erro:
+        await service.aplicar([divergente, distante])
+    assert [indice for indice, _, _ in erro.value.erros] == [0, 1]
+
+    # Sem taxa sugerida, a diferença é calculada e lançada mesmo assim
+    sem_taxa = ConciliacaoAceita(
+        ofx_id="c", lancamento_id=ids[2], tipo_match="PARTIAL", data=BASE, valor=Decimal("-390.00")
+    )
+    resultado = await service.aplicar([sem_taxa])
+    taxa = (await db_session.execute(select(Lancamento).where(Lancamento.id == resultado.taxa_ids[0]))).scalar_one()
+    assert (taxa.tipo, taxa.valor) == (TipoLancamento.DESPESA, Decimal("10.00"))
+
+@pytest.mark.asyncio
+async def test_aplicar_conciliacao_confere_o_valor_do_grupo(db_session):
+    ids = await _seed(db_session, [(0, "100.00"), (1, "200.00"), (2, "300.00"), (3, "400.00")])
+    service = AplicacaoConciliacaoService(db_session)
+
+    # Uma linha do extrato de 10,00 não baixa 300,00 em lançamentos
+    divergente = ConciliacaoAceita(
+        ofx_id="a", lancamento_ids=[ids[0], ids[1]], tipo_match="GROUPED", data=BASE, valor=Decimal("10.00")
+    )
+    # Vários lançamentos só em correspondência GROUPED
+    exato = ConciliacaoAceita(
+        ofx_id="b", lancamento_ids=[ids[2], ids[3]], tipo_match="EXACT", data=BASE, valor=Decimal("700.00")
+    )
+    with pytest.raises(AplicacaoInvalida) as erro:
+        await service.aplicar([divergente, exato])
+    assert [(indice, campo) for indice, campo, _ in erro.value.erros] == [
+        (0, "valor_taxa_sugerida"), (1, "lancamento_ids")
+    ]
+    pendentes = (await db_session.execute(
+        select(func.count()).where(
+            Lancamento.id.in_([uuid.UUID(i) for i in ids]), Lancamento.status == StatusLancamento.PENDENTE
+        )
+    )).scalar()
+    assert pendentes == 4
+
+    # Diferença dentro da tolerância: a taxa é calculada sobre a soma do grupo
+    agrupado = ConciliacaoAceita(
+        ofx_id="c", lancamento_ids=[ids[2], ids[3]], tipo_match="GROUPED", data=BASE, valor=Decimal("690.00")
+    )
+    resultado = await service.aplicar([agrupado])
+    assert (resultado.lancamentos_pagos, resultado.taxas_criadas) == (2, 1)
+    taxa = (await db_session.execute(select(Lancamento).where(Lancamento.id == resultado.taxa_ids[0]))).scalar_one()
+    assert (taxa.tipo, taxa.valor) == (TipoLancamento.DESPESA, Decimal("10.00"))
+
+@pytest.mark.asyncio
+async def test_aplicar_conciliacao_endpoint_recusa_taxa_divergente(client, db_session):
+    from app.main import app
+    from app.api.auth import get_current_user
+    from app.models.usuario import Usuario
+    app.dependency_overrides[get_current_user] = lambda: Usuario(id=uuid.uuid4(), email="t@example.com", role="ADMIN")
+    ids = await _seed(db_session, [(0, "200.00")])
+
+    response = await client.post("/conciliacao/aplicar", json={"itens": [{
+        "ofx_id": "a", "lancamento_id": ids[0], "tipo_match": "PARTIAL", "valor_taxa_sugerida": "199.00",
+        "data": str(BASE), "valor": "195.00",
+    }]})
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", "itens", 0, "valor_taxa_sugerida"]
+
+    pendente = (await db_session.execute(
+        select(Lancamento.status).where(Lancamento.id == uuid.UUID(ids[0]))
+    )).scalar_one()
+    assert pendente == StatusLancamento.PENDENTE
+
+def test_indice_trigramas_equivale_comparacao_direta():
+    textos = [
+        ["Honorários advocatícios - Silva", "João da Silva"],
+        ["Custas processuais", None],
+        ["Aluguel escritório", "Imobiliária Central"],
+        [None, None],
+    ]
+    indice = IndiceTrigramas(textos)
+
+    for busca in ["PIX JOAO SILVA", "ALUGUEL ESCRITORIO CENTRAL", "custas", "xyz"]:
+        pontuacao = indice.pontuar(busca)
+        esperado = {
+            i: max(similaridade(trigramas(busca), trigramas(t)) for t in item)
+            for i, item in enumerate(textos)
+        }
+        assert {i: round(v, 9) for i, v in esperado.items() if v > 0} == {i: round(v, 9) for i, v in pontuacao.items()}
+
+    # Mesma definição do pg_trgm: similarity('word', 'two words') = 4/11 (com acentos removidos)
+    assert similaridade(trigramas("word"), trigramas("two words")) == pytest.approx(4 / 11)
+    assert trigramas("Ação") == trigramas("acao")
+
+@pytest.mark.asyncio
+async def test_processar_ofx_desempata_pela_descricao(db_session):
+    alfa = await _seed(db_session, [(0, "500.00")], nome="Construtora Alfa Ltda")
+    beta = await _seed(db_session, [(1, "500.00")], nome="Padaria Beta")
+    transacoes = [
+        _tx("a", 0, "500.00", "PIX RECEBIDO PADARIA BETA"),
+        _tx("b", 1, "500.00", "TED CONSTRUTORA ALFA"),
+    ]
+
+    service = ConciliacaoService(db_session)
+    sem_descricao = await service.processar_ofx(transacoes, similaridade=False)
+    gulosa = await service.processar_ofx(transacoes)
+    otima = await service.processar_ofx(transacoes, EstrategiaConciliacao.OTIMA)
+
+    # Sem a descrição, o primeiro candidato de mesmo valor vence nas duas transações
+    assert [r.lancamento_id for r in sem_descricao] == [alfa[0], alfa[0]]
+    assert [r.lancamento_id for r in gulosa] == [beta[0], alfa[0]]
+    # Na ótima a descrição pesa mais que a distância em dias
+    assert [r.lancamento_id for r in otima] == [beta[0], alfa[0]]
+    assert {r.tipo_match for r in gulosa + otima} == {"EXACT"}
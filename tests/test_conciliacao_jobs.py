@@ -0,0 +1,184 @@
+import asyncio
+import json
+import pytest
+import uuid
+from decimal import Decimal
+from datetime import date, datetime, timedelta, timezone
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app.api.auth import get_current_user
+from app.models.usuario import Usuario
+from app.models.lancamento import Lancamento, NaturezaLancamento, TipoLancamento, StatusLancamento
+from app.models.participante import Participante, TipoParticipante
+from app.models.centro_custo import CentroCusto
+from app.models.conciliacao_job import ConciliacaoJob
+from app.models.transacao_processada import TransacaoProcessada
+from app.models.enums import StatusJob
+from app.services import conciliacao_jobs
+from app.services.conciliacao import ConciliacaoService
+from app.schemas.ofx import OfxTransactionSchema, EstrategiaConciliacao
+
+BASE = date(2024, 5, 6)
+
+# Mock user for authentication bypass
+async def mock_get_current_user():
+    return Usuario(id=uuid.uuid4(), email="test@example.com", role="ADMIN")
+
+@pytest.fixture
+def override_auth(client):
+    from app.main import app
+    app.dependency_overrides[get_current_user] = mock_get_current_user
+    yield
+    app.dependency_overrides.pop(get_current_user, None)
+
+@pytest.fixture
+def session_factory(db_session):
+    # Sessões do worker na mesma conexão (e transação externa) do teste
+    return async_sessionmaker(
+        bind=db_session.bind, class_=AsyncSession, expire_on_commit=False, join_transaction_mode="create_savepoint"
+    )
+
+async def _seed(db_session, valores):
+    participante_id = uuid.uuid4()
+    centro_id = uuid.uuid4()
+    await db_session.execute(insert(Participante).values(
+        id=participante_id, nome="Cliente Job", documento=str(participante_id), tipo=TipoParticipante.CLIENTE
+    ))
+    await db_session.execute(insert(CentroCusto).values(id=centro_id, nome=f"Centro {centro_id}"))
+    await db_session.execute(insert(Lancamento), [
+        {
+            "id": uuid.uuid4(), "descricao": f"Parcela {valor}", "valor": Decimal(valor),
+            "tipo": TipoLancamento.RECEITA, "natureza": NaturezaLancamento.PONTUAL,
+            "status": StatusLancamento.PENDENTE, "data_vencimento": BASE + timedelta(days=i),
+            "participante_id": participante_id, "centro_custo_id": centro_id, "reembolsavel": False
+        }
+        for i, valor in enumerate(valores)
+    ])
+
+def _transacoes():
+    return [
+        OfxTransactionSchema(id=f"tx{i}", data=BASE + timedelta(days=i), valor=Decimal(valor), descricao="OFX")
+        for i, valor in enumerate(["100.00", "-205.00", "300.00", "999.99", "500.00"])
+    ]
+
+@pytest.mark.asyncio
+async def test_job_conciliacao_persiste_resultados(client, override_auth, db_session, session_factory, monkeypatch):
+    # Lotes pequenos: o job grava resultados e progresso em várias etapas
+    monkeypatch.setattr(conciliacao_jobs, "TAMANHO_LOTE_JOB", 2)
+    await _seed(db_session, ["100.00", "200.00", "300.00", "50.00", "500.00"])
+    transacoes = _transacoes()
+
+    response = await client.post("/conciliacao/jobs", json=[tx.model_dump(mode="json") for tx in transacoes])
+    assert response.status_code == 202
+    job = response.json()
+    assert (job["status"], job["total"], job["processadas"]) == ("PENDENTE", 5, 0)
+
+    assert await conciliacao_jobs.processar_proximo(session_factory) is True
+    assert await conciliacao_jobs.processar_proximo(session_factory) is False
+
+    response = await client.get(f"/conciliacao/jobs/{job['id']}")
+    assert response.json()["status"] == "CONCLUIDO"
+    assert response.json()["processadas"] == 5
+
+    esperados = await ConciliacaoService(db_session).processar_ofx(transacoes)
+    response = await client.get(f"/conciliacao/jobs/{job['id']}/resultados")
+    assert response.json() == [json.loads(r.model_dump_json()) for r in esperados]
+
+    response = await client.get(f"/conciliacao/jobs/{job['id']}/resultados?offset=3&limit=1")
+    assert [r["ofx_id"] for r in response.json()] == ["tx3"]
+
+@pytest.mark.asyncio
+async def test_job_conciliacao_eventos_sse(client, override_auth, session_factory):
+    response = await client.post("/conciliacao/jobs", json=[tx.model_dump(mode="json") for tx in _transacoes()])
+    job_id = response.json()["id"]
+    await conciliacao_jobs.processar_proximo(session_factory)
+
+    response = await client.get(f"/conciliacao/jobs/{job_id}/eventos")
+    assert response.headers["content-type"].startswith("text/event-stream")
+    eventos = [linha for linha in response.text.splitlines() if linha.startswith("data: ")]
+    assert json.loads(eventos[-1][len("data: "):])["status"] == "CONCLUIDO"
+
+@pytest.mark.asyncio
+async def test_job_conciliacao_inexistente(client, override_auth):
+    response = await client.get(f"/conciliacao/jobs/{uuid.uuid4()}")
+    assert response.status_code == 404
+
+@pytest.mark.asyncio
+async def test_job_longo_mantem_batimento_ate_terminar(db_session, session_factory, monkeypatch):
+    # O batimento roda ao lado do job e é cancelado quando ele termina
+    batimentos = []
+
+    async def batimento(factory, job_id):
+        batimentos.append(job_id)
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            batimentos.append("cancelado")
+            raise
+
+    monkeypatch.setattr(conciliacao_jobs, "manter_ativo", batimento)
+    await _seed(db_session, ["100.00", "200.00"])
+    job = await conciliacao_jobs.ConciliacaoJobService(db_session).criar(
+        _transacoes(), EstrategiaConciliacao.OTIMA, agrupar=True
+    )
+
+    assert await conciliacao_jobs.processar_proximo(session_factory) is True
+    assert batimentos == [job.id, "cancelado"]
+    concluido = await conciliacao_jobs.ConciliacaoJobService(db_session).obter(job.id)
+    assert concluido.status == StatusJob.CONCLUIDO
+    # A conciliação do job só sugere: nada vai para o registro de deduplicação
+    assert (await db_session.execute(select(TransacaoProcessada))).first() is None
+
+@pytest.mark.asyncio
+async def test_batimento_renova_atualizado_em(db_session, session_factory, monkeypatch):
+    monkeypatch.setattr(conciliacao_jobs, "INTERVALO_BATIMENTO", 0.01)
+    service = conciliacao_jobs.ConciliacaoJobService(db_session)
+    job = await service.criar(_transacoes(), EstrategiaConciliacao.OTIMA, agrupar=True)
+    antigo = datetime.now(timezone.utc) - timedelta(hours=1)
+    await db_session.execute(
+        update(ConciliacaoJob).where(ConciliacaoJob.id == job.id)
+        .values(status=StatusJob.PROCESSANDO, atualizado_em=antigo)
+    )
+    await db_session.commit()
+
+    # Duas renovações; a terceira sessão encerra o laço (como o cancelamento ao fim do job)
+    sessoes = []
+
+    def factory():
+        sessoes.append(None)
+        if len(sessoes) > 2:
+            raise asyncio.CancelledError
+        return session_factory()
+
+    with pytest.raises(asyncio.CancelledError):
+        await conciliacao_jobs.manter_ativo(factory, job.id)
+
+    renovado = await service.obter(job.id)
+    assert renovado.atualizado_em.replace(tzinfo=timezone.utc) > antigo
+    # Job renovado não é tomado por abandonado
+    async with session_factory() as db:
+        assert await conciliacao_jobs.ConciliacaoJobService(db).recuperar_abandonados() == 0
+
+@pytest.mark.asyncio
+async def test_worker_recupera_abandonados_periodicamente(monkeypatch):
+    monkeypatch.setattr(conciliacao_jobs, "INTERVALO_RECUPERACAO", 0.05)
+    monkeypatch.setattr(conciliacao_jobs, "INTERVALO_FILA", 0.01)
+    recuperacoes = []
+
+    async def recuperar(self):
+        recuperacoes.append(asyncio.get_running_loop().time())
+        return 0
+
+    async def fila_vazia(session_factory):
+        return False
+
+    monkeypatch.setattr(conciliacao_jobs.ConciliacaoJobService, "recuperar_abandonados", recuperar)
+    monkeypatch.setattr(conciliacao_jobs, "processar_proximo", fila_vazia)
+    worker = conciliacao_jobs.ConciliacaoWorker(async_sessionmaker())
+    worker.iniciar()
+    await asyncio.sleep(0.3)
+    await worker.parar()
+
+    # Não só na partida: jobs largados por outra instância voltam à fila sem reiniciar este worker
+    assert len(recuperacoes) >= 3
+    assert all(b - a >= 0.05 for a, b in zip(recuperacoes, recuperacoes[1:]))
@@ -0,0 +1,456 @@
+import asyncio
+from functools import partial
+import pytest
+import uuid
+from decimal import Decimal
+from datetime import date, datetime, timedelta, timezone
+from sqlalchemy import insert, select
+from app.models.lancamento import Lancamento
+from app.models.participante import Participante
+from app.models.processo import Processo
+from app.models.centro_custo import CentroCusto
+from app.models.enums import TipoParticipante, TipoLancamento, NaturezaLancamento, StatusLancamento, StatusProcesso
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app.core.cache import CacheLRU, RelatorioEmCache
+from app.core.consultas import executar_em_paralelo
+from app.services.dashboard import DashboardService, analytics_em_cache, cache_analytics, relatorio_analytics
+from app.services import daily_ledger
+from app.services.fechamento import FechamentoService, consulta_saldo
+from app.core.ledger import PeriodoFechado
+from app.services.serie_temporal import escolher_granularidade, faixas, lttb, periodo_comparacao
+from app.schemas.dashboard import Granularidade, Comparacao
+
+BASE = date(2024, 6, 1)
+
+async def _seed_dashboard(db_session):
+    participante_id = uuid.uuid4()
+    processo_id = uuid.uuid4()
+    centros = {"Administrativo": uuid.uuid4(), "Contencioso": uuid.uuid4()}
+    await db_session.execute(insert(Participante).values(
+        id=participante_id, nome="Cliente Dashboard", documento=str(participante_id), tipo=TipoParticipante.CLIENTE
+    ))
+    await db_session.execute(insert(Processo).values(
+        id=processo_id, numero=f"proc-{processo_id}", status=StatusProcesso.ATIVO, cliente_id=participante_id,
+        valor_causa_estimado=Decimal("10000.00"), percentual_exito=Decimal("20.00")
+    ))
+    for nome, centro_id in centros.items():
+        await db_session.execute(insert(CentroCusto).values(id=centro_id, nome=nome))
+
+    linhas = [
+        # (dias, tipo, natureza, status, valor, centro)
+        (0, TipoLancamento.RECEITA, NaturezaLancamento.PONTUAL, StatusLancamento.PAGO, "1000.00", "Administrativo"),
+        (0, TipoLancamento.RECEITA, NaturezaLancamento.EXITO, StatusLancamento.PENDENTE, "3000.00", "Administrativo"),
+        (2, TipoLancamento.RECEITA, NaturezaLancamento.EXITO, StatusLancamento.PENDENTE, "1000.00", "Contencioso"),
+        (0, TipoLancamento.DESPESA, NaturezaLancamento.FIXO, StatusLancamento.PAGO, "500.00", "Administrativo"),
+        (2, TipoLancamento.DESPESA, NaturezaLancamento.PONTUAL, StatusLancamento.PENDENTE, "200.00", "Contencioso"),
+        (1, TipoLancamento.DESPESA, NaturezaLancamento.PONTUAL, StatusLancamento.CANCELADO, "999.00", "Contencioso"),
+        (40, TipoLancamento.RECEITA, NaturezaLancamento.PONTUAL, StatusLancamento.PENDENTE, "50.00", "Contencioso"),
+    ]
+    await db_session.execute(insert(Lancamento), [
+        {
+            "id": uuid.uuid4(), "descricao": "Dashboard", "valor": Decimal(valor), "tipo": tipo,
+            "natureza": natureza, "status": status, "data_vencimento": BASE + timedelta(days=dias),
+            "participante_id": participante_id, "centro_custo_id": centros[centro],
+            "processo_id": processo_id if natureza == NaturezaLancamento.EXITO else None, "reembolsavel": False
+        }
+        for dias, tipo, natureza, status, valor, centro in linhas
+    ])
+    # Inserção em lote (Core) não passa pelo hook do rollup
+    await daily_ledger.reconstruir(db_session)
+    return centros
+
+@pytest.mark.asyncio
+async def test_dashboard_analytics_agregacao_unica(db_session):
+    centros = await _seed_dashboard(db_session)
+
+    dados = await DashboardService(db_session).analytics(BASE, BASE + timedelta(days=30))
+
+    assert dados.cards.model_dump() == {
+        "saldo_atual": 4300.0, "burn_rate": 500.0, "ticket_medio_exito": 2000.0, "pipeline_recebiveis": 2000.0
+    }
+    assert [p.model_dump() for p in dados.cash_flow] == [
+        {"date": "2024-06-01", "entradas": 4000.0, "saidas": 500.0},
+        {"date": "2024-06-03", "entradas": 1000.0, "saidas": 200.0},
+    ]
+    assert [p.model_dump() for p in dados.projected_flow] == [
+        {"date": "2024-06-01", "realizado": 3500.0, "projetado": 5500.0},
+        {"date": "2024-06-03", "realizado": 4300.0, "projetado": 6300.0},
+    ]
+    assert [e.model_dump() for e in dados.expenses_by_category] == [
+        {"name": "Administrativo", "value": 500.0}, {"name": "Contencioso", "value": 200.0}
+    ]
+
+    filtrado = await DashboardService(db_session).analytics(
+        BASE, BASE + timedelta(days=30), centro_custo_id=centros["Contencioso"]
+    )
+    assert filtrado.cards.saldo_atual == 800.0
+    assert [e.name for e in filtrado.expenses_by_category] == ["Contencioso"]
+
+    # Sem período de vencimento a agregação lê os lançamentos: mesmos cards
+    bruto = await DashboardService(db_session).analytics(status_processo=StatusProcesso.ATIVO)
+    assert bruto.cards.ticket_medio_exito == 2000.0
+
+@pytest.mark.asyncio
+async def test_daily_ledger_mantido_pelo_orm(db_session):
+    centros = await _seed_dashboard(db_session)
+    assert await daily_ledger.verificar(db_session) == []
+
+    participante = Participante(nome="Cliente Ledger", documento="ledger-1", tipo=TipoParticipante.CLIENTE)
+    processo = Processo(
+        numero="ledger-proc", status=StatusProcesso.ATIVO, cliente=participante,
+        valor_causa_estimado=Decimal("1000.00"), percentual_exito=Decimal("10.00")
+    )
+    novo = Lancamento(
+        descricao="Êxito ledger", valor=Decimal("700.00"), tipo=TipoLancamento.RECEITA,
+        natureza=NaturezaLancamento.EXITO, status=StatusLancamento.PENDENTE, data_vencimento=BASE,
+        participante=participante, processo=processo, centro_custo_id=centros["Contencioso"]
+    )
+    db_session.add_all([participante, processo, novo])
+    await db_session.flush()
+    assert await daily_ledger.verificar(db_session) == []
+
+    # Alteração de chave e de valor
+    novo.status = StatusLancamento.PAGO
+    novo.valor = Decimal("650.00")
+    novo.data_vencimento = BASE + timedelta(days=1)
+    await db_session.flush()
+    assert await daily_ledger.verificar(db_session) == []
+
+    # Mudança de status do processo move os lançamentos dele
+    processo.status = StatusProcesso.SUSPENSO
+    await db_session.flush()
+    assert await daily_ledger.verificar(db_session) == []
+    suspensos = await DashboardService(db_session).analytics(
+        BASE, BASE + timedelta(days=30), status_processo=StatusProcesso.SUSPENSO
+    )
+    assert suspensos.cards.saldo_atual == 650.0
+
+    await db_session.delete(novo)
+    await db_session.flush()
+    assert await daily_ledger.verificar(db_session) == []
+
+@pytest.mark.asyncio
+async def test_daily_ledger_alteracao_de_instancia_expirada(db_session):
+    centros = await _seed_dashboard(db_session)
+    lancamento = (await db_session.execute(
+        select(Lancamento).where(Lancamento.status == StatusLancamento.PENDENTE).order_by(Lancamento.valor).limit(1)
+    )).scalar_one()
+
+    # Sem valores carregados, o histórico não tem o valor anterior dos campos
+    db_session.expire(lancamento)
+    lancamento.valor = Decimal("123.45")
+    lancamento.data_vencimento = BASE + timedelta(days=9)
+    lancamento.centro_custo_id = centros["Administrativo"]
+    await db_session.flush()
+    assert await daily_ledger.verificar(db_session) == []
+
+    db_session.expire(lancamento)
+    lancamento.status = StatusLancamento.PAGO
+    await db_session.flush()
+    assert await daily_ledger.verificar(db_session) == []
+
+def test_cache_lru_ttl_e_contadores():
+    agora = [0.0]
+    cache = CacheLRU(max_itens=2, ttl=10, relogio=lambda: agora[0])
+    cache.guardar("a", 1)
+    cache.guardar("b", 2)
+    assert cache.obter("a") == 1
+    cache.guardar("c", 3)  # "b" é o menos usado
+    assert cache.obter("b") is None
+    agora[0] = 11
+    assert cache.obter("a") is None
+    assert (cache.acertos, cache.falhas) == (1, 2)
+
+    # Resultado calculado antes de uma invalidação não é guardado
+    versao = cache.versao
+    cache.invalidar(lambda chave: False)
+    cache.guardar("d", 4, versao)
+    assert cache.obter("d") is None
+
+@pytest.fixture
+def session_factory(db_session):
+    # Sessões do cálculo compartilhado na mesma conexão (e transação externa) do teste
+    return async_sessionmaker(
+        bind=db_session.bind, class_=AsyncSession, expire_on_commit=False, join_transaction_mode="create_savepoint"
+    )
+
+@pytest.mark.asyncio
+async def test_dashboard_cache_invalidado_por_commit(db_session, session_factory, monkeypatch):
+    monkeypatch.setattr(relatorio_analytics, "session_factory", session_factory)
+    centros = await _seed_dashboard(db_session)
+    await db_session.commit()
+    cache_analytics.limpar()
+    junho = (BASE, BASE + timedelta(days=29))
+    julho = (BASE + timedelta(days=30), BASE + timedelta(days=60))
+
+    primeiro = await analytics_em_cache(*junho)
+    assert await analytics_em_cache(*junho) is primeiro
+    await analytics_em_cache(*julho)
+    await analytics_em_cache(*junho, centro_custo_id=centros["Contencioso"])
+    acertos = cache_analytics.acertos
+
+    # Despesa em junho no centro Administrativo: julho e o filtro por Contencioso continuam válidos
+    participante = (await db_session.execute(select(Participante))).scalars().first()
+    db_session.add(Lancamento(
+        descricao="Nova despesa", valor=Decimal("100.00"), tipo=TipoLancamento.DESPESA,
+        natureza=NaturezaLancamento.PONTUAL, data_vencimento=BASE + timedelta(days=5),
+        participante_id=participante.id, centro_custo_id=centros["Administrativo"]
+    ))
+    await db_session.commit()
+
+    atualizado = await analytics_em_cache(*junho)
+    assert atualizado.cards.saldo_atual == primeiro.cards.saldo_atual - 100
+    await analytics_em_cache(*julho)
+    await analytics_em_cache(*junho, centro_custo_id=centros["Contencioso"])
+    assert cache_analytics.acertos == acertos + 2
+
+    # Processo alterado: o pipeline muda em todos os resultados
+    processo = (await db_session.execute(select(Processo))).scalars().first()
+    processo.percentual_exito = Decimal("30.00")
+    await db_session.commit()
+    assert cache_analytics.estatisticas()["itens"] == 0
+
+class _Sessao:
+    async def __aenter__(self):
+        return None
+
+    async def __aexit__(self, *args):
+        return False
+
+@pytest.mark.asyncio
+async def test_relatorio_em_cache_compartilha_calculo():
+    relatorio = RelatorioEmCache(CacheLRU(), _Sessao)
+    chamadas = []
+
+    async def calcular(db):
+        chamadas.append(1)
+        await asyncio.sleep(0.01)
+        return {"total": len(chamadas)}
+
+    resultados = await asyncio.gather(*(relatorio.obter("chave", calcular) for _ in range(20)))
+    assert len(chamadas) == 1
+    assert all(r is resultados[0] for r in resultados)
+    assert relatorio.estatisticas()["compartilhados"] == 19
+
+@pytest.mark.asyncio
+async def test_relatorio_em_cache_stale_while_revalidate():
+    agora = [0.0]
+    relatorio = RelatorioEmCache(CacheLRU(ttl=10, relogio=lambda: agora[0]), _Sessao, janela_obsoleta=30)
+    versoes = iter(["v1", "v2", "v3"])
+
+    async def calcular(db):
+        await asyncio.sleep(0.01)
+        return next(versoes)
+
+    assert await relatorio.obter("chave", calcular) == "v1"
+
+    # Vencido, mas dentro da janela: devolve o anterior e recalcula uma única vez em segundo plano
+    agora[0] = 15
+    assert await asyncio.gather(relatorio.obter("chave", calcular), relatorio.obter("chave", calcular)) == ["v1", "v1"]
+    await asyncio.sleep(0.05)
+    assert await relatorio.obter("chave", calcular) == "v2"
+
+    # Fora da janela: espera o novo cálculo
+    agora[0] = 100
+    assert await relatorio.obter("chave", calcular) == "v3"
+
+@pytest.mark.asyncio
+async def test_executar_em_paralelo_fora_do_postgres_usa_a_sessao_principal(db_session, session_factory):
+    await _seed_dashboard(db_session)
+    sessoes = []
+
+    async def consulta(valor, db):
+        sessoes.append(db)
+        return valor
+
+    resultados = await executar_em_paralelo(db_session, [partial(consulta, i) for i in range(4)], session_factory)
+    assert resultados == [0, 1, 2, 3]
+    assert all(s is db_session for s in sessoes)
+
+    sequencial = await DashboardService(db_session).analytics(BASE, BASE + timedelta(days=30))
+    paralelo = await DashboardService(db_session, session_factory).analytics(BASE, BASE + timedelta(days=30))
+    assert paralelo == sequencial
+
+@pytest.mark.asyncio
+async def test_saldo_acumulado_parte_do_fechamento_mensal(db_session):
+    centros = await _seed_dashboard(db_session)
+    fechamentos = FechamentoService(db_session)
+    julho = (date(2024, 7, 1), date(2024, 7, 31))
+
+    aberto = await DashboardService(db_session).analytics(*julho, acumulado=True)
+    assert aberto.cards.saldo_atual == 4350.0
+    assert aberto.projected_flow[0].realizado == 4350.0
+
+    fechamento = await fechamentos.fechar(date(2024, 6, 15))
+    assert (fechamento.mes, fechamento.ate) == (date(2024, 6, 1), date(2024, 6, 30))
+    assert (await db_session.execute(consulta_saldo(date(2024, 6, 30)))).scalar() == Decimal("4300.00")
+    fechado = await DashboardService(db_session).analytics(*julho, acumulado=True)
+    assert fechado == aberto
+    with pytest.raises(ValueError):
+        await fechamentos.fechar(date(2024, 6, 1))
+
+    # Lançamento em mês fechado é recusado até reabrir o mês
+    tardia = Lancamento(
+        descricao="Despesa tardia", valor=Decimal("100.00"), tipo=TipoLancamento.DESPESA,
+        natureza=NaturezaLancamento.PONTUAL, status=StatusLancamento.PAGO, data_vencimento=BASE,
+        participante_id=(await db_session.execute(select(Participante.id))).scalar(),
+        centro_custo_id=centros["Administrativo"]
+    )
+    db_session.add(tardia)
+    with pytest.raises(PeriodoFechado):
+        await db_session.commit()
+    db_session.expunge_all()
+    assert (await DashboardService(db_session).analytics(*julho, acumulado=True)).cards.saldo_atual == 4350.0
+    assert await fechamentos.reabrir(date(2024, 6, 1)) == 1
+    db_session.add(tardia)
+    await db_session.commit()
+    assert (await DashboardService(db_session).analytics(*julho, acumulado=True)).cards.saldo_atual == 4250.0
+
+@pytest.mark.asyncio
+async def test_saldo_fechado_acompanha_status_do_processo(db_session):
+    await _seed_dashboard(db_session)
+    fechamentos = FechamentoService(db_session)
+    await fechamentos.fechar(date(2024, 6, 1))
+
+    # Os lançamentos de êxito (4000, junho) mudam de chave também no saldo congelado
+    processo = (await db_session.execute(select(Processo))).scalar_one()
+    processo.status = StatusProcesso.ENCERRADO
+    await db_session.commit()
+
+    async def saldos() -> list:
+        return [
+            (await db_session.execute(consulta_saldo(date(2024, 7, 31), status_processo=status))).scalar()
+            for status in (None, StatusProcesso.ATIVO, StatusProcesso.ENCERRADO)
+        ]
+    congelados = await saldos()
+    assert congelados[1:] == [Decimal("0.00"), Decimal("4000.00")]
+    # Mesmos saldos lidos direto do daily_ledger, sem o fechamento
+    await fechamentos.reabrir(date(2024, 6, 1))
+    assert await saldos() == congelados
+
+@pytest.mark.asyncio
+async def test_serie_agrupada_por_periodo_no_banco(db_session):
+    await _seed_dashboard(db_session)
+    service = DashboardService(db_session)
+
+    mensal = await service.analytics(BASE, BASE + timedelta(days=60), granularidade=Granularidade.MES)
+    assert [p.model_dump() for p in mensal.cash_flow] == [
+        {"date": "2024-06-01", "entradas": 5000.0, "saidas": 700.0},
+        {"date": "2024-07-01", "entradas": 50.0, "saidas": 0.0},
+    ]
+    assert [p.realizado for p in mensal.projected_flow] == [4300.0, 4350.0]
+
+    # 01/06/2024 é sábado: a semana começa na segunda-feira anterior
+    semanal = await service.analytics(BASE, BASE + timedelta(days=30), granularidade=Granularidade.SEMANA)
+    assert [(p.date, p.entradas) for p in semanal.cash_flow] == [("2024-05-27", 4000.0), ("2024-06-03", 1000.0)]
+
+    # AUTO escolhe o menor período que cabe no limite de pontos
+    assert escolher_granularidade(Granularidade.AUTO, BASE, BASE + timedelta(days=30), 120) == Granularidade.DIA
+    assert escolher_granularidade(Granularidade.AUTO, BASE, BASE + timedelta(days=3 * 365), 120) == Granularidade.MES
+
+@pytest.mark.asyncio
+async def test_serie_sem_periodo_mantem_pontos_diarios(db_session):
+    await _seed_dashboard(db_session)
+
+    # Sem intervalo de vencimento, AUTO mantém a série diária de antes
+    dados = await DashboardService(db_session).analytics()
+    assert [p.model_dump() for p in dados.cash_flow] == [
+        {"date": "2024-06-01", "entradas": 4000.0, "saidas": 500.0},
+        {"date": "2024-06-03", "entradas": 1000.0, "saidas": 200.0},
+        {"date": "2024-07-11", "entradas": 50.0, "saidas": 0.0},
+    ]
+    assert escolher_granularidade(Granularidade.AUTO, None, None, 120) == Granularidade.DIA
+
+@pytest.mark.asyncio
+async def test_max_pontos_limita_as_barras_sem_perder_valores(db_session):
+    await _seed_dashboard(db_session)
+    service = DashboardService(db_session)
+
+    diario = await service.analytics(granularidade=Granularidade.DIA)
+    assert len(diario.cash_flow) == 3
+    reduzido = await service.analytics(granularidade=Granularidade.DIA, max_pontos=2)
+    # 01/06 a 11/07 em duas faixas de 21 dias: 01/06 e 03/06 somados na primeira
+    assert [p.model_dump() for p in reduzido.cash_flow] == [
+        {"date": "2024-06-01", "entradas": 5000.0, "saidas": 700.0},
+        {"date": "2024-07-11", "entradas": 50.0, "saidas": 0.0},
+    ]
+    assert sum(p.entradas for p in reduzido.cash_flow) == sum(p.entradas for p in diario.cash_flow)
+
+def test_faixas_somam_historico_longo_em_ate_max_pontos():
+    inicio = date(2021, 1, 1)
+    pontos = [(inicio + timedelta(days=d), d % 7) for d in range(0, 3 * 365, 2)]
+    grupos = faixas(pontos, 120, dia=lambda p: p[0])
+    assert len(grupos) <= 120
+    assert [p for grupo in grupos for p in grupo] == pontos
+    assert faixas(pontos[:5], 120, dia=lambda p: p[0]) == [[p] for p in pontos[:5]]
+
+def test_lttb_preserva_extremos_e_picos():
+    pontos = [(x, 100.0 if x == 37 else float(x % 5)) for x in range(200)]
+    reduzidos = lttb(pontos, 20, x=lambda p: p[0], y=lambda p: p[1])
+    assert len(reduzidos) == 20
+    assert reduzidos[0] == pontos[0] and reduzidos[-1] == pontos[-1]
+    assert (37, 100.0) in reduzidos
+    assert lttb(pontos[:10], 20, x=lambda p: p[0], y=lambda p: p[1]) == pontos[:10]
+
+@pytest.mark.asyncio
+async def test_filtro_data_inclusao_por_intervalo_no_fuso_do_escritorio(db_session):
+    await _seed_dashboard(db_session)
+    participante_id = (await db_session.execute(select(Participante.id))).scalar()
+    centro_id = (await db_session.execute(select(CentroCusto.id))).scalar()
+    utc = timezone.utc
+    # 01:30 UTC de 02/06 ainda é 01/06 em São Paulo (UTC-3)
+    for criado_em, valor in [
+        (datetime(2024, 6, 1, 3, 0, tzinfo=utc), "10.00"),
+        (datetime(2024, 6, 2, 1, 30, tzinfo=utc), "20.00"),
+        (datetime(2024, 6, 2, 3, 0, tzinfo=utc), "40.00"),
+        (datetime(2024, 6, 4, 12, 0, tzinfo=utc), "80.00"),
+    ]:
+        await db_session.execute(insert(Lancamento).values(
+            id=uuid.uuid4(), descricao="Inclusão", valor=Decimal(valor), tipo=TipoLancamento.RECEITA,
+            natureza=NaturezaLancamento.PONTUAL, status=StatusLancamento.PENDENTE, data_vencimento=None,
+            participante_id=participante_id, centro_custo_id=centro_id, reembolsavel=False, criado_em=criado_em
+        ))
+
+    service = DashboardService(db_session)
+    dia = await service.analytics(data_inclusao=date(2024, 6, 1))
+    assert dia.cards.saldo_atual == 30.0
+    semana = await service.analytics(data_inclusao=date(2024, 6, 1), data_inclusao_fim=date(2024, 6, 7))
+    assert semana.cards.saldo_atual == 150.0
+
+@pytest.mark.asyncio
+async def test_comparacao_com_periodo_anterior_em_uma_requisicao(db_session):
+    await _seed_dashboard(db_session)
+    julho = (date(2024, 7, 1), date(2024, 7, 31))
+
+    dados = await DashboardService(db_session).analytics(
+        *julho, granularidade=Granularidade.DIA, comparar_com=Comparacao.PERIODO_ANTERIOR
+    )
+    assert dados.cards.saldo_atual == 50.0
+    comparacao = dados.comparacao
+    assert (comparacao.data_inicio, comparacao.data_fim) == (date(2024, 6, 1), date(2024, 6, 30))
+    assert comparacao.cards == (await DashboardService(db_session).analytics(
+        date(2024, 6, 1), date(2024, 6, 30)
+    )).cards
+    # Série de junho nas datas de julho (n-ésimo dia com n-ésimo dia)
+    assert [(p.date, p.entradas) for p in comparacao.cash_flow] == [("2024-07-01", 4000.0), ("2024-07-03", 1000.0)]
+    assert [p.realizado for p in comparacao.projected_flow] == [3500.0, 4300.0]
+
+    anual = await DashboardService(db_session).analytics(*julho, comparar_com=Comparacao.ANO_ANTERIOR)
+    assert (anual.comparacao.data_inicio, anual.comparacao.data_fim) == (date(2023, 7, 1), date(2023, 7, 31))
+    assert anual.comparacao.cash_flow == []
+
+def test_periodo_comparacao():
+    assert periodo_comparacao(date(2024, 3, 1), date(2024, 3, 31), Comparacao.PERIODO_ANTERIOR) == (
+        date(2024, 2, 1), date(2024, 2, 29)
+    )
+    assert periodo_comparacao(date(2024, 3, 10), date(2024, 3, 19), Comparacao.PERIODO_ANTERIOR) == (
+        date(2024, 2, 29), date(2024, 3, 9)
+    )
+    assert periodo_comparacao(date(2024, 2, 1), date(2024, 2, 29), Comparacao.ANO_ANTERIOR) == (
+        date(2023, 2, 1), date(2023, 2, 28)
+    )
+    assert periodo_comparacao(
+        date(2024, 3, 1), date(2024, 3, 31), Comparacao.PERSONALIZADO, date(2023, 12, 1)
+    ) == (date(2023, 12, 1), date(2023, 12, 31))
+    with pytest.raises(ValueError):
+        periodo_comparacao(date(2024, 3, 1), date(2024, 3, 31), Comparacao.PERSONALIZADO, date(2024, 3, 15))
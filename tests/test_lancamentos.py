@@ -0,0 +1,571 @@
+import csv
+import io
+import json
+import random
+import tracemalloc
+import zipfile
+import pytest
+import uuid
+from decimal import Decimal
+from datetime import date, timedelta
+from xml.etree import ElementTree
+from sqlalchemy import event, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app.api.auth import get_current_user
+from app.core.database import get_session_factory
+from app.core.paginacao import codificar_cursor
+from app.models.lancamento import Lancamento
+from app.models.participante import Participante
+from app.models.centro_custo import CentroCusto
+from app.models.processo import Processo
+from app.models.cartao_credito import CartaoCredito
+from app.models.usuario import Usuario
+from app.models.enums import TipoParticipante, TipoLancamento, NaturezaLancamento, StatusLancamento, StatusProcesso
+from app.schemas.lancamento import FormatoExportacao
+from app.services import exportacao, lancamento as lancamento_service
+from app.services.exportacao import ExportacaoService
+from app.services.lancamento import LancamentoService, filtros_listagem
+
+BASE = date(2024, 1, 1)
+
+async def mock_get_current_user():
+    return Usuario(id=uuid.uuid4(), email="test@example.com", role="ADMIN")
+
+@pytest.fixture
+def override_auth(client):
+    from app.main import app
+    app.dependency_overrides[get_current_user] = mock_get_current_user
+    yield
+    app.dependency_overrides.pop(get_current_user, None)
+
+async def _seed(db_session, total: int, sem_vencimento: int = 0, seed: int = 21, dias: int = 60) -> dict:
+    rng = random.Random(seed)
+    participante_id = uuid.uuid4()
+    centros = [uuid.uuid4() for _ in range(4)]
+    await db_session.execute(insert(Participante).values(
+        id=participante_id, nome="Cliente Paginação", documento=f"paginacao-{seed}", tipo=TipoParticipante.CLIENTE
+    ))
+    for i, centro_id in enumerate(centros):
+        await db_session.execute(insert(CentroCusto).values(id=centro_id, nome=f"Centro paginação {seed}-{i}"))
+    await db_session.execute(insert(Lancamento), [
+        {
+            "id": uuid.uuid4(), "descricao": f"Paginação {i}", "valor": Decimal(rng.randint(100, 99999)) / 100,
+            "tipo": rng.choice(list(TipoLancamento)), "natureza": NaturezaLancamento.PONTUAL,
+            "status": rng.choice(list(StatusLancamento)),
+            # Com poucos dias muitas linhas empatam em data_vencimento
+            "data_vencimento": None if i < sem_vencimento else BASE + timedelta(days=rng.randrange(dias)),
+            "participante_id": participante_id, "centro_custo_id": rng.choice(centros), "reembolsavel": False,
+        }
+        for i in range(total)
+    ])
+    await db_session.flush()
+    return {"participante_id": participante_id, "centro_custo_id": centros[0]}
+
+async def _ordenados(db_session, **filtros) -> list[tuple]:
+    stmt = select(Lancamento.data_vencimento, Lancamento.id).where(*filtros_listagem(**filtros))
+    linhas = (await db_session.execute(stmt)).all()
+    # NULL por último, como na listagem
+    return sorted(linhas, key=lambda l: (l[0] is None, l[0] or date.min, l[1].hex))
+
+@pytest.mark.asyncio
+async def test_listagem_por_cursor_percorre_todas_as_linhas(client, db_session, override_auth):
+    ids = await _seed(db_session, total=230, sem_vencimento=25)
+
+    for filtros in ({}, {"status": "PAGO"}, {"centro_custo_id": str(ids["centro_custo_id"])},
+                    {"data_inicio": str(BASE + timedelta(days=10)), "data_fim": str(BASE + timedelta(days=40))},
+                    {"tipo": "DESPESA", "natureza": "PONTUAL"}):
+        recebidos, cursor, paginas = [], None, 0
+        while True:
+            params = filtros | {"limit": 17} | ({"cursor": cursor} if cursor else {})
+            response = await client.get("/lancamentos/", params=params)
+            assert response.status_code == 200
+            recebidos += [(l["data_vencimento"], l["id"]) for l in response.json()]
+            paginas += 1
+            cursor = response.headers.get("X-Next-Cursor")
+            if cursor is None:
+                break
+
+        convertidos = {
+            k: (uuid.UUID(v) if k == "centro_custo_id" else date.fromisoformat(v) if k.startswith("data") else v)
+            for k, v in filtros.items()
+        }
+        esperados = [(d.isoformat() if d else None, str(i)) for d, i in await _ordenados(db_session, **convertidos)]
+        assert recebidos == esperados, filtros
+        assert paginas == max(1, -(-len(esperados) // 17))
+
+@pytest.mark.asyncio
+async def test_cursor_estavel_com_insercoes_concorrentes(client, db_session, override_auth):
+    ids = await _seed(db_session, total=60, seed=22)
+
+    primeira = await client.get("/lancamentos/", params={"limit": 20})
+    vistos = [l["id"] for l in primeira.json()]
+    # Inserção antes do cursor: com OFFSET a última linha da primeira página reapareceria
+    await db_session.execute(insert(Lancamento).values(
+        id=uuid.uuid4(), descricao="Inserido antes", valor=Decimal("1.00"), tipo=TipoLancamento.RECEITA,
+        natureza=NaturezaLancamento.PONTUAL, status=StatusLancamento.PENDENTE, data_vencimento=BASE - timedelta(days=1),
+        participante_id=ids["participante_id"], centro_custo_id=ids["centro_custo_id"], reembolsavel=False
+    ))
+    cursor = primeira.headers["X-Next-Cursor"]
+    while cursor:
+        response = await client.get("/lancamentos/", params={"limit": 20, "cursor": cursor})
+        vistos += [l["id"] for l in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+
+    assert len(vistos) == len(set(vistos)) == 60
+
+@pytest.mark.asyncio
+async def test_limit_sem_teto_fora_do_cursor(client, db_session, override_auth, monkeypatch):
+    await _seed(db_session, total=60, seed=23)
+    monkeypatch.setattr(lancamento_service, "LIMITE_POR_PAGINA", 25)
+
+    # Sem cursor o limit pedido é atendido inteiro, como antes da paginação por cursor
+    primeira = await client.get("/lancamentos/", params={"limit": 40})
+    assert primeira.status_code == 200
+    assert len(primeira.json()) == 40
+    # Com cursor a página é limitada e o restante segue pelo próximo cursor
+    segunda = await client.get("/lancamentos/", params={"limit": 40, "cursor": primeira.headers["X-Next-Cursor"]})
+    assert len(segunda.json()) == 20 and "X-Next-Cursor" not in segunda.headers
+
+    assert (await client.get("/lancamentos/", params={"limit": 5000})).status_code == 200
+
+@pytest.mark.asyncio
+async def test_cursor_invalido(client, override_auth):
+    response = await client.get("/lancamentos/", params={"cursor": "nao-e-um-cursor"})
+    assert response.status_code == 400
+
+async def _instrucoes(db_session, consulta) -> int:
+    """
+    Custo de `consulta()` em centenas de instruções da VM do SQLite.
+    """
+    bruta = (await (await db_session.connection()).get_raw_connection()).driver_connection
+    contador = [0]
+
+    def contar():
+        contador[0] += 1
+        return 0
+
+    await bruta.set_progress_handler(contar, 100)
+    try:
+        await consulta()
+    finally:
+        await bruta.set_progress_handler(None, 100)
+    return contador[0]
+
+@pytest.mark.asyncio
+async def test_pagina_profunda_custa_o_mesmo_que_a_primeira(db_session):
+    ids = await _seed(db_session, total=20000, seed=23, dias=3 * 365)
+    service = LancamentoService(db_session)
+    limite = 20
+
+    for filtros in ({}, {"status": StatusLancamento.PAGO}, {"centro_custo_id": ids["centro_custo_id"]},
+                    {"data_inicio": BASE, "data_fim": BASE + timedelta(days=3 * 365)}):
+        ordenados = await _ordenados(db_session, **filtros)
+        # Página ~ (n - 100) / 20: a chave da linha anterior é o cursor
+        profunda = codificar_cursor(*ordenados[len(ordenados) - 100])
+
+        primeira = await _instrucoes(db_session, lambda: service.listar(filtros, limite))
+        com_cursor = await _instrucoes(db_session, lambda: service.listar(filtros, limite, cursor=profunda))
+        com_offset = await _instrucoes(
+            db_session, lambda: service.listar(filtros, limite, skip=len(ordenados) - 100)
+        )
+
+        assert com_cursor <= primeira * 2 + 5, (filtros, primeira, com_cursor)
+        assert com_offset > com_cursor * 10, (filtros, com_offset, com_cursor)
+
+@pytest.mark.asyncio
+async def test_listagem_compacta_equivale_a_completa(client, db_session, override_auth):
+    ids = await _seed(db_session, total=90, seed=24)
+    cliente_id, processo_id, cartao_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    await db_session.execute(insert(Participante).values(
+        id=cliente_id, nome="Cliente do Processo", documento="compacto-1", tipo=TipoParticipante.CLIENTE
+    ))
+    await db_session.execute(insert(Processo).values(
+        id=processo_id, numero="compacto-proc", status=StatusProcesso.ATIVO, cliente_id=cliente_id
+    ))
+    await db_session.execute(insert(CartaoCredito).values(
+        id=cartao_id, nome="Cartão Compacto", dia_fechamento=1, dia_vencimento=10, limite=Decimal("5000.00")
+    ))
+    linhas = (await db_session.execute(select(Lancamento).order_by(Lancamento.id).limit(30))).scalars().all()
+    for i, lancamento in enumerate(linhas):
+        lancamento.processo_id = processo_id if i % 2 else None
+        lancamento.cartao_id = cartao_id if i % 3 == 0 else None
+    await db_session.flush()
+
+    completa = await client.get("/lancamentos/", params={"limit": 50})
+    compacta = await client.get("/lancamentos/", params={"limit": 50, "compacto": True})
+    assert completa.status_code == compacta.status_code == 200
+    corpo = compacta.json()
+    assert corpo["next_cursor"] == compacta.headers["X-Next-Cursor"]
+    incluidos = corpo["included"]
+    assert set(incluidos["participantes"]) == {str(ids["participante_id"]), str(cliente_id)}
+    assert list(incluidos["processos"]) == [str(processo_id)]
+
+    # Reconstituir as linhas completas a partir das compactas
+    reconstituidas = []
+    for linha in corpo["data"]:
+        processo = incluidos["processos"].get(linha["processo_id"])
+        reconstituidas.append(linha | {
+            "participante": incluidos["participantes"][linha["participante_id"]],
+            "processo": processo and processo | {"cliente": incluidos["participantes"][processo["cliente_id"]]},
+            "cartao": incluidos["cartoes"].get(linha["cartao_id"]),
+            "centro_custo": incluidos["centros_custo"][linha["centro_custo_id"]],
+        })
+    assert reconstituidas == completa.json()
+    assert len(compacta.content) < len(completa.content) * 0.6
+
+def _subconjunto(completo, campos: list[str]):
+    resultado = {}
+    for campo in campos:
+        origem, destino = completo, resultado
+        *prefixo, nome = campo.split(".")
+        for parte in prefixo:
+            if origem[parte] is None:
+                destino[parte] = None
+                break
+            origem, destino = origem[parte], destino.setdefault(parte, {})
+        else:
+            destino[nome] = origem[nome]
+    return resultado
+
+@pytest.mark.asyncio
+async def test_listagem_com_fields_projeta_so_as_colunas(client, db_session, db_engine, override_auth):
+    await _seed(db_session, total=45, sem_vencimento=5, seed=25)
+    cliente_id, processo_id = uuid.uuid4(), uuid.uuid4()
+    await db_session.execute(insert(Participante).values(
+        id=cliente_id, nome="Cliente Fields", documento="fields-1", tipo=TipoParticipante.CLIENTE
+    ))
+    await db_session.execute(insert(Processo).values(
+        id=processo_id, numero="fields-proc", status=StatusProcesso.ATIVO, cliente_id=cliente_id
+    ))
+    primeiro = (await db_session.execute(select(Lancamento).order_by(Lancamento.id).limit(1))).scalar_one()
+    primeiro.processo_id = processo_id
+    await db_session.flush()
+    db_session.expunge_all()
+
+    campos = ["descricao", "valor", "status", "centro_custo.nome", "participante.nome", "processo.cliente.nome"]
+    projetados, cursor = [], None
+    comandos = []
+
+    def registrar(conn, cursor_db, sql, *args):
+        comandos.append(sql)
+
+    event.listen(db_engine.sync_engine, "before_cursor_execute", registrar)
+    try:
+        while True:
+            params = {"limit": 20, "fields": ",".join(campos)} | ({"cursor": cursor} if cursor else {})
+            response = await client.get("/lancamentos/", params=params)
+            assert response.status_code == 200
+            projetados += response.json()
+            cursor = response.headers.get("X-Next-Cursor")
+            if cursor is None:
+                break
+    finally:
+        event.remove(db_engine.sync_engine, "before_cursor_execute", registrar)
+
+    # Um SELECT por página, mais o dos sem vencimento nas duas últimas, sem selectinload nem ORM
+    assert all(sql.lstrip().upper().startswith("SELECT") for sql in comandos)
+    assert len(comandos) == 5
+    assert not any(isinstance(objeto, Lancamento) for objeto in db_session.identity_map.values())
+
+    response = await client.get("/lancamentos/", params={"limit": 100})
+    completos = response.json()
+    assert projetados == [_subconjunto(linha, campos) for linha in completos]
+    assert sum(1 for linha in projetados if linha["processo"]) == 1
+
+@pytest.mark.asyncio
+async def test_fields_invalido(client, override_auth):
+    for fields in ("senha", "centro_custo.inexistente", "valor.nome", " , "):
+        response = await client.get("/lancamentos/", params={"fields": fields})
+        assert response.status_code == 400, fields
+    response = await client.get("/lancamentos/", params={"fields": "id", "compacto": True})
+    assert response.status_code == 400
+
+@pytest.mark.asyncio
+async def test_processos_com_fields(client, db_session, override_auth):
+    cliente_id = uuid.uuid4()
+    await db_session.execute(insert(Participante).values(
+        id=cliente_id, nome="Cliente Processos Fields", documento="fields-2", tipo=TipoParticipante.CLIENTE
+    ))
+    await db_session.execute(insert(Processo), [
+        {"id": uuid.uuid4(), "numero": f"fields-{i}", "status": StatusProcesso.ATIVO, "cliente_id": cliente_id}
+        for i in range(3)
+    ])
+
+    completos = (await client.get("/processos/")).json()
+    projetados = (await client.get("/processos/", params={"fields": "numero,cliente"})).json()
+    assert projetados == [{"numero": p["numero"], "cliente": p["cliente"]} for p in completos]
+
+@pytest.fixture
+def exportacao_factory(db_session):
+    from app.main import app
+    # Sessão da exportação na mesma conexão (e transação externa) do teste
+    factory = async_sessionmaker(
+        bind=db_session.bind, class_=AsyncSession, expire_on_commit=False, join_transaction_mode="create_savepoint"
+    )
+    app.dependency_overrides[get_session_factory] = lambda: factory
+    yield factory
+    app.dependency_overrides.pop(get_session_factory, None)
+
+@pytest.mark.asyncio
+async def test_exportacao_csv_ndjson_xlsx(client, db_session, exportacao_factory, override_auth):
+    ids = await _seed(db_session, total=150, sem_vencimento=10, seed=26)
+    esperados = await _ordenados(db_session, centro_custo_id=ids["centro_custo_id"])
+    params = {"centro_custo_id": str(ids["centro_custo_id"])}
+
+    response = await client.get("/lancamentos/exportar", params=params | {"formato": "CSV"})
+    assert response.status_code == 200
+    assert response.headers["content-disposition"] == 'attachment; filename="lancamentos.csv"'
+    linhas = list(csv.DictReader(io.StringIO(response.content.decode("utf-8-sig"))))
+    assert [(l["data_vencimento"] or None, l["id"]) for l in linhas] == [
+        (d.isoformat() if d else None, str(i)) for d, i in esperados
+    ]
+    assert {l["centro_custo.nome"] for l in linhas} == {"Centro paginação 26-0"}
+
+    response = await client.get(
+        "/lancamentos/exportar", params=params | {"formato": "NDJSON", "fields": "id,valor,centro_custo"}
+    )
+    registros = [json.loads(linha) for linha in response.text.splitlines()]
+    assert [r["id"] for r in registros] == [str(i) for _, i in esperados]
+    assert set(registros[0]) == {"id", "valor", "centro_custo"}
+    assert registros[0]["centro_custo"]["id"] == str(ids["centro_custo_id"])
+
+    response = await client.get("/lancamentos/exportar", params=params | {"formato": "XLSX", "fields": "id,valor,data_vencimento"})
+    with zipfile.ZipFile(io.BytesIO(response.content)) as arquivo:
+        assert arquivo.testzip() is None
+        planilha = ElementTree.fromstring(arquivo.read("xl/worksheets/sheet1.xml"))
+    ns = {"s": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+    linhas = planilha.findall("s:sheetData/s:row", ns)
+    assert len(linhas) == len(esperados) + 1
+    cabecalho = [c.find("s:is/s:t", ns).text for c in linhas[0]]
+    assert cabecalho == ["id", "valor", "data_vencimento"]
+    primeira = linhas[1].findall("s:c", ns)
+    assert primeira[0].find("s:is/s:t", ns).text == str(esperados[0][1])
+    assert int(primeira[2].find("s:v", ns).text) == (esperados[0][0] - date(1899, 12, 30)).days
+
+    response = await client.get("/lancamentos/exportar", params={"fields": "senha"})
+    assert response.status_code == 400
+
+@pytest.mark.asyncio
+async def test_exportacao_csv_bom_e_injecao_de_formula(client, db_session, exportacao_factory, override_auth):
+    participante_id, centro_custo_id = uuid.uuid4(), uuid.uuid4()
+    await db_session.execute(insert(Participante).values(
+        id=participante_id, nome="Cliente CSV", documento="exportacao-csv", tipo=TipoParticipante.CLIENTE
+    ))
+    await db_session.execute(insert(CentroCusto).values(id=centro_custo_id, nome="Centro CSV"))
+    descricoes = ["=HYPERLINK(\"http://x\")", "+1", "-2+3", "@SUM(A1)", "Cobrança ação"]
+    await db_session.execute(insert(Lancamento), [
+        {
+            "id": uuid.uuid4(), "descricao": descricao, "valor": Decimal("-10.00"), "tipo": TipoLancamento.DESPESA,
+            "natureza": NaturezaLancamento.PONTUAL, "status": StatusLancamento.PENDENTE,
+            "data_vencimento": BASE + timedelta(days=dia), "participante_id": participante_id,
+            "centro_custo_id": centro_custo_id, "reembolsavel": False,
+        }
+        for dia, descricao in enumerate(descricoes)
+    ])
+
+    response = await client.get("/lancamentos/exportar", params={
+        "formato": "CSV", "fields": "descricao,valor", "centro_custo_id": str(centro_custo_id)
+    })
+    assert response.content.startswith(b"\xef\xbb\xbf")
+    linhas = list(csv.DictReader(io.StringIO(response.content.decode("utf-8-sig"))))
+    assert [l["descricao"] for l in linhas] == [
+        "'=HYPERLINK(\"http://x\")", "'+1", "'-2+3", "'@SUM(A1)", "Cobrança ação"
+    ]
+    # Números negativos não são texto livre e ficam sem o apóstrofo
+    assert {l["valor"] for l in linhas} == {"-10.00"}
+
+@pytest.mark.asyncio
+async def test_exportacao_em_memoria_constante(db_session, exportacao_factory, monkeypatch):
+    monkeypatch.setattr(exportacao, "LOTE_EXPORTACAO", 500)
+    await _seed(db_session, total=10000, seed=27, dias=3 * 365)
+    service = ExportacaoService(exportacao_factory)
+
+    picos = {}
+    for formato in FormatoExportacao:
+        # Um décimo dos vencimentos x todos
+        for filtros in ({"data_fim": BASE + timedelta(days=3 * 365 // 10)}, {}):
+            tracemalloc.start()
+            tamanho = 0
+            async for bloco in service.lancamentos(filtros, formato, service.projecao()):
+                tamanho += len(bloco)
+            picos[formato, bool(filtros)] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            assert tamanho > 0
+
+    # Dez vezes mais linhas, mesmo pico de memória (um lote por vez)
+    for formato in FormatoExportacao:
+        assert picos[formato, False] < picos[formato, True] * 1.5, (formato, picos)
+
+async def _referencias_lote(db_session) -> dict:
+    cliente_id, fornecedor_id, processo_id, centro_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    await db_session.execute(insert(Participante), [
+        {"id": cliente_id, "nome": "Cliente Lote", "documento": "lote-cliente", "tipo": TipoParticipante.CLIENTE},
+        {"id": fornecedor_id, "nome": "Fornecedor Lote", "documento": "lote-fornecedor", "tipo": TipoParticipante.FORNECEDOR},
+    ])
+    await db_session.execute(insert(Processo).values(
+        id=processo_id, numero="lote-proc", status=StatusProcesso.ATIVO, cliente_id=cliente_id
+    ))
+    await db_session.execute(insert(CentroCusto).values(id=centro_id, nome="Centro Lote"))
+    return {"cliente_id": cliente_id, "fornecedor_id": fornecedor_id, "processo_id": processo_id, "centro_custo_id": centro_id}
+
+def _lancamento_lote(ref: dict, i: int, **extra) -> dict:
+    return {
+        "descricao": f"Lote {i}", "valor": f"{10 + i}.50", "data_vencimento": str(BASE + timedelta(days=i % 5)),
+        "tipo": "DESPESA", "natureza": "PONTUAL", "participante_id": str(ref["fornecedor_id"]),
+        "centro_custo_id": str(ref["centro_custo_id"]),
+    } | extra
+
+@pytest.mark.asyncio
+async def test_bulk_cria_lancamentos_e_reembolsos(client, db_session, db_engine, override_auth):
+    from app.models.audit_log import AuditLog
+    from app.models.daily_ledger import DailyLedger
+    ref = await _referencias_lote(db_session)
+    reembolsaveis = {3, 7, 20}
+    corpo = [
+        _lancamento_lote(ref, i, **({"reembolsavel": True, "processo_id": str(ref["processo_id"])} if i in reembolsaveis else {}))
+        for i in range(40)
+    ]
+
+    comandos = []
+
+    def registrar(conn, cursor_db, sql, *args):
+        comandos.append(sql.lstrip().split()[0].upper())
+
+    event.listen(db_engine.sync_engine, "before_cursor_execute", registrar)
+    try:
+        response = await client.post("/lancamentos/bulk", json=corpo)
+    finally:
+        event.remove(db_engine.sync_engine, "before_cursor_execute", registrar)
+    assert response.status_code == 201, response.text
+    dados = response.json()
+
+    assert [linha["descricao"] for linha in dados["lancamentos"]] == [f"Lote {i}" for i in range(40)]
+    assert len(dados["reembolsos"]) == len(reembolsaveis)
+    pais = {linha["id"]: linha for linha in dados["lancamentos"]}
+    for reembolso in dados["reembolsos"]:
+        despesa = pais[reembolso["lancamento_pai_id"]]
+        assert reembolso["tipo"] == "RECEITA"
+        assert reembolso["participante_id"] == str(ref["cliente_id"])
+        assert reembolso["valor"] == despesa["valor"]
+        assert reembolso["descricao"] == f"Reembolso - {despesa['descricao']}"
+
+    # Um SELECT por tabela referenciada (mais o último fechamento e o status dos
+    # processos para o ledger) e um INSERT para lançamentos, reembolsos,
+    # daily_ledger e auditoria, qualquer que seja o lote
+    assert comandos == ["SELECT"] * 5 + ["INSERT"] * 4
+
+    total = await db_session.scalar(select(func.count()).select_from(Lancamento).where(Lancamento.descricao.like("%Lote%")))
+    assert total == 40 + len(reembolsaveis)
+    auditados = await db_session.scalar(
+        select(func.count()).select_from(AuditLog).where(AuditLog.tabela == "lancamentos", AuditLog.acao == "INSERT")
+    )
+    assert auditados == 40 + len(reembolsaveis)
+    valor_ledger = await db_session.scalar(
+        select(func.sum(DailyLedger.valor)).where(DailyLedger.centro_custo_id == ref["centro_custo_id"])
+    )
+    esperado = sum(Decimal(f"{10 + i}.50") for i in range(40)) + sum(Decimal(f"{10 + i}.50") for i in reembolsaveis)
+    assert valor_ledger == esperado
+
+@pytest.mark.asyncio
+async def test_bulk_com_erro_nao_grava_nenhuma_linha(client, db_session, override_auth):
+    ref = await _referencias_lote(db_session)
+    corpo = [_lancamento_lote(ref, i) for i in range(10)]
+    corpo[2]["centro_custo_id"] = str(uuid.uuid4())
+    corpo[6] |= {"natureza": "EXITO"}
+    corpo[8]["processo_id"] = str(uuid.uuid4())
+
+    response = await client.post("/lancamentos/bulk", json=corpo)
+    assert response.status_code == 422
+    erros = {(erro["loc"][1], erro["loc"][2]) for erro in response.json()["detail"]}
+    assert erros == {(2, "centro_custo_id"), (6, "processo_id"), (8, "processo_id")}
+
+    total = await db_session.scalar(select(func.count()).select_from(Lancamento).where(Lancamento.descricao.like("Lote %")))
+    assert total == 0
+
+@pytest.mark.asyncio
+async def test_bulk_valida_cada_linha(client, db_session, override_auth):
+    ref = await _referencias_lote(db_session)
+    corpo = [_lancamento_lote(ref, i) for i in range(3)]
+    corpo[1]["valor"] = "abc"
+
+    response = await client.post("/lancamentos/bulk", json=corpo)
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"][:3] == ["body", 1, "valor"]
+
+    response = await client.post("/lancamentos/bulk", json=[])
+    assert response.status_code == 422
+
+@pytest.mark.asyncio
+async def test_mes_fechado_recusa_alteracoes(client, db_session, override_auth):
+    from app.services import daily_ledger
+    from app.services.fechamento import FechamentoService
+    ref = await _seed(db_session, total=30, dias=60)
+    await daily_ledger.reconstruir(db_session)
+    await FechamentoService(db_session).fechar(date(2024, 1, 1))
+
+    linhas = (await db_session.execute(select(Lancamento).order_by(Lancamento.data_vencimento, Lancamento.id))).scalars().all()
+    janeiro = next(l for l in linhas if l.data_vencimento.month == 1)
+    fevereiro = next(l for l in linhas if l.data_vencimento.month == 2)
+    valor_janeiro = janeiro.valor
+
+    async def recusado(response):
+        assert response.status_code == 409, response.text
+        assert "mês fechado" in response.json()["detail"]
+        db_session.expunge_all()
+
+    # Alteração de lançamento em mês fechado, e de outro para dentro do mês fechado
+    await recusado(await client.put(f"/lancamentos/{janeiro.id}", json={"valor": "1.00"}))
+    await recusado(await client.put(f"/lancamentos/{fevereiro.id}", json={"data_vencimento": "2024-01-15"}))
+    await recusado(await client.delete(f"/lancamentos/{janeiro.id}"))
+    novo = {
+        "descricao": "Tardio", "valor": "10.00", "data_vencimento": "2024-01-20", "tipo": "DESPESA",
+        "natureza": "PONTUAL", "participante_id": str(ref["participante_id"]), "centro_custo_id": str(ref["centro_custo_id"]),
+    }
+    await recusado(await client.post("/lancamentos/bulk", json=[novo]))
+    await recusado(await client.put(f"/lancamentos/{janeiro.id}", json={"status": "CANCELADO"}))
+    # A taxa da diferença venceria no mês fechado
+    await recusado(await client.post("/conciliacao/aplicar", json={"itens": [{
+        "ofx_id": "a", "lancamento_id": str(janeiro.id), "tipo_match": "PARTIAL",
+        "data": "2024-01-31", "valor": str((valor_janeiro * Decimal("1.05")).quantize(Decimal("0.01"))),
+    }]}))
+
+    valor = (await db_session.execute(select(Lancamento.valor).where(Lancamento.id == janeiro.id))).scalar_one()
+    assert valor == valor_janeiro
+    assert await daily_ledger.verificar(db_session) == []
+
+    # Fora do mês fechado as alterações seguem normais
+    response = await client.put(f"/lancamentos/{fevereiro.id}", json={"valor": "1.00"})
+    assert response.status_code == 200
+
+@pytest.mark.asyncio
+async def test_mes_fechado_aceita_baixa_de_lancamento_vencido(client, db_session, override_auth):
+    from app.services import daily_ledger
+    from app.services.fechamento import FechamentoService, consulta_saldo
+    await _seed(db_session, total=30, dias=60, seed=28)
+    await daily_ledger.reconstruir(db_session)
+    await FechamentoService(db_session).fechar(date(2024, 1, 1))
+    saldo = (await db_session.execute(consulta_saldo(date(2024, 2, 29)))).scalar()
+
+    pendentes = (await db_session.execute(select(Lancamento).where(
+        Lancamento.status == StatusLancamento.PENDENTE, Lancamento.data_vencimento <= date(2024, 1, 31)
+    ).order_by(Lancamento.id))).scalars().all()
+    primeiro, segundo = pendentes[:2]
+    valor_segundo = segundo.valor
+
+    # Baixa (PENDENTE -> PAGO) não muda os saldos congelados: por PUT e por /aplicar
+    response = await client.put(f"/lancamentos/{primeiro.id}", json={"status": "PAGO", "descricao": "Pago em atraso"})
+    assert response.status_code == 200, response.text
+    response = await client.post("/conciliacao/aplicar", json={"itens": [{
+        "ofx_id": "atrasado", "lancamento_id": str(segundo.id), "tipo_match": "EXACT",
+        "data": "2024-02-10", "valor": str(valor_segundo),
+    }]})
+    assert response.status_code == 200, response.text
+    assert response.json()["lancamentos_pagos"] == 1
+
+    db_session.expunge_all()
+    status_pagos = (await db_session.execute(
+        select(Lancamento.status).where(Lancamento.id.in_([primeiro.id, segundo.id]))
+    )).scalars().all()
+    assert status_pagos == [StatusLancamento.PAGO] * 2
+    assert (await db_session.execute(consulta_saldo(date(2024, 2, 29)))).scalar() == saldo
+    assert await daily_ledger.verificar(db_session) == []
@@ -0,0 +1,167 @@
+import json
+import pytest
+import uuid
+from decimal import Decimal
+from datetime import date
+from app.api.auth import get_current_user
+from app.models.usuario import Usuario
+from app.services.ofx_parser import OfxParserService, OfxStreamParser
+
+OFX_SGML = """OFXHEADER:100
+DATA:OFXSGML
+VERSION:102
+SECURITY:NONE
+ENCODING:USASCII
+CHARSET:1252
+COMPRESSION:NONE
+OLDFILEUID:NONE
+NEWFILEUID:NONE
+
+<OFX>
+<SIGNONMSGSRSV1><SONRS><STATUS><CODE>0<SEVERITY>INFO</STATUS><DTSERVER>20240131120000[-3:BRT]<LANGUAGE>POR</SONRS></SIGNONMSGSRSV1>
+<BANKMSGSRSV1><STMTTRNRS><TRNUID>1<STATUS><CODE>0<SEVERITY>INFO</STATUS>
+<STMTRS><CURDEF>BRL<BANKACCTFROM><BANKID>0341<ACCTID>12345-6<ACCTTYPE>CHECKING</BANKACCTFROM>
+<BANKTRANLIST><DTSTART>20240101<DTEND>20240131
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20240115100000[-3:BRT]<TRNAMT>-150.50<FITID>TX001<MEMO>PAGAMENTO BOLETO</STMTTRN>
+<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20240116<TRNAMT>2500,00<FITID>TX002<NAME>CLIENTE ALFA & FILHOS</STMTTRN>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20240120223000[-3:BRT]<TRNAMT>-1.025,53<FITID>TX003<NAME>TARIFA<MEMO>Tarifa mensal \xe9 cobran\xe7a</STMTTRN>
+</BANKTRANLIST><LEDGERBAL><BALAMT>1000.00<DTASOF>20240131</LEDGERBAL></STMTRS></STMTTRNRS></BANKMSGSRSV1>
+</OFX>
+""".encode("cp1252")
+
+OFX_XML = """<?xml version="1.0" encoding="UTF-8" standalone="no"?>
+<?OFX OFXHEADER="200" VERSION="220" SECURITY="NONE" OLDFILEUID="NONE" NEWFILEUID="NONE"?>
+<OFX>
+<BANKMSGSRSV1><STMTTRNRS><TRNUID>1</TRNUID><STMTRS><CURDEF>BRL</CURDEF>
+<BANKACCTFROM><BANKID>001</BANKID><ACCTID>999-1</ACCTID><ACCTTYPE>CHECKING</ACCTTYPE></BANKACCTFROM>
+<BANKTRANLIST><DTSTART>20240101</DTSTART><DTEND>20240131</DTEND>
+<STMTTRN><TRNTYPE>CREDIT</TRNTYPE><DTPOSTED>20240105</DTPOSTED><TRNAMT>500.00</TRNAMT><FITID>X1</FITID><NAME>Honorarios &amp; custas</NAME><MEMO></MEMO></STMTTRN>
+<STMTTRN><TRNTYPE>DEBIT</TRNTYPE><DTPOSTED>20240106</DTPOSTED><TRNAMT>-42.10</TRNAMT><FITID>X2</FITID><MEMO>Cartorio</MEMO></STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1>
+</OFX>
+""".encode("utf-8")
+
+def _ler_em_blocos(conteudo: bytes, tamanho: int):
+    parser = OfxStreamParser()
+    transacoes = []
+    for i in range(0, len(conteudo), tamanho):
+        transacoes.extend(parser.feed(conteudo[i:i + tamanho]))
+    transacoes.extend(parser.close())
+    return transacoes
+
+@pytest.mark.parametrize("conteudo", [OFX_SGML, OFX_XML], ids=["sgml", "xml"])
+@pytest.mark.parametrize("tamanho", [1, 7, 64, 1 << 20])
+def test_stream_parser_equivale_ofxparse(conteudo, tamanho):
+    esperado = OfxParserService.parse_file(conteudo)
+    assert _ler_em_blocos(conteudo, tamanho) == esperado
+
+def test_stream_parser_campos():
+    transacoes = _ler_em_blocos(OFX_SGML, 13)
+
+    assert [t.id for t in transacoes] == ["TX001", "TX002", "TX003"]
+    assert [t.valor for t in transacoes] == [Decimal("-150.50"), Decimal("2500.00"), Decimal("-1025.53")]
+    # 22:30 em UTC-3 já é o dia seguinte em UTC, como no ofxparse
+    assert transacoes[2].data == date(2024, 1, 21)
+    assert transacoes[1].descricao == "CLIENTE ALFA & FILHOS"
+    assert transacoes[2].descricao == "Tarifa mensal é cobrança"
+
+def test_stream_parser_xml_utf8():
+    conteudo = OFX_XML.replace(b"Cartorio", "Cartório".encode("utf-8"))
+    transacoes = _ler_em_blocos(conteudo, 5)
+
+    assert [t.descricao for t in transacoes] == ["Honorarios & custas", "Cartório"]
+
+def test_stream_parser_rejeita_arquivo_sem_cabecalho():
+    parser = OfxStreamParser()
+    assert parser.feed(b"nao e um ofx") == []
+    with pytest.raises(ValueError):
+        parser.close()
+
+@pytest.mark.parametrize("conteudo", [OFX_SGML, OFX_XML], ids=["sgml", "xml"])
+@pytest.mark.parametrize("tamanho", [1, 7, 1 << 20])
+def test_stream_parser_rejeita_arquivo_truncado(conteudo, tamanho):
+    # Corte dentro da última transação e depois dela, antes de fechar a lista
+    for corte, mensagem in ((conteudo.rindex(b"</STMTTRN>"), "STMTTRN"), (conteudo.index(b"</BANKTRANLIST>"), "BANKTRANLIST")):
+        with pytest.raises(ValueError, match=mensagem):
+            _ler_em_blocos(conteudo[:corte], tamanho)
+
+# Mock user for authentication bypass
+async def mock_get_current_user():
+    return Usuario(id=uuid.uuid4(), email="test@example.com", role="ADMIN")
+
+@pytest.fixture
+def override_auth(client):
+    from app.main import app
+    app.dependency_overrides[get_current_user] = mock_get_current_user
+    yield
+    app.dependency_overrides.pop(get_current_user, None)
+
+@pytest.mark.asyncio
+async def test_upload_stream_ndjson(client, override_auth):
+    response = await client.post(
+        "/conciliacao/upload/stream?tamanho_lote=2",
+        files={"file": ("extrato.ofx", OFX_SGML, "application/x-ofx")}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    linhas = [json.loads(linha) for linha in response.text.splitlines()]
+    assert [linha["ofx_id"] for linha in linhas] == ["TX001", "TX002", "TX003"]
+    assert all(linha["tipo_match"] == "NONE" for linha in linhas)
+
+@pytest.mark.asyncio
+async def test_upload_stream_truncado_termina_com_erro(client, override_auth):
+    truncado = OFX_SGML[:OFX_SGML.rindex(b"</STMTTRN>")]
+    response = await client.post(
+        "/conciliacao/upload/stream?tamanho_lote=2",
+        files={"file": ("extrato.ofx", truncado, "application/x-ofx")}
+    )
+
+    # O arquivo cabe no primeiro bloco: a resposta é só a linha de erro, sem sucesso parcial
+    linhas = [json.loads(linha) for linha in response.text.splitlines()]
+    assert len(linhas) == 1 and "truncado" in linhas[0]["erro"]
+
+@pytest.mark.asyncio
+async def test_upload_stream_rejeita_arquivo_invalido(client, override_auth):
+    response = await client.post(
+        "/conciliacao/upload/stream",
+        files={"file": ("extrato.ofx", b"x" * (70 * 1024), "application/x-ofx")}
+    )
+    assert response.status_code == 400
+
+def test_conta_extraida_do_extrato():
+    assert {t.conta for t in OfxParserService.parse_file(OFX_SGML)} == {"12345-6"}
+    assert {t.conta for t in _ler_em_blocos(OFX_SGML, 3)} == {"12345-6"}
+    assert {t.conta for t in _ler_em_blocos(OFX_XML, 4)} == {"999-1"}
+
+@pytest.mark.asyncio
+async def test_upload_lote_descarta_fitid_repetido(client, override_auth):
+    # Segundo extrato da mesma conta repete TX003 e traz uma transação nova
+    segundo = OFX_SGML.replace(b"TX001", b"TX004").replace(b"TX002", b"TX005")
+    response = await client.post(
+        "/conciliacao/upload/lote",
+        files=[
+            ("files", ("janeiro.ofx", OFX_SGML, "application/x-ofx")),
+            ("files", ("janeiro_2.ofx", segundo, "application/x-ofx")),
+            ("files", ("cartao.ofx", OFX_XML, "application/x-ofx")),
+        ]
+    )
+
+    assert response.status_code == 200
+    dados = response.json()
+    assert [(a["nome"], a["transacoes"], a["duplicadas"]) for a in dados["arquivos"]] == [
+        ("janeiro.ofx", 3, 0), ("janeiro_2.ofx", 3, 1), ("cartao.ofx", 2, 0)
+    ]
+    assert [r["ofx_id"] for r in dados["resultados"]] == ["TX001", "TX002", "TX003", "TX004", "TX005", "X1", "X2"]
+
+@pytest.mark.asyncio
+async def test_upload_lote_rejeita_arquivo_invalido(client, override_auth):
+    response = await client.post(
+        "/conciliacao/upload/lote",
+        files=[
+            ("files", ("janeiro.ofx", OFX_SGML, "application/x-ofx")),
+            ("files", ("quebrado.ofx", b"nao e um ofx", "application/x-ofx")),
+        ]
+    )
+    assert response.status_code == 400
+    assert "quebrado.ofx" in response.json()["detail"]
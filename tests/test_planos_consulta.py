@@ -0,0 +1,121 @@
+import json
+import random
+import re
+import pytest
+import uuid
+from decimal import Decimal
+from datetime import date, timedelta
+from sqlalchemy import insert, select, text
+from app.models.lancamento import Lancamento
+from app.models.participante import Participante
+from app.models.processo import Processo
+from app.models.centro_custo import CentroCusto
+from app.models.enums import TipoParticipante, TipoLancamento, NaturezaLancamento, StatusLancamento, StatusProcesso
+from app.services.dashboard import filtros_lancamento
+
+# Regressão de planos: cada consulta quente sobre lancamentos deve ser atendida
+# por índice (EXPLAIN sem varredura sequencial da tabela) em uma base populada
+# e com estatísticas atualizadas.
+
+BASE = date(2024, 1, 1)
+TOTAL = 3000
+
+async def _seed(db_session) -> dict:
+    rng = random.Random(19)
+    participante_id, processo_id = uuid.uuid4(), uuid.uuid4()
+    centros = [uuid.uuid4() for _ in range(8)]
+    await db_session.execute(insert(Participante).values(
+        id=participante_id, nome="Cliente Planos", documento="planos-1", tipo=TipoParticipante.CLIENTE
+    ))
+    await db_session.execute(insert(Processo).values(
+        id=processo_id, numero="planos-proc", status=StatusProcesso.ATIVO, cliente_id=participante_id
+    ))
+    for i, centro_id in enumerate(centros):
+        await db_session.execute(insert(CentroCusto).values(id=centro_id, nome=f"Centro planos {i}"))
+
+    status = [StatusLancamento.PAGO] * 6 + [StatusLancamento.PENDENTE] * 3 + [StatusLancamento.CANCELADO]
+    linhas = []
+    for i in range(TOTAL):
+        linhas.append({
+            "id": uuid.uuid4(), "descricao": f"Planos {i}", "valor": Decimal(rng.randint(100, 99999)) / 100,
+            "tipo": rng.choice(list(TipoLancamento)), "natureza": NaturezaLancamento.PONTUAL,
+            "status": rng.choice(status), "data_vencimento": BASE + timedelta(days=rng.randrange(3 * 365)),
+            "participante_id": participante_id, "centro_custo_id": rng.choice(centros),
+            "processo_id": processo_id if i % 50 == 0 else None, "reembolsavel": False,
+            "lancamento_pai_id": None,
+        })
+    await db_session.execute(insert(Lancamento), linhas)
+    # Alguns reembolsos apontando para despesas
+    await db_session.execute(insert(Lancamento), [
+        linha | {"id": uuid.uuid4(), "processo_id": None, "lancamento_pai_id": linha["id"]} for linha in linhas[:20]
+    ])
+
+    await db_session.execute(text("ANALYZE"))
+    return {"processo_id": processo_id, "centro_custo_id": centros[0], "despesa_id": linhas[0]["id"]}
+
+async def _varreduras_sequenciais(db_session, stmt, tabela: str = "lancamentos") -> list[str]:
+    """
+    Nós do plano que leem `tabela` inteira: "Seq Scan" no PostgreSQL, "SCAN" no SQLite.
+    """
+    conn = await db_session.connection()
+    sql = str(stmt.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+    if conn.dialect.name == "postgresql":
+        plano = (await db_session.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))).scalar()
+        plano = json.loads(plano) if isinstance(plano, str) else plano
+        nos, encontrados = [plano[0]["Plan"]], []
+        while nos:
+            no = nos.pop()
+            if no["Node Type"] == "Seq Scan" and no.get("Relation Name") == tabela:
+                encontrados.append(f"Seq Scan on {tabela}")
+            nos.extend(no.get("Plans", []))
+        return encontrados
+
+    detalhes = [linha[-1] for linha in (await db_session.execute(text(f"EXPLAIN QUERY PLAN {sql}"))).all()]
+    return [d for d in detalhes if re.match(rf"SCAN {tabela}\b", d)]
+
+def _consultas_quentes(ids: dict) -> dict:
+    inicio, fim = BASE + timedelta(days=100), BASE + timedelta(days=130)
+    return {
+        # ConciliacaoService.carregar_candidatos
+        "conciliacao_janela": select(Lancamento).where(
+            Lancamento.status == StatusLancamento.PENDENTE,
+            Lancamento.data_vencimento >= inicio,
+            Lancamento.data_vencimento <= fim
+        ),
+        # read_lancamentos por período, por status + período e por centro de custo + período
+        "listagem_periodo": select(Lancamento).where(
+            Lancamento.data_vencimento >= inicio, Lancamento.data_vencimento <= fim
+        ).limit(100),
+        "listagem_status_periodo": select(Lancamento).where(
+            Lancamento.status == StatusLancamento.PAGO,
+            Lancamento.data_vencimento >= inicio,
+            Lancamento.data_vencimento <= fim
+        ).limit(100),
+        "listagem_centro_custo": select(Lancamento).where(
+            Lancamento.centro_custo_id == ids["centro_custo_id"],
+            Lancamento.data_vencimento >= inicio,
+            Lancamento.data_vencimento <= fim
+        ).limit(100),
+        # Dashboard por data de inclusão
+        "dashboard_data_inclusao": select(Lancamento.id).where(
+            *filtros_lancamento(None, None, None, None, BASE, BASE + timedelta(days=6))
+        ),
+        # FinanceiroService (previsão de êxito) e mudança de status do processo no ledger
+        "lancamentos_do_processo": select(Lancamento).where(
+            Lancamento.processo_id == ids["processo_id"],
+            Lancamento.natureza == NaturezaLancamento.EXITO
+        ),
+        # LancamentoService: reembolsos gerados por uma despesa
+        "reembolsos": select(Lancamento).where(Lancamento.lancamento_pai_id == ids["despesa_id"]),
+    }
+
+@pytest.mark.asyncio
+async def test_consultas_quentes_usam_indices(db_session):
+    ids = await _seed(db_session)
+
+    falhas = {}
+    for nome, stmt in _consultas_quentes(ids).items():
+        varreduras = await _varreduras_sequenciais(db_session, stmt)
+        if varreduras:
+            falhas[nome] = varreduras
+    assert falhas == {}